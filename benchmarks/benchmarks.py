@@ -1,14 +1,49 @@
+import shutil
+import tempfile
 from pathlib import Path
 
+import h5py
+import numpy as np
+
 import neurom as nm
 import neurom.io
-from neurom.fst._core import FstNeuron
+from neurom.apps import morph_stats
+from neurom.core.dataformat import COLS, POINT_TYPE
+from neurom.fst._core import FstNeuron, make_neurites
+from neurom.io import hdf5, swc
+from neurom.io.datawrapper import DataWrapper, _extract_sections
 from neurom.check import neuron_checks as nc
 from neurom.check import structural_checks as sc
 
 DATA_DIR = Path(__file__).parent.parent / 'test_data/'
 
 
+def _random_data_block(n_points, section_length=100, seed=0):
+    """Data block of a binary tree of about `n_points` points, in depth-first order."""
+    rng = np.random.RandomState(seed)
+    n_sections = max((n_points - 1) // section_length, 1)
+    section_parents = []
+    stack = [-1]
+    while stack:
+        parent = stack.pop()
+        section_parents.append(parent)
+        if len(section_parents) + len(stack) + 2 <= n_sections:
+            stack.extend((len(section_parents) - 1,) * 2)
+    section_parents = np.array(section_parents)
+
+    n_points = len(section_parents) * section_length + 1
+    data_block = np.empty((n_points, COLS.COL_COUNT))
+    data_block[:, COLS.XYZR] = rng.rand(n_points, 4)
+    data_block[:, COLS.TYPE] = POINT_TYPE.BASAL_DENDRITE
+    data_block[0, COLS.TYPE] = POINT_TYPE.SOMA
+    data_block[:, COLS.ID] = np.arange(n_points)
+    data_block[:, COLS.P] = np.arange(-1, n_points - 1)
+    first_rows = np.arange(len(section_parents)) * section_length + 1
+    data_block[first_rows, COLS.P] = np.where(
+        section_parents == -1, 0, first_rows[section_parents] + section_length - 1)
+    return data_block
+
+
 class TimeLoadMorphology(object):
     def time_swc(self):
         path = Path(DATA_DIR, 'swc/Neuron.swc')
@@ -23,6 +58,134 @@ class TimeLoadMorphology(object):
         nm.load_neuron(path)
 
 
+class TimeExtractSections(object):
+    params = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+    param_names = ['n_points']
+    timeout = 300
+
+    def setup(self, n_points):
+        self.structure_block = _random_data_block(n_points)[:, COLS.TYPE:].astype(np.int32)
+
+    def time_extract_sections(self, n_points):
+        _extract_sections(self.structure_block)
+
+
+class MakeNeurites(object):
+    """Compare contiguous section views to per-section copies."""
+    params = [10 ** 4, 10 ** 5, 10 ** 6]
+    param_names = ['n_points']
+    timeout = 300
+
+    def setup(self, n_points):
+        self.data_wrapper = DataWrapper(_random_data_block(n_points), 'SWC')
+
+    def time_contiguous(self, n_points):
+        make_neurites(self.data_wrapper)
+
+    def time_copies(self, n_points):
+        make_neurites(self.data_wrapper, contiguous=False)
+
+    def peakmem_contiguous(self, n_points):
+        make_neurites(self.data_wrapper)
+
+    def peakmem_copies(self, n_points):
+        make_neurites(self.data_wrapper, contiguous=False)
+
+
+class SectionMemory(object):
+    """Memory taken by the Section and Neurite objects of short sections."""
+    params = [10 ** 4, 10 ** 5, 10 ** 6]
+    param_names = ['n_sections']
+    timeout = 300
+
+    def setup(self, n_sections):
+        self.data_wrapper = DataWrapper(_random_data_block(2 * n_sections + 1, section_length=2),
+                                        'SWC')
+
+    def peakmem_make_neurites(self, n_sections):
+        make_neurites(self.data_wrapper)
+
+    def peakmem_section_lengths(self, n_sections):
+        neurites, _ = make_neurites(self.data_wrapper)
+        for neurite in neurites:
+            neurite.length
+
+
+class SWCReader(object):
+    """Compare the SWC readers to the former `np.loadtxt` based one."""
+    params = [10 ** 4, 10 ** 5, 10 ** 6]
+    param_names = ['n_points']
+    timeout = 300
+
+    def setup(self, n_points):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = Path(self.tmp_dir, 'neuron.swc')
+        data_block = _random_data_block(n_points)
+        np.savetxt(self.path, data_block[:, [COLS.ID, COLS.TYPE, COLS.X, COLS.Y, COLS.Z,
+                                             COLS.R, COLS.P]],
+                   fmt='%d %d %.6f %.6f %.6f %.6f %d', header='random neuron')
+
+    def teardown(self, n_points):
+        shutil.rmtree(self.tmp_dir)
+
+    def _baseline_read(self):
+        """swc.read as it was before the bulk parsers."""
+        data = np.loadtxt(self.path)
+        if len(np.shape(data)) == 1:
+            data = np.reshape(data, (1, -1))
+        data[:, swc.TYPE] = np.clip(data[:, swc.TYPE], a_min=None, a_max=5)
+        return DataWrapper(data[:, [swc.X, swc.Y, swc.Z, swc.R, swc.TYPE, swc.ID, swc.P]],
+                           'SWC', None)
+
+    def time_read(self, n_points):
+        swc.read(self.path)
+
+    def time_read_chunks(self, n_points):
+        swc._read_chunks(self.path)
+
+    def time_baseline_read(self, n_points):
+        self._baseline_read()
+
+    def peakmem_read(self, n_points):
+        swc.read(self.path)
+
+    def peakmem_read_chunks(self, n_points):
+        swc._read_chunks(self.path)
+
+    def peakmem_baseline_read(self, n_points):
+        self._baseline_read()
+
+
+class H5Reader(object):
+    """Read H5 morphologies with many sections."""
+    params = [10 ** 3, 10 ** 4, 10 ** 5]
+    param_names = ['n_sections']
+
+    def setup(self, n_sections):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = Path(self.tmp_dir, 'neuron.h5')
+        section_length = 10
+        structure = np.empty((n_sections + 1, 3), dtype=np.int32)
+        structure[0] = 0, POINT_TYPE.SOMA, -1
+        structure[1:, 0] = 1 + np.arange(n_sections) * section_length
+        structure[1:, 1] = POINT_TYPE.BASAL_DENDRITE
+        # binary trees starting at the soma
+        structure[1:, 2] = np.arange(n_sections) // 2
+        with h5py.File(self.path, 'w') as h5file:
+            h5file['points'] = np.random.RandomState(0).rand(
+                n_sections * section_length + 1, 4)
+            h5file['structure'] = structure
+
+    def teardown(self, n_sections):
+        shutil.rmtree(self.tmp_dir)
+
+    def time_read(self, n_sections):
+        hdf5.read(self.path)
+
+    def time_read_remove_duplicates(self, n_sections):
+        hdf5.read(self.path, remove_duplicates=True)
+
+
 class TimeFeatures(object):
     def setup(self):
         path = Path(DATA_DIR, 'h5/v1/bio_neuron-000.h5')
@@ -94,6 +257,12 @@ class TimeFeatures(object):
     def time_segment_midpoints(self):
         nm.get('segment_midpoints', self.neuron)
 
+    def time_segment_areas(self):
+        nm.get('segment_areas', self.neuron)
+
+    def time_segment_volumes(self):
+        nm.get('segment_volumes', self.neuron)
+
     def time_segment_taper_rates(self):
         nm.get('segment_taper_rates', self.neuron)
 
@@ -110,6 +279,77 @@ class TimeFeatures(object):
         nm.get('sholl_frequency', self.neuron)
 
 
+class TimePoints(object):
+    """Concatenated points, computed again at each run."""
+    def setup(self):
+        path = Path(DATA_DIR, 'h5/v1/bio_neuron-000.h5')
+        self.neuron = nm.load_neuron(path)
+
+    def time_neuron_points(self):
+        self.neuron.clear_caches()
+        self.neuron.points
+
+    def time_neurite_points(self):
+        self.neuron.clear_caches()
+        for neurite in self.neuron.neurites:
+            neurite.points
+
+    def time_bounding_box(self):
+        self.neuron.clear_caches()
+        nm.geom.bounding_box(self.neuron)
+
+
+class TimeTransforms(object):
+    """Transform copies of a neuron, or the neurons themselves in place."""
+    def setup(self):
+        path = Path(DATA_DIR, 'h5/v1/bio_neuron-000.h5')
+        self.population = nm.core.Population([nm.load_neuron(path) for _ in range(10)])
+        self.transform = nm.geom.transform.compose(
+            nm.geom.transform.Translation([10., 20., 30.]),
+            nm.geom.transform.Rotation(np.identity(3)))
+
+    def time_copy(self):
+        for neuron in self.population:
+            neuron.transform(self.transform)
+
+    def time_inplace(self):
+        for neuron in self.population:
+            neuron.transform(self.transform, inplace=True)
+
+    def time_transform_population(self):
+        nm.geom.transform_population(self.population, self.transform)
+
+
+class TimeColumnarPopulation(object):
+    def setup(self):
+        path = Path(DATA_DIR, 'h5/v1/bio_neuron-000.h5')
+        self.population = nm.core.Population([nm.load_neuron(path)] * 20)
+        self.columns = nm.core.ColumnarPopulation(self.population)
+
+    def time_build(self):
+        nm.core.ColumnarPopulation(self.population)
+
+    def time_total_length(self):
+        self.columns.reduce(self.columns.section_lengths(), by='neuron')
+
+    def time_segment_lengths(self):
+        self.columns.segment_lengths()
+
+    def time_section_path_distances(self):
+        self.columns.section_path_distances()
+
+
+class TimeMorphStats(object):
+    def setup(self):
+        path = Path(DATA_DIR, 'h5/v1/bio_neuron-000.h5')
+        self.neuron = nm.load_neuron(path)
+        config = morph_stats.full_config()
+        self.config = {'neurite': config['neurite'], 'neurite_type': config['neurite_type']}
+
+    def time_extract_stats(self):
+        morph_stats.extract_stats(self.neuron, self.config)
+
+
 class TimeChecks:
     def setup(self):
         path = Path(DATA_DIR, 'h5/v1/bio_neuron-000.h5')
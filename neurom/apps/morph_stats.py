@@ -42,7 +42,8 @@ import pkg_resources
 
 import neurom as nm
 from neurom.exceptions import ConfigError
-from neurom.features import NEURITEFEATURES, NEURONFEATURES, _get_feature_value_and_func
+from neurom.features import (NEURITEFEATURES, NEURONFEATURES, _find_feature_func,
+                             _get_feature_value_and_func, get_many)
 from neurom.fst._core import FstNeuron
 
 L = logging.getLogger(__name__)
@@ -182,12 +183,13 @@ def extract_stats(neurons, config):
 
     stats = defaultdict(dict)
 
-    for (feature_name, modes), neurite_type in product(config['neurite'].items(),
-                                                       config.get('neurite_type',
-                                                                  _NEURITE_MAP.keys())):
-        neurite_type = _NEURITE_MAP[neurite_type]
-        feature, func = _get_feature_value_and_func(feature_name, neurons,
-                                                    neurite_type=neurite_type)
+    neurite_types = [_NEURITE_MAP[t] for t in config.get('neurite_type', _NEURITE_MAP.keys())]
+    # all the neurite features are computed in one batch to share their intermediate results
+    neurite_features = get_many(config['neurite'], neurons, neurite_types)
+
+    for (feature_name, modes), neurite_type in product(config['neurite'].items(), neurite_types):
+        feature = neurite_features[feature_name, neurite_type]
+        func = _find_feature_func(feature_name)
         for mode in modes:
             stat_name = _stat_name(feature_name, mode)
             stat = eval_stats(feature, mode)
@@ -42,7 +42,7 @@ from neurom.check.morphtree import get_flat_neurites, get_nonmonotonic_neurites
 from neurom.core import Tree, iter_neurites, iter_sections, iter_segments
 from neurom.core.dataformat import COLS
 from neurom.features import neuritefunc as _nf
-from neurom.morphmath import section_length, segment_length
+from neurom.morphmath import section_length, segment_lengths
 
 
 def _read_neurite_type(neurite):
@@ -136,12 +136,8 @@ def has_all_nonzero_segment_lengths(neuron, threshold=0.0):
         CheckResult with result including list of (section_id, segment_id)
         of zero length segments
     """
-    bad_ids = []
-    for sec in _nf.iter_sections(neuron):
-        p = sec.points
-        for i, s in enumerate(zip(p[:-1], p[1:])):
-            if segment_length(s) <= threshold:
-                bad_ids.append((sec.id, i))
+    bad_ids = [(sec.id, int(i)) for sec in _nf.iter_sections(neuron)
+               for i in np.flatnonzero(segment_lengths(sec.points) <= threshold)]
 
     return CheckResult(len(bad_ids) == 0, bad_ids)
 
@@ -44,9 +44,15 @@ L = logging.getLogger(__name__)
 class CheckRunner(object):
     """Class managing checks, config and output."""
 
-    def __init__(self, config):
-        """Initialize a CheckRunner object."""
+    def __init__(self, config, cache_dir=None):
+        """Initialize a CheckRunner object.
+
+        Arguments:
+            config (dict): checks to run and their options
+            cache_dir: directory of the on-disk cache of parsed files, see `neurom.io.load_data`
+        """
         self._config = CheckRunner._sanitize_config(config)
+        self._cache_dir = cache_dir
         self._check_modules = dict((k, import_module('neurom.check.%s' % k))
                                    for k in config['checks'])
 
@@ -110,7 +116,7 @@ class CheckRunner(object):
         full_result = True
         full_summary = OrderedDict()
         try:
-            data = load_data(f)
+            data = load_data(f, cache_dir=self._cache_dir)
         except Exception as e:  # pylint: disable=W0703
             L.error('Failed to load data... skipping tests for this file')
             L.error(e.args)
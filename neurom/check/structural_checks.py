@@ -34,6 +34,7 @@ from neurom.core.dataformat import POINT_TYPE
 from neurom.core import make_soma
 from neurom.fst._core import make_neurites
 from neurom.exceptions import SomaError
+from neurom.io.datawrapper import TYPE, ID, PID
 
 
 def has_sequential_ids(data_wrapper):
@@ -42,9 +43,8 @@ def has_sequential_ids(data_wrapper):
     returns tuple (bool, list of IDs that are not consecutive
     with their predecessor)
     """
-    db = data_wrapper.data_block
-    ids = db[:, COLS.ID]
-    steps = ids[np.where(np.diff(ids) != 1)[0] + 1].astype(int)
+    ids = data_wrapper.structure_block[:, ID]
+    steps = ids[np.where(np.diff(ids) != 1)[0] + 1]
     return CheckResult(len(steps) == 0, steps)
 
 
@@ -57,9 +57,9 @@ def no_missing_parents(data_wrapper):
     Returns:
         CheckResult with result and list of IDs that have no parent
     """
-    db = data_wrapper.data_block
-    ids = np.setdiff1d(db[:, COLS.P], db[:, COLS.ID])[1:]
-    return CheckResult(len(ids) == 0, ids.astype(np.int) + 1)
+    structure = data_wrapper.structure_block
+    ids = np.setdiff1d(structure[:, PID], structure[:, ID])[1:]
+    return CheckResult(len(ids) == 0, ids + 1)
 
 
 def is_single_tree(data_wrapper):
@@ -73,8 +73,8 @@ def is_single_tree(data_wrapper):
     Note:
         This assumes no_missing_parents passed.
     """
-    db = data_wrapper.data_block
-    bad_ids = db[db[:, COLS.P] == -1][1:, COLS.ID]
+    structure = data_wrapper.structure_block
+    bad_ids = structure[structure[:, PID] == -1][1:, ID]
     return CheckResult(len(bad_ids) == 0, bad_ids.tolist())
 
 
@@ -85,9 +85,8 @@ def has_increasing_ids(data_wrapper):
         CheckResult with result and list of IDs that are inconsistent
         with their predecessor
     """
-    db = data_wrapper.data_block
-    ids = db[:, COLS.ID]
-    steps = ids[np.where(np.diff(ids) <= 0)[0] + 1].astype(int)
+    ids = data_wrapper.structure_block[:, ID]
+    steps = ids[np.where(np.diff(ids) <= 0)[0] + 1]
     return CheckResult(len(steps) == 0, steps)
 
 
@@ -97,8 +96,7 @@ def has_soma_points(data_wrapper):
     Returns:
         CheckResult with result
     """
-    db = data_wrapper.data_block
-    return CheckResult(POINT_TYPE.SOMA in db[:, COLS.TYPE], None)
+    return CheckResult(POINT_TYPE.SOMA in data_wrapper.structure_block[:, TYPE], None)
 
 
 def has_all_finite_radius_neurites(data_wrapper, threshold=0.0):
@@ -107,11 +105,10 @@ def has_all_finite_radius_neurites(data_wrapper, threshold=0.0):
     Returns:
         CheckResult with result and list of IDs of neurite points with zero radius
     """
-    db = data_wrapper.data_block
-    neurite_ids = np.in1d(db[:, COLS.TYPE], POINT_TYPE.NEURITES)
-    zero_radius_ids = db[:, COLS.R] <= threshold
-    bad_pts = np.array(db[neurite_ids & zero_radius_ids][:, COLS.ID],
-                       dtype=int).tolist()
+    structure = data_wrapper.structure_block
+    neurite_ids = np.in1d(structure[:, TYPE], POINT_TYPE.NEURITES)
+    zero_radius_ids = data_wrapper.data_block[:, COLS.R] <= threshold
+    bad_pts = structure[neurite_ids & zero_radius_ids, ID].tolist()
     return CheckResult(len(bad_pts) == 0, bad_pts)
 
 
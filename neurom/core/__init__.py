@@ -29,8 +29,10 @@
 """Core functionality and data types of NeuroM."""
 
 from .tree import Tree
+from .topology import Topology
 from .types import NeuriteType, NeuriteIter
 from ._soma import Soma, make_soma, SomaError
-from ._neuron import (Section, Neurite, Neuron, iter_neurites,
+from ._neuron import (Section, Neurite, ArrayNeurite, Neuron, iter_neurites,
                       iter_sections, iter_segments, graft_neuron)
-from .population import Population
+from .population import Population, LazyPopulation
+from .columnar import ColumnarPopulation
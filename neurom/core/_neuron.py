@@ -29,14 +29,16 @@
 """Neuron classes and functions."""
 
 from copy import deepcopy
-from itertools import chain
+from itertools import chain, count
 
 import numpy as np
 
 from neurom import morphmath
 from neurom.core._soma import Soma
+from neurom.core.columnar import reduce_groups, segment_indices
 from neurom.core.dataformat import COLS
-from neurom.utils import memoize
+from neurom.core.topology import Topology
+from neurom.utils import cached_property
 
 from . import NeuriteType, Tree, NeuriteIter
 
@@ -49,8 +51,22 @@ NRN_ORDER = {NeuriteType.soma: 0,
              NeuriteType.apical_dendrite: 3,
              NeuriteType.undefined: 4}
 
+# versions of the points of the section trees, see Section.points_version
+_POINTS_VERSIONS = count(1)
 
-def iter_neurites(obj, mapfun=None, filt=None, neurite_order=NeuriteIter.FileOrder):
+
+def _neurites(obj, arrays):
+    """Neurites of a neuron, neuron population or collection of neurites, see `iter_neurites`."""
+    if arrays and hasattr(obj, 'neurons'):
+        return chain.from_iterable(_neurites(neuron, arrays) for neuron in obj.neurons)
+    # the neurites of a lazy neuron are built by the first access to its `neurites`
+    if arrays and getattr(obj, '_neurites', True) is None:
+        return obj.array_neurites
+    return obj.neurites if hasattr(obj, 'neurites') else obj
+
+
+def iter_neurites(obj, mapfun=None, filt=None, neurite_order=NeuriteIter.FileOrder,
+                  arrays=False):
     """Iterator to a neurite, neuron or neuron population.
 
     Applies optional neurite filter and mapping functions.
@@ -62,6 +78,8 @@ def iter_neurites(obj, mapfun=None, filt=None, neurite_order=NeuriteIter.FileOrd
         neurite_order (NeuriteIter): order upon which neurites should be iterated
             - NeuriteIter.FileOrder: order of appearance in the file
             - NeuriteIter.NRN: NRN simulator order: soma -> axon -> basal -> apical
+        arrays(bool): if True, the neurites of the lazy neurons whose neurites are not built
+            (see neurom.fst.FstNeuron) are their ArrayNeurites, so that they are not built
 
     Examples:
         Get the number of points in each neurite in a neuron population
@@ -77,8 +95,7 @@ def iter_neurites(obj, mapfun=None, filt=None, neurite_order=NeuriteIter.FileOrd
         >>> mapping = lambda n : len(n.points)
         >>> n_points = [n for n in iter_neurites(pop, mapping, filter)]
     """
-    neurites = ((obj,) if isinstance(obj, Neurite) else
-                obj.neurites if hasattr(obj, 'neurites') else obj)
+    neurites = (obj,) if isinstance(obj, (Neurite, ArrayNeurite)) else _neurites(obj, arrays)
     if neurite_order == NeuriteIter.NRN:
         last_position = max(NRN_ORDER.values()) + 1
         neurites = sorted(neurites, key=lambda neurite: NRN_ORDER.get(neurite.type, last_position))
@@ -154,38 +171,74 @@ def graft_neuron(root_section):
 class Section(Tree):
     """Class representing a neurite section."""
 
+    __slots__ = ('id', '_points', 'type', '_points_version') + cached_property.slots(
+        'length', 'area', 'volume')
+
     def __init__(self, points, section_id=None, section_type=NeuriteType.undefined):
         """Initialize a Section object."""
         super().__init__()
         self.id = section_id
-        self.points = points
+        self._points = points
+        self._points_version = 0
         self.type = section_type
 
     @property
-    @memoize
+    def points(self):
+        """Return the points of this section.
+
+        Reassigning them clears the cached properties depending on them, see `points_changed`.
+        """
+        return self._points
+
+    @points.setter
+    def points(self, points):
+        """Set the points of this section."""
+        self._points = points
+        self.points_changed()
+
+    def points_changed(self):
+        """Clear the cached properties depending on the points of this section.
+
+        The properties of this section are cleared, and those of the neurites whose tree
+        contains it are computed again on their next access, see `points_version`. This is
+        done when the points are reassigned, it must be called if they are modified in place.
+        """
+        cached_property.clear(self)
+        root = self
+        while root.parent is not None:
+            root = root.parent
+        root._points_version = next(_POINTS_VERSIONS)  # pylint: disable=protected-access
+
+    @property
+    def points_version(self):
+        """Return the version of the points of the tree rooted at this section.
+
+        It changes whenever `points_changed` is called on one of the sections of the tree.
+        """
+        return self._points_version
+
+    @cached_property
     def length(self):
         """Return the path length of this section."""
         return morphmath.section_length(self.points)
 
-    @property
-    @memoize
+    @cached_property
     def area(self):
         """Return the surface area of this section.
 
         The area is calculated from the segments, as defined by this
         section's points
         """
-        return sum(morphmath.segment_area(s) for s in iter_segments(self))
+        return np.sum(morphmath.segment_areas(self.points))
 
-    @property
-    @memoize
+    @cached_property
     def volume(self):
         """Return the volume of this section.
 
         The volume is calculated from the segments, as defined by this
         section's points
         """
-        return sum(morphmath.segment_volume(s) for s in iter_segments(self))
+        return np.sum(morphmath.segment_volumes(self.points))
 
     def __str__(self):
         """Return a string representation."""
@@ -195,28 +248,86 @@ class Section(Tree):
     __repr__ = __str__
 
 
+def _point_path_distances(topology, section_path_distances, points, n_points):
+    """Path distances from the root of a neurite to the points of its sections.
+
+    Arguments:
+        topology: topology of the sections
+        section_path_distances: path distance to the end of each section
+        points: points of the sections in the order of `topology`, concatenated
+        n_points: number of points of each section
+    """
+    n_points = np.asarray(n_points)
+    first_points = np.cumsum(n_points) - n_points
+    start_distances = np.where(topology.parents >= 0,
+                               section_path_distances[topology.parents], 0.)
+
+    segment_lengths = np.zeros(len(points))
+    segment_lengths[1:] = np.linalg.norm(np.diff(points[:, COLS.XYZ], axis=0), axis=1)
+    # the segments between the end of a section and the start of the next one do not exist
+    segment_lengths[first_points] = 0.
+    distances = np.cumsum(segment_lengths)
+    return distances + np.repeat(start_distances - distances[first_points], n_points)
+
+
+def _points_version(neurite):
+    """Version of the points of the sections of `neurite`, see Section.points_version."""
+    return neurite.root_node.points_version
+
+
 class Neurite(object):
     """Class representing a neurite tree."""
 
+    __slots__ = ('root_node', 'type') + cached_property.slots(
+        'points', 'topology', 'section_path_distances', 'point_path_distances',
+        'length', 'area', 'volume')
+
     def __init__(self, root_node):
         """Initialize a Neurite object."""
         self.root_node = root_node
         self.type = root_node.type if hasattr(
             root_node, 'type') else NeuriteType.undefined
 
-    @property
-    @memoize
+    @cached_property.versioned(_points_version)
     def points(self):
-        """Return unordered array with all the points in this neurite."""
-        # add all points in a section except the first one, which is a duplicate
-        _pts = [v for s in self.root_node.ipreorder()
-                for v in s.points[1:, COLS.XYZR]]
+        """Return unordered array with all the points in this neurite.
+
+        The array is cached, it is the same at each access and must not be modified.
+        """
+        sections = self.root_node.ipreorder()
+        # all points in a section except the first one, which is a duplicate,
         # except for the very first point, which is not a duplicate
-        _pts.insert(0, self.root_node.points[0][COLS.XYZR])
-        return np.array(_pts)
+        return np.concatenate([next(sections).points[:, COLS.XYZR]] +
+                              [s.points[1:, COLS.XYZR] for s in sections])
 
-    @property
-    @memoize
+    @cached_property
+    def topology(self):
+        """Return the topology of this neurite's sections, see neurom.core.topology.Topology.
+
+        It is built on first access and is not updated if the section tree is modified.
+        """
+        return Topology((self.root_node, ))
+
+    @cached_property.versioned(_points_version)
+    def section_path_distances(self):
+        """Return the path distances from the root of this neurite to the end of each section.
+
+        The sections are in the order of `topology`, the distances are computed in one pass.
+        """
+        return self.topology.accumulate([section.length for section in self.topology.nodes])
+
+    @cached_property.versioned(_points_version)
+    def point_path_distances(self):
+        """Return the path distances from the root of this neurite to the points of each section.
+
+        The points are those of the sections in the order of `topology`, concatenated. The
+        first point of each section, a duplicate of the last point of its parent, is included.
+        """
+        points = [section.points[:, COLS.XYZ] for section in self.topology.nodes]
+        return _point_path_distances(self.topology, self.section_path_distances,
+                                     np.concatenate(points), [len(p) for p in points])
+
+    @cached_property.versioned(_points_version)
     def length(self):
         """Return the total length of this neurite.
 
@@ -224,8 +335,7 @@ class Neurite(object):
         """
         return sum(s.length for s in self.iter_sections())
 
-    @property
-    @memoize
+    @cached_property.versioned(_points_version)
     def area(self):
         """Return the surface area of this neurite.
 
@@ -233,8 +343,7 @@ class Neurite(object):
         """
         return sum(s.area for s in self.iter_sections())
 
-    @property
-    @memoize
+    @cached_property.versioned(_points_version)
     def volume(self):
         """Return the volume of this neurite.
 
@@ -242,13 +351,45 @@ class Neurite(object):
         """
         return sum(s.volume for s in self.iter_sections())
 
-    def transform(self, trans):
-        """Return a copy of this neurite with a 3D transformation applied."""
-        clone = deepcopy(self)
-        for n in clone.iter_sections():
-            n.points[:, 0:3] = trans(n.points[:, 0:3])
+    def transform(self, trans, inplace=False):
+        """Return a copy of this neurite with a 3D transformation applied.
 
-        return clone
+        Arguments:
+            trans: 3D transformation, see neurom.geom.transform.Transform3D
+            inplace(bool): if True, the points of the sections are transformed in place
+                and the neurite itself is returned. The first point of a section sharing its
+                memory with the last point of its parent is transformed once. Read-only points,
+                such as those of a neuron loaded from a container, are replaced by transformed
+                copies.
+        """
+        if not inplace:
+            clone = deepcopy(self)
+            for n in clone.iter_sections():
+                n.points[:, 0:3] = trans(n.points[:, 0:3])
+            clone.clear_caches()
+            return clone
+
+        for section in self.iter_sections():
+            points = section.points
+            if not points.flags.writeable:
+                section.points = points = points.copy()
+            elif (section.parent is not None and
+                  np.shares_memory(points[:1], section.parent.points[-1:])):
+                points = points[1:]
+            points[:, COLS.XYZ] = trans(points[:, COLS.XYZ])
+        self.clear_caches()
+        return self
+
+    def clear_caches(self):
+        """Clear the cached properties of this neurite and of its sections.
+
+        They are computed again on their next access. This frees the memory they take, and
+        must be done if the points of the sections are modified in place.
+        """
+        for section in self.iter_sections():
+            cached_property.clear(section)
+        self.root_node.points_changed()
+        cached_property.clear(self)
 
     def iter_sections(self, order=Tree.ipreorder, neurite_order=NeuriteIter.FileOrder):
         """Iteration over section nodes.
@@ -292,6 +433,117 @@ class Neurite(object):
     __repr__ = __str__
 
 
+class ArrayNeurite(object):
+    """Neurite made of arrays, without Section objects.
+
+    It has the attributes of Neurite which do not refer to sections: `type`, `topology`,
+    whose nodes are None, `points`, the path distances, `length`, `area` and `volume`. The
+    points of the sections, in the order of `topology`, are concatenated in `section_points`.
+
+    The features use the ArrayNeurites of lazy neurons (see neurom.fst.FstNeuron), so that
+    their Section and Neurite objects are not built.
+    """
+
+    __slots__ = ('type', 'topology', 'section_points', 'section_offsets') + cached_property.slots(
+        'points', 'section_lengths', 'section_path_distances', 'point_path_distances',
+        'length', 'area', 'volume')
+
+    def __init__(self, neurite_type, topology, section_points, section_offsets):
+        """Initialize an ArrayNeurite object.
+
+        Arguments:
+            neurite_type(NeuriteType): type of the neurite
+            topology: neurom.core.Topology of the sections
+            section_points: x, y, z and radius of the points of the sections, concatenated
+            section_offsets: the points of the i-th section are those from
+                ``section_offsets[i]`` to ``section_offsets[i + 1]``
+        """
+        self.type = neurite_type
+        self.topology = topology
+        self.section_points = section_points
+        self.section_offsets = section_offsets
+
+    @classmethod
+    def from_neurite(cls, neurite):
+        """Return the ArrayNeurite of a Neurite, with a copy of the points of its sections.
+
+        An ArrayNeurite is returned as is.
+        """
+        if isinstance(neurite, ArrayNeurite):
+            return neurite
+        points = [section.points[:, COLS.XYZR] for section in neurite.topology.nodes]
+        section_offsets = np.zeros(len(points) + 1, dtype=np.intp)
+        np.cumsum([len(p) for p in points], out=section_offsets[1:])
+        return cls(neurite.type, neurite.topology, np.concatenate(points), section_offsets)
+
+    def map_sections(self, kernel):
+        """Sum the values of a segment kernel of neurom.morphmath over each section.
+
+        Arguments:
+            kernel: function taking an array of points and returning the values of the
+                segments between consecutive points, e.g. neurom.morphmath.segment_areas
+        """
+        segment_offsets, segment_starts = segment_indices(self.section_offsets)
+        return reduce_groups(kernel(self.section_points)[segment_starts], segment_offsets,
+                             empty=0.)
+
+    @cached_property
+    def points(self):
+        """Return unordered array with all the points in this neurite, as Neurite.points."""
+        # the first point of each section but the first one is a duplicate of the last point
+        # of its parent
+        return np.delete(self.section_points, self.section_offsets[1:-1], axis=0)
+
+    @cached_property
+    def section_lengths(self):
+        """Return the length of each section."""
+        return self.map_sections(morphmath.segment_lengths)
+
+    @cached_property
+    def section_path_distances(self):
+        """Return the path distances from the root of this neurite to the end of each section."""
+        return self.topology.accumulate(self.section_lengths)
+
+    @cached_property
+    def point_path_distances(self):
+        """Return the path distances from the root of this neurite to the section points.
+
+        The distances are those of the points of `section_points`.
+        """
+        return _point_path_distances(self.topology, self.section_path_distances,
+                                     self.section_points, np.diff(self.section_offsets))
+
+    @cached_property
+    def length(self):
+        """Return the total length of this neurite."""
+        return np.sum(self.section_lengths)
+
+    @cached_property
+    def area(self):
+        """Return the surface area of this neurite."""
+        return np.sum(self.map_sections(morphmath.segment_areas))
+
+    @cached_property
+    def volume(self):
+        """Return the volume of this neurite."""
+        return np.sum(self.map_sections(morphmath.segment_volumes))
+
+    def __str__(self):
+        """Return a string representation."""
+        return 'ArrayNeurite <type: %s>' % self.type
+
+    __repr__ = __str__
+
+
+def _clear_caches(neuron, neurites, sections):
+    """Clear the cached properties of a neuron and of its neurites and sections."""
+    for section in sections or ():
+        cached_property.clear(section)
+    for neurite in neurites or ():
+        neurite.clear_caches()
+    cached_property.clear(neuron)
+
+
 class Neuron(object):
     """Class representing a simple neuron."""
 
@@ -302,6 +554,22 @@ class Neuron(object):
         self.neurites = neurites
         self.sections = sections
 
+    @cached_property
+    def topology(self):
+        """Return the topology of the sections of all the neurites, neurite after neurite.
+
+        See neurom.core.topology.Topology. It is built on first access and is not updated
+        if the neurites are modified.
+        """
+        return Topology(neurite.root_node for neurite in self.neurites)
+
+    def clear_caches(self):
+        """Clear the cached properties of this neuron, of its neurites and of its sections.
+
+        See Neurite.clear_caches.
+        """
+        _clear_caches(self, self.neurites, self.sections)
+
     def __str__(self):
         """Return a string representation."""
         return 'Neuron <soma: %s, n_neurites: %d>' % \
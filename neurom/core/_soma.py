@@ -113,8 +113,7 @@ class SomaCylinders(Soma):
     def __init__(self, points):
         """Initialize a SomaCyliners object."""
         super().__init__(points)
-        self.area = sum(morphmath.segment_area((p0, p1))
-                        for p0, p1 in zip(points, points[1:]))
+        self.area = np.sum(morphmath.segment_areas(points))
         self.radius = math.sqrt(self.area / (4. * math.pi))
 
     @property
@@ -125,8 +124,7 @@ class SomaCylinders(Soma):
     @property
     def volume(self):
         """Return the volume of soma."""
-        return sum(morphmath.segment_volume((p0, p1))
-                   for p0, p1 in zip(self.points, self.points[1:]))
+        return np.sum(morphmath.segment_volumes(self.points))
 
     def __str__(self):
         """Return a string representation."""
@@ -0,0 +1,303 @@
+# Copyright (c) 2020, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Columnar representation of neuron populations."""
+
+import numpy as np
+
+from neurom import morphmath
+from neurom.core.dataformat import COLS
+from neurom.core.types import NeuriteType
+
+
+def reduce_groups(values, offsets, ufunc=np.add, empty=0):
+    """Reduce the contiguous groups of `values` delimited by `offsets`.
+
+    Arguments:
+        values: array of values, sorted by group
+        offsets: the values of group ``i`` are ``values[offsets[i]:offsets[i + 1]]``
+        ufunc: numpy ufunc reducing the values of each group, e.g. np.add or np.maximum
+        empty: result of the empty groups
+
+    Returns:
+        array with the reduction of each group, ``len(offsets) - 1`` values
+    """
+    values = np.asarray(values)
+    starts, ends = offsets[:-1], offsets[1:]
+    result = np.full(len(starts), empty, dtype=np.result_type(values, empty))
+    nonempty = ends > starts
+    if nonempty.any():
+        # the empty groups are skipped, each remaining group ends where the next one starts
+        result[nonempty] = ufunc.reduceat(values, starts[nonempty])
+    return result
+
+
+def segment_indices(section_offsets):
+    """Segments of sections whose points are concatenated.
+
+    Arguments:
+        section_offsets: the points of section ``i`` are those from ``section_offsets[i]`` to
+            ``section_offsets[i + 1]``
+
+    Returns:
+        tuple (segment_offsets, segment_starts): the segments of section ``i`` are those from
+        ``segment_offsets[i]`` to ``segment_offsets[i + 1]``, and segment ``j`` joins the
+        points ``segment_starts[j]`` and ``segment_starts[j] + 1``
+    """
+    n_segments = np.maximum(np.diff(section_offsets), 1) - 1
+    segment_offsets = np.zeros(len(n_segments) + 1, dtype=np.intp)
+    np.cumsum(n_segments, out=segment_offsets[1:])
+    segment_starts = (np.arange(segment_offsets[-1]) +
+                      np.repeat(section_offsets[:-1] - segment_offsets[:-1], n_segments))
+    return segment_offsets, segment_starts
+
+
+def _mask_offsets(offsets, mask):
+    """Offsets of the groups delimited by `offsets` once the values not in `mask` removed."""
+    return np.concatenate(([0], np.cumsum(mask)))[offsets]
+
+
+def _neuron_columns(neuron):
+    """Arrays of the neurite sections of a neuron, in the order of ColumnarPopulation.
+
+    Returns:
+        tuple with the parents, branch orders, points and numbers of points of the sections,
+        and the types and numbers of sections of the neurites
+
+    The arrays of neurons with `neurite_arrays`, see neurom.fst.FstNeuron, are computed from
+    their data block, so that the sections of lazy neurons are not built.
+    """
+    arrays = getattr(neuron, 'neurite_arrays', None)
+    if arrays is not None:
+        return (arrays.topology.parents, arrays.topology.depths, arrays.points,
+                np.diff(arrays.section_offsets), arrays.neurite_types.tolist(),
+                np.diff(arrays.neurite_offsets).tolist())
+
+    parents, branch_orders, points, neurite_types, n_sections = [], [], [], [], []
+    n_previous = 0
+    for neurite in neuron.neurites:
+        topology = neurite.topology
+        parents.append(np.where(topology.parents >= 0, topology.parents + n_previous, -1))
+        branch_orders.append(topology.depths)
+        points.extend(section.points[:, COLS.XYZR] for section in topology.nodes)
+        neurite_types.append(neurite.type.value)
+        n_sections.append(len(topology))
+        n_previous += len(topology)
+    return (np.concatenate(parents) if parents else np.empty(0, np.intp),
+            np.concatenate(branch_orders) if branch_orders else np.empty(0, np.intp),
+            np.concatenate(points) if points else np.empty((0, 4)),
+            np.array([len(p) for p in points], dtype=np.intp),
+            neurite_types, n_sections)
+
+
+class ColumnarPopulation(object):
+    """Population of neurons stored as flat arrays, for population-wide vectorized features.
+
+    The sections of all the neurons are numbered neuron after neuron, neurite after neurite,
+    in depth-first pre-order, as when iterating over the neurites of a Population. The
+    points of all the sections are concatenated in this order. Ranges of points, segments,
+    sections and neurites are given by offsets arrays: for instance the sections of the
+    ``j``-th neurite are those from ``neurite_offsets[j]`` to ``neurite_offsets[j + 1]``.
+
+    Features are computed for the whole population in one pass, and reduced per section,
+    neurite or neuron with `reduce`. The arrays of FstNeurons are computed from their data
+    block (see neurom.fst.FstNeuron.neurite_arrays): building a ColumnarPopulation from lazy
+    neurons does not build their sections.
+
+    Attributes:
+        name: name of the population
+        names: names of the neurons
+        points: x, y, z and radius of the points of all the sections, concatenated
+        section_offsets: offsets of the points of each section
+        section_parents: index of the parent of each section, -1 for the neurite roots
+        section_branch_orders: number of ancestors of each section in its neurite
+        section_n_children: number of children of each section
+        section_neurites: index of the neurite of each section
+        neurite_offsets: offsets of the sections of each neurite
+        neurite_types: NeuriteType value of each neurite
+        neurite_neurons: index of the neuron of each neurite
+        neuron_offsets: offsets of the neurites of each neuron
+        segment_offsets: offsets of the segments of each section
+        segment_starts: index in `points` of the first point of each segment
+
+    Note:
+        The arrays are a snapshot: they are not updated if the neurons are modified.
+    """
+
+    def __init__(self, neurons, name='Population'):
+        """Build the arrays of `neurons`, which are iterated over once.
+
+        Arguments:
+            neurons: iterable of neurons, e.g. a Population or a LazyPopulation, whose neurons
+                are not referenced afterwards
+            name: name of the population
+        """
+        self.name = name
+        self.names = []
+        points, n_points, parents, branch_orders = [], [], [], []
+        n_neurites, neurite_types, n_sections = [], [], []
+        n_previous = 0
+        for neuron in neurons:
+            self.names.append(neuron.name)
+            columns = _neuron_columns(neuron)
+            parents.append(np.where(columns[0] >= 0, columns[0] + n_previous, -1))
+            branch_orders.append(columns[1])
+            points.append(columns[2])
+            n_points.append(columns[3])
+            neurite_types.extend(columns[4])
+            n_sections.extend(columns[5])
+            n_neurites.append(len(columns[4]))
+            n_previous += len(columns[0])
+
+        self.points = np.concatenate(points) if points else np.empty((0, 4))
+        self.section_parents = np.concatenate(parents) if parents else np.empty(0, np.intp)
+        self.section_branch_orders = (np.concatenate(branch_orders) if branch_orders else
+                                      np.empty(0, np.intp))
+        self.neurite_types = np.array(neurite_types, dtype=np.intp)
+
+        n_points = np.concatenate(n_points) if n_points else np.empty(0, np.intp)
+        self.section_offsets = self._offsets(n_points)
+        self.neurite_offsets = self._offsets(n_sections)
+        self.neuron_offsets = self._offsets(n_neurites)
+        self.section_neurites = np.repeat(np.arange(len(n_sections)), n_sections)
+        self.neurite_neurons = np.repeat(np.arange(len(n_neurites)), n_neurites)
+
+        self.section_n_children = np.bincount(self.section_parents[self.section_parents >= 0],
+                                              minlength=len(n_points))
+
+        self.segment_offsets, self.segment_starts = segment_indices(self.section_offsets)
+
+    @staticmethod
+    def _offsets(counts):
+        """Offsets of consecutive groups of `counts` items."""
+        offsets = np.zeros(len(counts) + 1, dtype=np.intp)
+        np.cumsum(counts, out=offsets[1:])
+        return offsets
+
+    def __len__(self):
+        """Number of neurons."""
+        return len(self.names)
+
+    @property
+    def n_sections(self):
+        """Number of sections of all the neurons."""
+        return len(self.section_parents)
+
+    def neurite_mask(self, neurite_type=NeuriteType.all):
+        """Mask of the neurites of type `neurite_type`."""
+        if neurite_type == NeuriteType.all:
+            return np.ones(len(self.neurite_types), dtype=bool)
+        return self.neurite_types == neurite_type.value
+
+    def section_mask(self, neurite_type=NeuriteType.all):
+        """Mask of the sections of the neurites of type `neurite_type`."""
+        return self.neurite_mask(neurite_type)[self.section_neurites]
+
+    def segment_mask(self, neurite_type=NeuriteType.all):
+        """Mask of the segments of the neurites of type `neurite_type`."""
+        return np.repeat(self.section_mask(neurite_type), np.diff(self.segment_offsets))
+
+    def _group_offsets(self, of, by):
+        """Offsets of the `of` items ('segment' or 'section') of each `by` group."""
+        offsets = {'section': None, 'neurite': self.neurite_offsets,
+                   'neuron': self.neurite_offsets[self.neuron_offsets]}
+        if of not in ('segment', 'section') or by not in offsets or by == of:
+            raise ValueError('Cannot group %ss by %s' % (of, by))
+        offsets = offsets[by]
+        if of == 'segment':
+            offsets = self.segment_offsets if offsets is None else self.segment_offsets[offsets]
+        return offsets
+
+    def reduce(self, values, by='neuron', of='section',  # pylint: disable=too-many-arguments
+               neurite_type=NeuriteType.all, ufunc=np.add, empty=0):
+        """Reduce values given per segment or per section by section, neurite or neuron.
+
+        Arguments:
+            values: one value per segment or per section of the whole population, such as
+                those returned by `segment_lengths` or `section_lengths` with the default
+                `neurite_type`
+            by(str): group of the reduction, 'section' (for segments), 'neurite' or 'neuron'
+            of(str): what `values` are given for, 'segment' or 'section'
+            neurite_type(NeuriteType): only the values of the neurites of this type are
+                reduced
+            ufunc: numpy ufunc reducing the values of each group, e.g. np.add or np.maximum
+            empty: result of the groups without values
+
+        Returns:
+            array with one value per section, neurite or neuron
+
+        Ex:
+            >>> pop = ColumnarPopulation(neurom.load_neurons('some/data/path'))
+            >>> total_lengths = pop.reduce(pop.section_lengths(), by='neuron')
+            >>> max_branch_orders = pop.reduce(pop.section_branch_orders, ufunc=np.maximum)
+        """
+        offsets = self._group_offsets(of, by)
+        values = np.asarray(values)
+        if neurite_type != NeuriteType.all:
+            mask = self.segment_mask(neurite_type) if of == 'segment' else \
+                self.section_mask(neurite_type)
+            values = values[mask]
+            offsets = _mask_offsets(offsets, mask)
+        return reduce_groups(values, offsets, ufunc, empty)
+
+    def map_segments(self, kernel, neurite_type=NeuriteType.all):
+        """Apply a segment kernel of neurom.morphmath to all the segments.
+
+        Arguments:
+            kernel: function taking an array of points and returning the values of the
+                segments between consecutive points, e.g. neurom.morphmath.segment_areas
+            neurite_type(NeuriteType): only the segments of the neurites of this type are used
+
+        Returns:
+            array with one value per segment
+        """
+        values = kernel(self.points)[self.segment_starts]
+        return values if neurite_type == NeuriteType.all else \
+            values[self.segment_mask(neurite_type)]
+
+    def segment_lengths(self, neurite_type=NeuriteType.all):
+        """Lengths of the segments."""
+        return self.map_segments(morphmath.segment_lengths, neurite_type)
+
+    def section_lengths(self, neurite_type=NeuriteType.all):
+        """Lengths of the sections."""
+        lengths = self.reduce(self.segment_lengths(), by='section', of='segment', empty=0.)
+        return lengths if neurite_type == NeuriteType.all else \
+            lengths[self.section_mask(neurite_type)]
+
+    def section_path_distances(self, neurite_type=NeuriteType.all):
+        """Path distances from the neurite roots to the ends of the sections."""
+        distances = self.section_lengths()
+        # the sections are processed level by level, each after its parent
+        by_depth = np.argsort(self.section_branch_orders, kind='stable')
+        level_ends = np.cumsum(np.bincount(self.section_branch_orders))
+        for start, end in zip(level_ends[:-1], level_ends[1:]):
+            level = by_depth[start:end]
+            distances[level] += distances[self.section_parents[level]]
+        return distances if neurite_type == NeuriteType.all else \
+            distances[self.section_mask(neurite_type)]
@@ -28,8 +28,14 @@
 
 """Neuron Population Classes and Functions."""
 
+import logging
+from collections import OrderedDict
 from itertools import chain
 
+from neurom.exceptions import NeuroMError
+
+L = logging.getLogger(__name__)
+
 
 class Population(object):
     """Neuron Population Class.
@@ -47,9 +53,28 @@ class Population(object):
             name: Optional name for this Population.
         """
         self.neurons = tuple(neurons)
-        self.somata = tuple(neu.soma for neu in neurons)
-        self.neurites = tuple(chain.from_iterable(neu.neurites for neu in neurons))
         self.name = name
+        self._neurites = None
+
+    @property
+    def somata(self):
+        """Somata of all the neurons, which are made again by in-place transformations."""
+        return tuple(neu.soma for neu in self.neurons)
+
+    @property
+    def neurites(self):
+        """Neurites of all the neurons, gathered on first access.
+
+        Lazy neurons (see neurom.fst.FstNeuron) build their neurites then.
+        """
+        if self._neurites is None:
+            self._neurites = tuple(chain.from_iterable(neu.neurites for neu in self.neurons))
+        return self._neurites
+
+    def clear_caches(self):
+        """Clear the cached properties of the neurons, see neurom.core.Neuron.clear_caches."""
+        for neuron in self.neurons:
+            neuron.clear_caches()
 
     def __iter__(self):
         """Iterator to populations's neurons."""
@@ -66,3 +91,99 @@ class Population(object):
     def __str__(self):
         """Return a string representation."""
         return 'Population <name: %s, nneurons: %d>' % (self.name, len(self.neurons))
+
+
+class LazyPopulation(object):
+    """Neuron population loading its neurons when they are used.
+
+    It behaves like a Population, but only the `cache_size` neurons used last are kept in
+    memory: iterating over its neurons, neurites or sections loads the neurons one after the
+    other, so the memory used does not depend on the number of neurons.
+
+    Features:
+        - lazy collection of neurites, somata and neurons, see Population.
+        - iterable-like iteration over neurons.
+        - indexing, the neuron is loaded unless it is one of the resident neurons.
+
+    Note:
+        Unlike a Population, whose neurons are the files loaded successfully, its length is
+        the number of files: the neurons raising `ignored_exceptions` are only known, and
+        skipped, when iterating over them.
+    """
+    def __init__(self, files, neuron_loader, name='Population', cache_size=1,
+                 ignored_exceptions=()):
+        """Construct a lazy neuron population.
+
+        Arguments:
+            files: paths to the morphology files
+            neuron_loader: function taking a file path and returning a neuron
+            name: Optional name for this Population.
+            cache_size(int): number of neurons kept in memory
+            ignored_exceptions(tuple): NeuroMError subclasses raised by the loader for which
+                the neuron is skipped when iterating, indexing it still raises them
+        """
+        self.files = tuple(files)
+        self.name = name
+        self.cache_size = cache_size
+        self.ignored_exceptions = tuple(ignored_exceptions)
+        self._neuron_loader = neuron_loader
+        self._resident = OrderedDict()
+
+    @property
+    def neurons(self):
+        """The population itself, whose iteration yields its neurons."""
+        return self
+
+    @property
+    def somata(self):
+        """Iterator to the somata of the neurons."""
+        return (neu.soma for neu in self)
+
+    @property
+    def neurites(self):
+        """Iterator to the neurites of the neurons."""
+        return chain.from_iterable(neu.neurites for neu in self)
+
+    def clear_caches(self):
+        """Clear the cached properties of the resident neurons.
+
+        The other neurons are loaded again when used, without the values cached before.
+        """
+        for neuron in self._resident.values():
+            neuron.clear_caches()
+
+    def __iter__(self):
+        """Iterator to populations's neurons, skipping those raising ignored exceptions."""
+        for i, filename in enumerate(self.files):
+            try:
+                yield self[i]
+            except NeuroMError as e:
+                if not isinstance(e, self.ignored_exceptions):
+                    raise
+                L.info('Ignoring exception "%s" for file %s', e, filename)
+
+    def __len__(self):
+        """Number of morphology files, including those skipped when iterating."""
+        return len(self.files)
+
+    def __getitem__(self, idx):
+        """Get neuron at index idx, or a lazy population if idx is a slice."""
+        if isinstance(idx, slice):
+            return LazyPopulation(self.files[idx], self._neuron_loader, self.name,
+                                  self.cache_size, self.ignored_exceptions)
+
+        idx = range(len(self.files))[idx]
+        if idx in self._resident:
+            self._resident.move_to_end(idx)
+            return self._resident[idx]
+
+        neuron = self._neuron_loader(self.files[idx])
+        if self.cache_size > 0:
+            self._resident[idx] = neuron
+            if len(self._resident) > self.cache_size:
+                self._resident.popitem(last=False)
+        return neuron
+
+    def __str__(self):
+        """Return a string representation."""
+        return 'LazyPopulation <name: %s, nneurons: %d>' % (self.name, len(self.files))
@@ -0,0 +1,107 @@
+# Copyright (c) 2020, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+from pathlib import Path
+
+import numpy as np
+from nose import tools as nt
+from numpy.testing import assert_allclose, assert_array_equal
+
+import neurom as nm
+from neurom import NeuriteType
+from neurom.core.columnar import ColumnarPopulation, reduce_groups
+from neurom.features import neuritefunc as nf
+
+DATA_PATH = Path(__file__).parent.parent.parent.parent / 'test_data'
+POP = nm.load_neurons(Path(DATA_PATH, 'valid_set'))
+COLUMNS = ColumnarPopulation(POP, name=POP.name)
+
+
+def test_reduce_groups():
+    offsets = np.array([0, 2, 2, 5, 6])
+    values = np.array([1., 2., 3., 4., 5., 6.])
+    assert_array_equal(reduce_groups(values, offsets), [3., 0., 12., 6.])
+    assert_array_equal(reduce_groups(values, offsets, np.maximum, np.nan), [2., np.nan, 5., 6.])
+    assert_array_equal(reduce_groups([], np.zeros(3, dtype=int)), [0, 0])
+
+
+def test_arrays():
+    nt.eq_(len(COLUMNS), len(POP))
+    nt.eq_(COLUMNS.names, [neuron.name for neuron in POP])
+    neurites = list(POP.neurites)
+    sections = [section for neurite in neurites for section in neurite.topology.nodes]
+    nt.eq_(COLUMNS.n_sections, len(sections))
+    assert_array_equal(COLUMNS.neurite_types, [neurite.type.value for neurite in neurites])
+    assert_array_equal(np.diff(COLUMNS.neuron_offsets), [len(n.neurites) for n in POP])
+    assert_array_equal(COLUMNS.section_branch_orders, nf.section_branch_orders(POP))
+    assert_array_equal(COLUMNS.section_n_children,
+                       [len(section.children) for section in sections])
+    for i in (0, 10, len(sections) - 1):
+        points = COLUMNS.points[COLUMNS.section_offsets[i]:COLUMNS.section_offsets[i + 1]]
+        assert_array_equal(points, sections[i].points[:, :4])
+        parent = COLUMNS.section_parents[i]
+        nt.eq_(sections[parent] if parent >= 0 else None, sections[i].parent)
+
+
+def test_features():
+    for neurite_type in (NeuriteType.all, NeuriteType.axon, NeuriteType.apical_dendrite):
+        assert_allclose(COLUMNS.segment_lengths(neurite_type),
+                        nf.segment_lengths(POP, neurite_type))
+        assert_allclose(COLUMNS.map_segments(nm.morphmath.segment_areas, neurite_type),
+                        nf.segment_areas(POP, neurite_type))
+        assert_allclose(COLUMNS.section_lengths(neurite_type),
+                        list(nf.section_lengths(POP, neurite_type)))
+        assert_allclose(COLUMNS.section_path_distances(neurite_type),
+                        nf.section_path_lengths(POP, neurite_type))
+
+
+def test_reduce():
+    for neurite_type in (NeuriteType.all, NeuriteType.basal_dendrite):
+        total_lengths = nf.total_length(POP, neurite_type)
+        assert_allclose(COLUMNS.reduce(COLUMNS.section_lengths(), neurite_type=neurite_type),
+                        total_lengths)
+        assert_allclose(COLUMNS.reduce(COLUMNS.segment_lengths(), of='segment',
+                                       neurite_type=neurite_type),
+                        total_lengths)
+        assert_array_equal(COLUMNS.reduce(np.ones(COLUMNS.n_sections), neurite_type=neurite_type),
+                           nf.number_of_sections(POP, neurite_type))
+
+    assert_allclose(COLUMNS.reduce(COLUMNS.section_lengths(), by='neurite'),
+                    [neurite.length for neurite in POP.neurites])
+    assert_allclose(COLUMNS.reduce(COLUMNS.segment_lengths(), by='section', of='segment'),
+                    COLUMNS.section_lengths())
+    assert_array_equal(COLUMNS.reduce(COLUMNS.section_branch_orders, ufunc=np.maximum),
+                       [max(nf.section_branch_orders(neuron)) for neuron in POP])
+    nt.assert_raises(ValueError, COLUMNS.reduce, COLUMNS.section_lengths(), by='section')
+
+
+def test_empty():
+    columns = ColumnarPopulation([])
+    nt.eq_(len(columns), 0)
+    assert_array_equal(columns.section_lengths(), [])
+    assert_array_equal(columns.section_path_distances(), [])
+    assert_array_equal(columns.reduce([]), [])
@@ -32,7 +32,7 @@ import numpy as np
 from nose import tools as nt
 
 import neurom as nm
-from neurom.core import Neurite, Section
+from neurom.core import ArrayNeurite, Neurite, Section
 
 RADIUS = 4.
 POINTS0 = np.array([[0., 0., 0., RADIUS],
@@ -64,6 +64,12 @@ def test_init():
     nt.eq_(len(nrt.points), 13)
 
 
+def test_points():
+    nrt = Neurite(ROOT_NODE)
+    np.testing.assert_array_equal(nrt.points, np.concatenate((POINTS0, POINTS1[1:])))
+    nt.ok_(nrt.points is nrt.points)
+
+
 def test_neurite_type():
     root_node = Section(POINTS0, section_type=nm.AXON)
     nrt = Neurite(root_node)
@@ -103,3 +109,58 @@ def test_str():
 def test_neurite_hash():
     nrt = Neurite(ROOT_NODE)
     nt.eq_(hash(nrt), hash((nrt.type, nrt.root_node)))
+
+
+def test_path_distances():
+    root_node = Section(POINTS0)
+    root_node.add_child(Section(POINTS1))
+    root_node.add_child(Section(POINTS1[:3]))
+    nrt = Neurite(root_node)
+    np.testing.assert_allclose(nrt.section_path_distances, [6., 12., 8.])
+    np.testing.assert_allclose(nrt.point_path_distances,
+                               [0., 1., 2., 3., 4., 5., 6.,
+                                6., 7., 8., 9., 10., 11., 12.,
+                                6., 7., 8.])
+
+
+def test_cache_invalidation():
+    root_node = Section(POINTS0.copy())
+    child = root_node.add_child(Section(POINTS1))
+    nrt = Neurite(root_node)
+    nt.assert_almost_equal(nrt.length, REF_LEN)
+    nt.assert_almost_equal(nrt.area, 2 * math.pi * RADIUS * REF_LEN)
+    version = root_node.points_version
+
+    child.points = POINTS1[:4]
+    nt.assert_not_equal(root_node.points_version, version)
+    nt.assert_almost_equal(nrt.length, 9.)
+    nt.eq_(len(nrt.points), 10)
+    np.testing.assert_allclose(nrt.section_path_distances, [6., 9.])
+
+    root_node.points[:, 3] = 2 * RADIUS
+    nt.assert_almost_equal(nrt.area, 2 * math.pi * RADIUS * 9.)
+    nt.assert_almost_equal(root_node.area, 2 * math.pi * RADIUS * 6.)
+    nrt.clear_caches()
+    nt.assert_almost_equal(nrt.area, 2 * math.pi * RADIUS * 15.)
+
+    moved = nrt.transform(lambda xyz: xyz * 2)
+    nt.assert_almost_equal(moved.length, 18.)
+    nt.assert_almost_equal(nrt.length, 9.)
+
+
+def test_array_neurite():
+    root_node = Section(POINTS0, section_type=nm.AXON)
+    root_node.add_child(Section(POINTS1))
+    root_node.add_child(Section(POINTS1[:3]))
+    nrt = Neurite(root_node)
+    array_nrt = ArrayNeurite.from_neurite(nrt)
+    nt.ok_(ArrayNeurite.from_neurite(array_nrt) is array_nrt)
+    nt.eq_(array_nrt.type, nm.AXON)
+    np.testing.assert_array_equal(array_nrt.section_points,
+                                  np.concatenate((POINTS0, POINTS1, POINTS1[:3])))
+    np.testing.assert_array_equal(array_nrt.section_offsets, [0, 7, 14, 17])
+    np.testing.assert_allclose(array_nrt.section_lengths, [6., 6., 2.])
+    for attribute in ('points', 'section_path_distances', 'point_path_distances',
+                      'length', 'area', 'volume'):
+        np.testing.assert_allclose(getattr(array_nrt, attribute), getattr(nrt, attribute))
+    nt.ok_('ArrayNeurite' in str(array_nrt))
@@ -28,9 +28,12 @@
 
 from pathlib import Path
 
+import numpy as np
+from mock import Mock
 from nose import tools as nt
-from neurom.core.population import Population
-from neurom import load_neuron
+from neurom.core.population import LazyPopulation, Population
+from neurom.exceptions import SomaError
+from neurom import features, iter_sections, load_neuron
 
 DATA_PATH = Path(__file__).parent.parent.parent.parent / 'test_data'
 
@@ -38,6 +41,8 @@ NRN1 = load_neuron(Path(DATA_PATH, 'swc/Neuron.swc'))
 NRN2 = load_neuron(Path(DATA_PATH, 'swc/Single_basal.swc'))
 NRN3 = load_neuron(Path(DATA_PATH, 'swc/Neuron_small_radius.swc'))
 
+FILES = [Path(DATA_PATH, 'swc', name)
+         for name in ('Neuron.swc', 'Single_basal.swc', 'Neuron_small_radius.swc')]
 NEURONS = [NRN1, NRN2, NRN3]
 TOT_NEURITES = sum(len(N.neurites) for N in NEURONS)
 POP = Population(NEURONS, name='foo')
@@ -77,3 +82,65 @@ def test_getitem():
 
 def test_str():
     nt.ok_('Population' in str(POP))
+
+
+def test_lazy_population():
+    loader = Mock(side_effect=load_neuron)
+    pop = LazyPopulation(FILES, loader, name='foo', cache_size=2)
+    nt.eq_(loader.call_count, 0)
+    nt.eq_(len(pop), 3)
+    nt.eq_(pop.name, 'foo')
+    nt.ok_('LazyPopulation' in str(pop))
+
+    nt.eq_([n.name for n in pop], [n.name for n in NEURONS])
+    nt.eq_(loader.call_count, 3)
+    nt.eq_(sum(1 for _ in pop.neurites), TOT_NEURITES)
+    nt.eq_(sum(1 for _ in pop.somata), 3)
+    nt.eq_(len(pop.neurons), 3)
+
+    # only the last 2 neurons are resident
+    loader.reset_mock()
+    nt.ok_(pop[-1] is pop[2])
+    nt.ok_(pop[1] is pop[1])
+    nt.eq_(loader.call_count, 0)
+    pop[0]
+    nt.eq_(loader.call_count, 1)
+    pop[2]
+    nt.eq_(loader.call_count, 2)
+    nt.assert_raises(IndexError, pop.__getitem__, 3)
+
+    sub_pop = pop[1:]
+    nt.ok_(isinstance(sub_pop, LazyPopulation))
+    nt.eq_([n.name for n in sub_pop], [n.name for n in NEURONS[1:]])
+
+    for feature in ('section_lengths', 'total_length', 'soma_radii'):
+        np.testing.assert_array_equal(features.get(feature, pop), features.get(feature, POP))
+    nt.eq_(sum(1 for _ in iter_sections(pop)), sum(1 for _ in iter_sections(POP)))
+
+
+def test_lazy_population_ignored_exceptions():
+    no_soma_file = Path(DATA_PATH, 'swc', 'Single_apical_no_soma.swc')
+    files = [FILES[0], no_soma_file, FILES[1]]
+    pop = LazyPopulation(files, load_neuron, ignored_exceptions=(SomaError, ))
+    nt.eq_([n.name for n in pop], [n.name for n in NEURONS[:2]])
+    nt.assert_raises(SomaError, pop.__getitem__, 1)
+    nt.assert_raises(SomaError, list, LazyPopulation(files, load_neuron))
+
+
+def test_clear_caches():
+    neuron = load_neuron(Path(DATA_PATH, 'swc/Neuron.swc'))
+    pop = Population([neuron])
+    section = neuron.sections[0]
+    length, n_points = section.length, len(neuron.points)
+    section.points[:, :3] *= 2
+    nt.assert_equal(section.length, length)
+    pop.clear_caches()
+    nt.assert_almost_equal(section.length, 2 * length)
+    nt.assert_equal(len(neuron.points), n_points)
+
+    lazy_pop = LazyPopulation(FILES, load_neuron)
+    neuron = lazy_pop[0]
+    length = neuron.neurites[0].length
+    neuron.neurites[0].root_node.points[:, :3] *= 2
+    lazy_pop.clear_caches()
+    nt.assert_true(neuron.neurites[0].length > length)
@@ -88,4 +88,14 @@ def test_section_volume():
     nt.assert_almost_equal(sec.volume, volume)
 
 
-
+def test_section_points_reassigned():
+    sec = Section(POINTS.copy())
+    nt.assert_almost_equal(sec.length, REF_LEN)
+    sec.points = sec.points[:4]
+    nt.assert_almost_equal(sec.length, 3.)
+    nt.assert_almost_equal(sec.volume, math.pi * RADIUS * RADIUS * 3.)
+
+    sec.points[:, :3] *= 2
+    nt.assert_almost_equal(sec.length, 3.)
+    sec.points_changed()
+    nt.assert_almost_equal(sec.length, 6.)
@@ -0,0 +1,147 @@
+# Copyright (c) 2020, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from pathlib import Path
+
+import numpy as np
+from nose import tools as nt
+from numpy.testing import assert_array_equal
+
+import neurom as nm
+from neurom.core.topology import Topology
+from neurom.core.tree import Tree
+
+DATA_PATH = Path(__file__).parent.parent.parent.parent / 'test_data'
+NRN = nm.load_neuron(Path(DATA_PATH, 'swc', 'Neuron.swc'))
+
+#         T0              T10
+#       /    \             |
+#     T1      T4          T11
+#    /  \   /  |  \
+#   T2  T3 T5  T6  T7
+T0 = Tree()
+T1 = T0.add_child(Tree())
+T2 = T1.add_child(Tree())
+T3 = T1.add_child(Tree())
+T4 = T0.add_child(Tree())
+T5 = T4.add_child(Tree())
+T6 = T4.add_child(Tree())
+T7 = T4.add_child(Tree())
+T10 = Tree()
+T11 = T10.add_child(Tree())
+
+
+def test_topology():
+    topology = Topology([T0, T10])
+    nt.eq_(len(topology), 10)
+    nt.eq_(topology.nodes, (T0, T1, T2, T3, T4, T5, T6, T7, T10, T11))
+    assert_array_equal(topology.parents, [-1, 0, 1, 1, 0, 4, 4, 4, -1, 8])
+    assert_array_equal(topology.depths, [0, 1, 2, 2, 1, 2, 2, 2, 0, 1])
+    assert_array_equal(topology.subtree_sizes, [8, 3, 1, 1, 4, 1, 1, 1, 2, 1])
+    assert_array_equal(topology.strahler_orders, [3, 2, 1, 1, 2, 1, 1, 1, 1, 1])
+    assert_array_equal(topology.n_children, [2, 2, 0, 0, 3, 0, 0, 0, 1, 0])
+    assert_array_equal(topology.children_offsets, [0, 2, 4, 4, 4, 7, 7, 7, 7, 8, 8])
+    assert_array_equal(topology.children, [1, 4, 2, 3, 5, 6, 7, 9])
+    assert_array_equal(topology.children_of(4), [5, 6, 7])
+    assert_array_equal(topology.children_of(2), [])
+    assert_array_equal(topology.preorder, np.arange(10))
+    assert_array_equal(topology.postorder, [2, 3, 1, 5, 6, 7, 4, 0, 9, 8])
+    assert_array_equal(topology.leaf_mask, [0, 0, 1, 1, 0, 1, 1, 1, 0, 1])
+    assert_array_equal(topology.bifurcation_mask, [1, 1, 0, 0, 0, 0, 0, 0, 0, 0])
+    assert_array_equal(topology.forking_mask, [1, 1, 0, 0, 1, 0, 0, 0, 0, 0])
+
+
+def test_topology_from_parents():
+    ref = Topology([T0, T10])
+    # T0, T10, T1, T4, T11, T2, T3, T5, T6, T7
+    parents = [-1, -1, 0, 0, 1, 2, 2, 3, 3, 3]
+    topology, order = Topology.from_parents(parents)
+    nt.ok_(topology.nodes is None)
+    nt.eq_(len(topology), 10)
+    assert_array_equal(order, [0, 2, 5, 6, 3, 7, 8, 9, 1, 4])
+    for attribute in ('parents', 'depths', 'subtree_sizes', 'children_offsets', 'children',
+                      'postorder', 'leaf_mask', 'bifurcation_mask', 'strahler_orders'):
+        assert_array_equal(getattr(topology, attribute), getattr(ref, attribute))
+
+    topology, order = Topology.from_parents(parents, roots=[1])
+    assert_array_equal(order, [1, 4])
+    assert_array_equal(topology.parents, [-1, 0])
+
+    topology, order = Topology.from_parents([])
+    nt.eq_(len(topology), 0)
+    nt.eq_(len(order), 0)
+    nt.assert_raises(ValueError, Topology.from_parents, [1, 2, 0, -1])
+
+
+def test_accumulate():
+    topology = Topology([T0, T10])
+    assert_array_equal(topology.accumulate(np.arange(10)), [0, 1, 3, 4, 4, 9, 10, 11, 8, 17])
+    nt.eq_(len(Topology([]).accumulate([])), 0)
+
+
+def test_split():
+    topology = Topology([T0, T10])
+    first, second = topology.split(np.array([0, 8, 10]))
+    nt.eq_(first.nodes, (T0, T1, T2, T3, T4, T5, T6, T7))
+    nt.eq_(second.nodes, (T10, T11))
+    for split, ref in ((first, Topology([T0])), (second, Topology([T10]))):
+        for attribute in ('parents', 'depths', 'subtree_sizes', 'children_offsets', 'children',
+                          'postorder', 'leaf_mask', 'bifurcation_mask', 'strahler_orders'):
+            assert_array_equal(getattr(split, attribute), getattr(ref, attribute))
+
+    split, = Topology.from_parents([-1, 0, -1])[0].split(np.array([2, 3]))
+    nt.ok_(split.nodes is None)
+    assert_array_equal(split.parents, [-1])
+
+
+def test_topology_empty():
+    topology = Topology([])
+    nt.eq_(len(topology), 0)
+    nt.eq_(len(topology.postorder), 0)
+    nt.eq_(len(topology.children), 0)
+    assert_array_equal(topology.children_offsets, [0])
+
+
+def test_topology_matches_iterators():
+    for topology, roots in ((NRN.topology, [n.root_node for n in NRN.neurites]),
+                            (NRN.neurites[0].topology, [NRN.neurites[0].root_node])):
+        nt.eq_(list(topology.nodes), [s for r in roots for s in r.ipreorder()])
+        nt.eq_([topology.nodes[i] for i in topology.postorder],
+               [s for r in roots for s in r.ipostorder()])
+        nt.eq_([topology.nodes[i] for i in np.flatnonzero(topology.leaf_mask)],
+               [s for r in roots for s in r.ileaf()])
+        nt.eq_([topology.nodes[i] for i in np.flatnonzero(topology.bifurcation_mask)],
+               [s for r in roots for s in r.ibifurcation_point()])
+        for i, section in enumerate(topology.nodes):
+            nt.eq_([topology.nodes[c] for c in topology.children_of(i)], section.children)
+            nt.eq_(topology.depths[i], len(list(section.iupstream())) - 1)
+
+
+def test_topology_is_cached():
+    nt.ok_(NRN.topology is NRN.topology)
+    nt.ok_(NRN.neurites[0].topology is NRN.neurites[0].topology)
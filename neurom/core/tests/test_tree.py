@@ -26,9 +26,11 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import copy
+import pickle
 import sys
 from nose import tools as nt
-from neurom.core.tree import Tree
+from neurom.core.tree import Tree, _NO_CHILDREN
 
 REF_TREE = Tree()
 T11 = REF_TREE.add_child(Tree())
@@ -71,6 +73,26 @@ def test_add_child():
     nt.ok_(t.children == [ch11, ch22])
 
 
+def test_leaves_share_children():
+    t1, t2 = Tree(), Tree()
+    nt.assert_true(t1.children is t2.children is _NO_CHILDREN)
+    nt.assert_equal(t1.children, [])
+    nt.assert_raises(TypeError, t1.children.append, t2)
+    nt.assert_raises(TypeError, t1.children.extend, [t2])
+    nt.assert_raises(TypeError, t1.children.__setitem__, slice(None), [t2])
+    nt.assert_equal(_NO_CHILDREN, [])
+    nt.assert_false(hasattr(t1, '__dict__'))
+
+    t1.add_child(t2)
+    nt.assert_equal(t1.children, [t2])
+    nt.assert_true(t2.children is _NO_CHILDREN)
+    nt.assert_true(copy.copy(_NO_CHILDREN) is _NO_CHILDREN)
+    for tree in (copy.deepcopy(t1), pickle.loads(pickle.dumps(t1))):
+        nt.assert_equal(len(tree.children), 1)
+        nt.assert_true(tree.children[0].parent is tree)
+        nt.assert_true(tree.children[0].children is _NO_CHILDREN)
+
+
 def test_parent():
     t = Tree()
     for i in range(10):
@@ -0,0 +1,268 @@
+# Copyright (c) 2020, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Array representation of the topology of trees."""
+
+from itertools import chain
+
+import numpy as np
+
+from neurom.utils import cached_property
+
+
+def _levels(depths):
+    """Iterate over the arrays of indices of the nodes at each depth, deepest first."""
+    deepest_first = np.argsort(depths, kind='stable')[::-1]
+    level_ends = np.cumsum(np.bincount(depths)[::-1])
+    return (deepest_first[start:end]
+            for start, end in zip(chain((0, ), level_ends[:-1]), level_ends))
+
+
+def _subtree_sizes(parents, depths):
+    """Number of nodes in the subtree of each node, including itself."""
+    sizes = np.ones(len(parents), dtype=np.intp)
+    for level in _levels(depths):
+        level = level[parents[level] >= 0]
+        np.add.at(sizes, parents[level], sizes[level])
+    return sizes
+
+
+def _preceding_siblings_sizes(parents, sizes):
+    """Sum of the `sizes` of the siblings preceding each node, the roots being siblings."""
+    by_parent = np.argsort(parents, kind='stable')
+    group_starts = np.flatnonzero(np.diff(parents[by_parent], prepend=-2))
+    group_sizes = np.diff(np.append(group_starts, len(parents)))
+    preceding = np.cumsum(sizes[by_parent]) - sizes[by_parent]
+    preceding -= np.repeat(preceding[group_starts], group_sizes)
+    result = np.empty(len(parents), dtype=np.intp)
+    result[by_parent] = preceding
+    return result
+
+
+def _depths(parents):
+    """Depth and root of each node of a forest, given the parent of each node.
+
+    The ancestors are found by pointer jumping: each pass doubles the distance from the
+    nodes to the ancestors they point to, until these are the roots.
+    """
+    depths = (parents >= 0).astype(np.intp)
+    ancestors = np.where(parents >= 0, parents, np.arange(len(parents)))
+    active = np.flatnonzero(ancestors[ancestors] != ancestors)
+    for _ in range(len(parents).bit_length() + 1):
+        if active.size == 0:
+            return depths, ancestors
+        up = ancestors[active]
+        depths[active] += depths[up]
+        ancestors[active] = ancestors[up]
+        active = active[ancestors[ancestors[active]] != ancestors[active]]
+    raise ValueError('The parents have cycles')
+
+
+class Topology(object):
+    """Topology of a forest of trees, as arrays indexed by tree node.
+
+    The nodes are numbered in depth-first pre-order, tree after tree, so that
+    ``nodes[i]`` is the node described by the i-th entry of all the arrays.
+
+    Attributes:
+        nodes: tuple of the tree nodes, in pre-order, None if built with `from_parents`
+        parents: index of the parent of each node, -1 for the roots
+        children_offsets, children: children in compressed sparse row form, the children
+            of node ``i`` are ``children[children_offsets[i]:children_offsets[i + 1]]``,
+            in the order of ``nodes[i].children``
+        n_children: number of children of each node
+        depths: number of ancestors of each node, 0 for the roots
+        subtree_sizes: number of nodes in the subtree of each node, itself included
+        preorder: indices of the nodes in depth-first pre-order
+        postorder: indices of the nodes in depth-first post-order
+        leaf_mask: mask of the nodes without children
+        bifurcation_mask: mask of the nodes with exactly two children
+        forking_mask: mask of the nodes with more than one child
+
+    Note:
+        The topology is a snapshot: it is not updated if the trees are modified.
+    """
+
+    def __init__(self, roots):
+        """Build the topology of the trees starting at `roots`."""
+        nodes = []
+        parents = []
+        depths = []
+        for root in roots:
+            stack = [(root, -1, 0)]
+            while stack:
+                node, parent, depth = stack.pop()
+                index = len(nodes)
+                nodes.append(node)
+                parents.append(parent)
+                depths.append(depth)
+                stack.extend((child, index, depth + 1) for child in reversed(node.children))
+
+        self.nodes = tuple(nodes)
+        self._set_arrays(np.array(parents, dtype=np.intp), np.array(depths, dtype=np.intp))
+
+    @classmethod
+    def from_parents(cls, parents, roots=None):
+        """Build the topology of a forest from the parent of each node, without node objects.
+
+        The roots, and the children of each node, are ordered by increasing index in
+        `parents`, as in a tree whose nodes are added as children in index order. All the
+        arrays are computed with vectorized passes, one per depth level at most.
+
+        Arguments:
+            parents: index of the parent of each node, -1 for the roots
+            roots: indices of the roots of the trees to keep, the nodes of the other trees are
+                not in the topology. By default all the trees are kept.
+
+        Returns:
+            tuple (topology, order) where `topology.nodes` is None and ``order[i]`` is the
+            index in `parents` of the i-th node of the topology
+
+        Raises:
+            ValueError if `parents` has cycles
+        """
+        parents = np.asarray(parents, dtype=np.intp)
+        depths, tree_roots = _depths(parents)
+        indices = np.arange(len(parents))
+        if roots is not None:
+            indices = np.flatnonzero(np.isin(tree_roots, roots))
+            new_indices = np.full(len(parents) + 1, -1, dtype=np.intp)
+            new_indices[indices] = np.arange(len(indices))
+            # -1 parents are mapped to the last entry, which stays -1
+            parents = new_indices[parents[indices]]
+            depths = depths[indices]
+
+        sizes = _subtree_sizes(parents, depths)
+        # a node comes after its parent and the subtrees of its preceding siblings
+        positions = _preceding_siblings_sizes(parents, sizes)
+        for level in reversed(list(_levels(depths))[:-1]):
+            positions[level] += positions[parents[level]] + 1
+
+        order = np.empty(len(parents), dtype=np.intp)
+        order[positions] = np.arange(len(parents))
+        topology = cls.__new__(cls)
+        topology.nodes = None
+        topology._set_arrays(  # pylint: disable=protected-access
+            np.where(parents[order] >= 0, positions[parents[order]], -1), depths[order],
+            sizes[order])
+        return topology, indices[order]
+
+    def split(self, offsets):
+        """Split the forest into the topologies of groups of consecutive trees.
+
+        Arguments:
+            offsets: the nodes of the i-th group are those from ``offsets[i]`` to
+                ``offsets[i + 1]``, each group starting at a root and ending before one
+
+        Returns:
+            list of the topologies of the groups, in which the nodes are numbered from 0
+        """
+        topologies = []
+        for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+            parents = self.parents[start:end]
+            topology = Topology.__new__(Topology)
+            topology.nodes = None if self.nodes is None else self.nodes[start:end]
+            topology._set_arrays(  # pylint: disable=protected-access
+                np.where(parents >= 0, parents - start, -1), self.depths[start:end],
+                self.subtree_sizes[start:end])
+            topologies.append(topology)
+        return topologies
+
+    def _set_arrays(self, parents, depths, subtree_sizes=None):
+        """Set the arrays from the parents and depths of the nodes, in pre-order."""
+        n_nodes = len(parents)
+        self.parents = parents
+        self.depths = depths
+
+        has_parent = self.parents >= 0
+        self.n_children = np.bincount(self.parents[has_parent], minlength=n_nodes)
+        self.children_offsets = np.zeros(n_nodes + 1, dtype=np.intp)
+        np.cumsum(self.n_children, out=self.children_offsets[1:])
+        # a stable sort keeps the children of each node in pre-order, i.e. in their order
+        self.children = np.flatnonzero(has_parent)[
+            np.argsort(self.parents[has_parent], kind='stable')]
+
+        self.preorder = np.arange(n_nodes)
+        # nodes finishing before i in post-order: the nodes preceding it in pre-order, except
+        # its ancestors, and its descendants
+        self.subtree_sizes = (_subtree_sizes(parents, depths) if subtree_sizes is None else
+                              subtree_sizes)
+        postorder_position = self.preorder - self.depths + self.subtree_sizes - 1
+        self.postorder = np.empty(n_nodes, dtype=np.intp)
+        self.postorder[postorder_position] = self.preorder
+
+        self.leaf_mask = self.n_children == 0
+        self.bifurcation_mask = self.n_children == 2
+        self.forking_mask = self.n_children > 1
+
+    def __len__(self):
+        """Number of nodes."""
+        return len(self.parents)
+
+    def _levels(self):
+        """Iterate over the arrays of indices of the nodes at each depth, deepest first."""
+        return _levels(self.depths)
+
+    @cached_property
+    def strahler_orders(self):
+        """Strahler order of each node.
+
+        See neurom.features.sectionfunc.strahler_order for the definition.
+        """
+        orders = np.ones(len(self), dtype=np.intp)
+        max_child_orders = np.zeros(len(self), dtype=np.intp)
+        n_max_children = np.zeros(len(self), dtype=np.intp)
+        for level in self._levels():
+            # all the children of the nodes of this level were processed with the previous level
+            parents = level[~self.leaf_mask[level]]
+            orders[parents] = max_child_orders[parents] + (n_max_children[parents] > 1)
+
+            level = level[self.parents[level] >= 0]
+            parents = self.parents[level]
+            np.maximum.at(max_child_orders, parents, orders[level])
+            np.add.at(n_max_children, parents, orders[level] == max_child_orders[parents])
+        return orders
+
+    def accumulate(self, values):
+        """Sum `values` from the roots down to each node.
+
+        Arguments:
+            values: one value per node
+
+        Returns:
+            for each node, the sum of the values of the node and of all its ancestors
+        """
+        sums = np.array(values, dtype=float)
+        levels = list(self._levels())
+        for level in reversed(levels[:-1]):
+            sums[level] += sums[self.parents[level]]
+        return sums
+
+    def children_of(self, index):
+        """Indices of the children of the `index`-th node."""
+        return self.children[self.children_offsets[index]:self.children_offsets[index + 1]]
@@ -30,12 +30,47 @@
 from collections import deque
 
 
+class _EmptyChildren(list):
+    """Immutable empty list, the children of all the trees without children."""
+
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        """Raise: this list is shared by all the leaves, it must stay empty."""
+        raise TypeError('The children of a leaf cannot be modified in place, use add_child')
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+
+    def __copy__(self):
+        """Return the shared instance."""
+        return self
+
+    def __deepcopy__(self, memo):
+        """Return the shared instance."""
+        return self
+
+    def __reduce__(self):
+        """Unpickle to the shared instance."""
+        return '_NO_CHILDREN'
+
+
+_NO_CHILDREN = _EmptyChildren()
+
+
 class Tree(object):
-    """Simple recursive tree class."""
+    """Simple recursive tree class.
+
+    Trees use __slots__ rather than a __dict__, and share the same empty list of children
+    until their first child is added, so that large trees take little memory.
+    """
+
+    __slots__ = ('parent', 'children')
+
     def __init__(self):
         """Initialize a Tree object."""
         self.parent = None
-        self.children = list()
+        self.children = _NO_CHILDREN
 
     def add_child(self, tree):
         """Add a child to the list of this tree's children.
@@ -43,7 +78,10 @@ class Tree(object):
         This tree becomes the added tree's parent
         """
         tree.parent = self
-        self.children.append(tree)
+        if self.children is _NO_CHILDREN:
+            self.children = [tree]
+        else:
+            self.children.append(tree)
         return tree
 
     def is_forking_point(self):
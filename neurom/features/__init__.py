@@ -64,7 +64,7 @@ def register_neurite_feature(name, func):
         """Wrap neurite function from outer scope and map into list."""
         return list(func(n) for n in _ineurites(neurites, filt=_is_type(neurite_type)))
 
-    _register_feature('NEURITEFEATURES', name, _fun, shape=(...,))
+    _register_feature('NEURITEFEATURES', name, _fun, shape=(...,), per_neurite=True)
 
 
 def _find_feature_func(feature_name):
@@ -105,6 +105,66 @@ def get(feature_name, obj, **kwargs):
     return _get_feature_value_and_func(feature_name, obj, **kwargs)[0]
 
 
+def _get_per_neurite_values(feats, obj, neurite_types, kwargs):
+    """Values of the per-neurite features `feats` for each neurite of `obj`.
+
+    The neurites are iterated once, so that the neurons of a LazyPopulation are loaded once,
+    and the neurites of lazy neurons are not built, see neurom.core.iter_neurites.
+
+    Returns:
+        tuple (values, selected) of dicts: `values` maps the feature names to the list of
+        their values for each neurite, `selected` maps the neurite types to the list telling
+        whether each neurite is of that type
+    """
+    values = {name: [] for name in feats}
+    selected = {neurite_type: [] for neurite_type in neurite_types}
+    if feats:
+        type_checkers = {neurite_type: _is_type(neurite_type) for neurite_type in neurite_types}
+        for neurite in _ineurites(obj, arrays=True):
+            for neurite_type, is_type in type_checkers.items():
+                selected[neurite_type].append(is_type(neurite))
+            for name, feat in feats.items():
+                values[name].append(np.array(list(feat(neurite, **kwargs))))
+    return values, selected
+
+
+def get_many(feature_names, obj, neurite_types=(_ntype.all, ), **kwargs):
+    """Obtain several features for several neurite types at once.
+
+    This gives the same values as calling get() for each feature and neurite type, but the
+    features computed neurite by neurite (see the `per_neurite` argument of feature()) are
+    computed once for each neurite and shared by all the neurite types selecting it. The
+    intermediate results the features rely on (section lengths, path distances, topology)
+    are stored on the neurites, so they are computed once per neuron for the whole batch.
+
+    Arguments:
+        feature_names(list): names of the features to extract
+        obj: a neuron, population or neurite tree
+        neurite_types(list): neurite types for which the features are extracted
+        kwargs: parameters to forward to underlying worker functions
+
+    Returns:
+        A dict {(feature_name, neurite_type): values}, the values are those returned by get()
+    """
+    feats = {feature_name: _find_feature_func(feature_name) for feature_name in feature_names}
+    values, selected = _get_per_neurite_values(
+        {name: feat for name, feat in feats.items() if getattr(feat, 'per_neurite', False)},
+        obj, neurite_types, kwargs)
+
+    ret = {}
+    for feature_name, feat in feats.items():
+        for neurite_type in neurite_types:
+            if feature_name in values:
+                arrays = [v for v, is_selected in zip(values[feature_name], selected[neurite_type])
+                          if is_selected and len(v)]
+                ret[feature_name, neurite_type] = (np.concatenate(arrays) if arrays
+                                                   else np.array([]))
+            else:
+                ret[feature_name, neurite_type] = np.array(
+                    list(feat(obj, neurite_type=neurite_type, **kwargs)))
+    return ret
+
+
 _INDENT = ' ' * 4
 
 
@@ -135,19 +195,21 @@ def _get_doc():
     return '\n'.join(ret)
 
 
-def _register_feature(namespace, name, func, shape):
+def _register_feature(namespace, name, func, shape, per_neurite=False):
     """Register a feature to be applied.
 
     Upon registration, an attribute 'shape' containing the expected
-    shape of the function return is added to 'func'.
+    shape of the function return and an attribute 'per_neurite' are added to 'func'.
 
     Arguments:
         namespace(string): a namespace (must be 'NEURITEFEATURES' or 'NEURONFEATURES')
         name(string): name of the feature, used to access the feature via `neurom.features.get()`.
         func(callable): single parameter function of a neurite.
         shape(tuple): the expected shape of the feature values
+        per_neurite(bool): see feature()
     """
     setattr(func, 'shape', shape)
+    setattr(func, 'per_neurite', per_neurite)
 
     assert namespace in {'NEURITEFEATURES', 'NEURONFEATURES'}
     feature_dict = globals()[namespace]
@@ -157,19 +219,22 @@ def _register_feature(namespace, name, func, shape):
     feature_dict[name] = func
 
 
-def feature(shape, namespace=None, name=None):
+def feature(shape, namespace=None, name=None, per_neurite=False):
     """Feature decorator to automatically register the feature in the appropriate namespace.
 
     Arguments:
         shape(tuple): the expected shape of the feature values
         namespace(string): a namespace (must be 'NEURITEFEATURES' or 'NEURONFEATURES')
         name(string): name of the feature, used to access the feature via `neurom.features.get()`.
+        per_neurite(bool): whether the values of the feature for a collection of neurites are
+            the values for each of its neurites, concatenated. This lets get_many() compute
+            them once per neurite.
     """
     def inner(func):
         # Keep the old behavior that do not register those features
         # TODO: this will be changed in the next commit
         if not func.__name__.startswith('n_'):
-            _register_feature(namespace, name or func.__name__, func, shape)
+            _register_feature(namespace, name or func.__name__, func, shape, per_neurite)
         return func
     return inner
 
@@ -32,7 +32,7 @@ import numpy as np
 from neurom import morphmath
 from neurom.exceptions import NeuroMError
 from neurom.core.dataformat import COLS
-from neurom.features import sectionfunc
+from neurom.features.sectionfunc import _mean_radius
 
 
 def _raise_if_not_bifurcation(section):
@@ -42,6 +42,12 @@ def _raise_if_not_bifurcation(section):
             n_children))
 
 
+def _children_points(bif_point):
+    """Points of the two children of a bifurcation point."""
+    _raise_if_not_bifurcation(bif_point)
+    return bif_point.children[0].points, bif_point.children[1].points
+
+
 def local_bifurcation_angle(bif_point):
     """Return the opening angle between two out-going sections in a bifurcation point.
 
@@ -50,6 +56,11 @@ def local_bifurcation_angle(bif_point):
     The bifurcation angle is defined as the angle between the first non-zero
     length segments of a bifurcation point.
     """
+    return _local_bifurcation_angle(bif_point.points, *_children_points(bif_point))
+
+
+def _local_bifurcation_angle(points, child0_points, child1_points):
+    """Local bifurcation angle of the sections of `points` and of their two children."""
     def skip_0_length(sec):
         """Return the first point with non-zero distance to first point."""
         p0 = sec[0]
@@ -61,12 +72,8 @@ def local_bifurcation_angle(bif_point):
 
         return cur
 
-    _raise_if_not_bifurcation(bif_point)
-
-    ch0, ch1 = (skip_0_length(bif_point.children[0].points),
-                skip_0_length(bif_point.children[1].points))
-
-    return morphmath.angle_3points(bif_point.points[-1], ch0, ch1)
+    return morphmath.angle_3points(points[-1], skip_0_length(child0_points),
+                                   skip_0_length(child1_points))
 
 
 def remote_bifurcation_angle(bif_point):
@@ -77,11 +84,12 @@ def remote_bifurcation_angle(bif_point):
     The angle is defined as between the bifurcation point and the
     last points in the out-going sections.
     """
-    _raise_if_not_bifurcation(bif_point)
+    return _remote_bifurcation_angle(bif_point.points, *_children_points(bif_point))
 
-    return morphmath.angle_3points(bif_point.points[-1],
-                                   bif_point.children[0].points[-1],
-                                   bif_point.children[1].points[-1])
+
+def _remote_bifurcation_angle(points, child0_points, child1_points):
+    """Remote bifurcation angle of the sections of `points` and of their two children."""
+    return morphmath.angle_3points(points[-1], child0_points[-1], child1_points[-1])
 
 
 def bifurcation_partition(bif_point):
@@ -138,17 +146,20 @@ def sibling_ratio(bif_point, method='first'):
     0 and 1. Method argument allows one to consider mean diameters
     along the child section instead of diameter of the first point.
     """
-    _raise_if_not_bifurcation(bif_point)
+    return _sibling_ratio(bif_point.points, *_children_points(bif_point), method=method)
 
+
+def _sibling_ratio(_, child0_points, child1_points, method='first'):
+    """Sibling ratio of the two children of a bifurcation point, given their points."""
     if method not in {'first', 'mean'}:
         raise ValueError('Please provide a valid method for sibling ratio, found %s' % method)
 
     if method == 'first':
-        n = bif_point.children[0].points[0, COLS.R]
-        m = bif_point.children[1].points[0, COLS.R]
+        n = child0_points[0, COLS.R]
+        m = child1_points[0, COLS.R]
     if method == 'mean':
-        n = sectionfunc.section_mean_radius(bif_point.children[0])
-        m = sectionfunc.section_mean_radius(bif_point.children[1])
+        n = _mean_radius(child0_points)
+        m = _mean_radius(child1_points)
     return min(n, m) / max(n, m)
 
 
@@ -162,17 +173,21 @@ def diameter_power_relation(bif_point, method='first'):
 
     diameter_power_relation==1 means perfect Rall ratio
     """
-    _raise_if_not_bifurcation(bif_point)
+    return _diameter_power_relation(bif_point.points, *_children_points(bif_point),
+                                    method=method)
+
 
+def _diameter_power_relation(points, child0_points, child1_points, method='first'):
+    """Diameter power relation of a bifurcation point, given its points and its children's."""
     if method not in {'first', 'mean'}:
         raise ValueError('Please provide a valid method for sibling ratio, found %s' % method)
 
     if method == 'first':
-        d_child = bif_point.points[-1, COLS.R]
-        d_child1 = bif_point.children[0].points[0, COLS.R]
-        d_child2 = bif_point.children[1].points[0, COLS.R]
+        d_child = points[-1, COLS.R]
+        d_child1 = child0_points[0, COLS.R]
+        d_child2 = child1_points[0, COLS.R]
     if method == 'mean':
-        d_child = sectionfunc.section_mean_radius(bif_point)
-        d_child1 = sectionfunc.section_mean_radius(bif_point.children[0])
-        d_child2 = sectionfunc.section_mean_radius(bif_point.children[1])
+        d_child = _mean_radius(points)
+        d_child1 = _mean_radius(child0_points)
+        d_child2 = _mean_radius(child1_points)
     return (d_child / d_child1)**(1.5) + (d_child / d_child2)**(1.5)
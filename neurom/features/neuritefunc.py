@@ -35,29 +35,127 @@ from itertools import chain
 import numpy as np
 import scipy
 from neurom import morphmath
-from neurom.core import (NeuriteType, Tree, iter_neurites, iter_sections,
-                         iter_segments)
+from neurom.core import ArrayNeurite, NeuriteType, Tree, iter_neurites, iter_sections
+from neurom.core.columnar import segment_indices
 from neurom.core.dataformat import COLS
 from neurom.core.types import tree_type_checker as is_type
-from neurom.features import _register_feature, bifurcationfunc, feature, neuronfunc, sectionfunc
-from neurom.features.bifurcationfunc import partition_asymmetry
-from neurom.features.sectionfunc import downstream_pathlength
+from neurom.exceptions import NeuroMError
+from neurom.features import _register_feature, bifurcationfunc, neuronfunc, sectionfunc
+from neurom.features import feature as _feature
+from neurom.features.bifurcationfunc import (_diameter_power_relation, _local_bifurcation_angle,
+                                             _remote_bifurcation_angle, _sibling_ratio)
+from neurom.features.neuronfunc import _root_section_points
+from neurom.features.sectionfunc import _meander_angles, downstream_pathlength
 from neurom.geom import convex_hull
 from neurom.morphmath import interval_lengths
 
-feature = partial(feature, namespace='NEURITEFEATURES')
+feature = partial(_feature, namespace='NEURITEFEATURES', per_neurite=True)
+# the features giving values per neuron can not be computed neurite by neurite
+_per_neuron_feature = partial(_feature, namespace='NEURITEFEATURES', per_neurite=False)
 
 L = logging.getLogger(__name__)
 
 
-def _map_sections(fun, neurites, neurite_type=NeuriteType.all, iterator_type=Tree.ipreorder):
-    """Map `fun` to all the sections in a collection of neurites."""
-    return map(fun, iter_sections(neurites,
-                                  iterator_type=iterator_type,
-                                  neurite_filter=is_type(neurite_type)))
+# the attributes of neurom.core.Topology giving the sections iterated over by the iterators
+_ITERATOR_SECTIONS = {Tree.ipreorder: 'preorder', Tree.ipostorder: 'postorder',
+                      Tree.ileaf: 'leaf_mask', Tree.ibifurcation_point: 'bifurcation_mask',
+                      Tree.iforking_point: 'forking_mask'}
 
 
-@feature(shape=(...,))
+def _iter_neurites(neurites, neurite_type=NeuriteType.all):
+    """Iterate over the neurites of type `neurite_type` in a collection of neurites.
+
+    The neurites of lazy neurons are their ArrayNeurites, so that they are not built.
+    """
+    return iter_neurites(neurites, filt=is_type(neurite_type), arrays=True)
+
+
+def _section_indices(topology, iterator_type):
+    """Indices in `topology` of the sections `iterator_type` iterates over, in its order."""
+    if iterator_type not in _ITERATOR_SECTIONS:
+        raise NeuroMError('Unsupported iterator over the sections of an ArrayNeurite: %s' %
+                          iterator_type.__name__)
+    sections = getattr(topology, _ITERATOR_SECTIONS[iterator_type])
+    return np.flatnonzero(sections) if sections.dtype == bool else sections
+
+
+def _map_sections(fun, array_fun, neurites, neurite_type=NeuriteType.all,
+                  iterator_type=Tree.ipreorder):
+    """Map `fun` to all the sections in a collection of neurites.
+
+    The sections of ArrayNeurites are not objects: ``array_fun(neurite, sections)`` gives
+    the values of the `sections` of `neurite`, an array of their indices in its topology.
+    """
+    def _values(neurite):
+        """Values of the sections of a neurite."""
+        if isinstance(neurite, ArrayNeurite):
+            return array_fun(neurite, _section_indices(neurite.topology, iterator_type))
+        return map(fun, iterator_type(neurite.root_node))
+
+    return chain.from_iterable(map(_values, _iter_neurites(neurites, neurite_type)))
+
+
+def _iter_section_points(neurite, sections):
+    """Iterate over the points of the `sections` of an ArrayNeurite."""
+    offsets = neurite.section_offsets
+    return (neurite.section_points[offsets[i]:offsets[i + 1]] for i in sections)
+
+
+def _map_section_points(fun, neurites, neurite_type=NeuriteType.all,
+                        iterator_type=Tree.ipreorder):
+    """Map `fun` to the points of all the sections in a collection of neurites."""
+    return _map_sections(lambda section: fun(section.points),
+                         lambda neurite, sections: map(fun, _iter_section_points(neurite,
+                                                                                 sections)),
+                         neurites, neurite_type, iterator_type)
+
+
+def _map_bifurcation_points(fun, array_fun, neurites, neurite_type=NeuriteType.all):
+    """Map `fun` to all the bifurcation points in a collection of neurites.
+
+    For ArrayNeurites, `array_fun` is given the points of each bifurcation point and of its
+    two children.
+    """
+    def _array_values(neurite, sections):
+        """Values of the bifurcation `sections` of an ArrayNeurite."""
+        topology = neurite.topology
+        return [array_fun(*_iter_section_points(neurite, [i] + topology.children_of(i).tolist()))
+                for i in sections.tolist()]
+
+    return _map_sections(fun, _array_values, neurites, neurite_type, Tree.ibifurcation_point)
+
+
+def _section_ends(neurite, sections):
+    """First and last points of the `sections` of an ArrayNeurite, and their numbers of points."""
+    offsets = neurite.section_offsets
+    return (neurite.section_points[offsets[sections]],
+            neurite.section_points[offsets[sections + 1] - 1],
+            offsets[sections + 1] - offsets[sections])
+
+
+def _map_neurite_arrays(fun, neurites, neurite_type=NeuriteType.all):
+    """Concatenate the arrays `fun(neurite)` of a collection of neurites."""
+    arrays = [fun(neurite) for neurite in _iter_neurites(neurites, neurite_type)]
+    return np.concatenate(arrays) if arrays else np.array([])
+
+
+def _map_topologies(fun, neurites, neurite_type=NeuriteType.all):
+    """Concatenate the arrays `fun(neurite.topology)` of a collection of neurites.
+
+    The topology arrays are in pre-order, thus the result is ordered as `_map_sections`.
+    """
+    return _map_neurite_arrays(lambda neurite: fun(neurite.topology), neurites, neurite_type)
+
+
+def _bifurcation_children_sizes(topology):
+    """Subtree sizes of the first and second children of the bifurcation points."""
+    first_children = topology.children_offsets[:-1][topology.bifurcation_mask]
+    sizes = topology.subtree_sizes.astype(float)
+    return (sizes[topology.children[first_children]],
+            sizes[topology.children[first_children + 1]])
+
+
+@_per_neuron_feature(shape=(...,))
 def total_length(nrn_pop, neurite_type=NeuriteType.all):
     """Get the total length of all sections in the group of neurons or neurites."""
     nrns = neuronfunc.neuron_population(nrn_pop)
@@ -67,22 +165,23 @@ def total_length(nrn_pop, neurite_type=NeuriteType.all):
 @feature(shape=())
 def n_segments(neurites, neurite_type=NeuriteType.all):
     """Number of segments in a collection of neurites."""
-    return sum(len(s.points) - 1
-               for s in iter_sections(neurites, neurite_filter=is_type(neurite_type)))
+    return sum(_map_sections(lambda section: len(section.points) - 1,
+                             lambda neurite, sections:
+                             np.diff(neurite.section_offsets)[sections] - 1,
+                             neurites, neurite_type))
 
 
 @feature(shape=())
 def n_neurites(neurites, neurite_type=NeuriteType.all):
     """Number of neurites in a collection of neurites."""
-    return sum(1 for _ in iter_neurites(neurites, filt=is_type(neurite_type)))
+    return sum(1 for _ in _iter_neurites(neurites, neurite_type))
 
 
 @feature(shape=())
 def n_sections(neurites, neurite_type=NeuriteType.all, iterator_type=Tree.ipreorder):
     """Number of sections in a collection of neurites."""
-    return sum(1 for _ in iter_sections(neurites,
-                                        iterator_type=iterator_type,
-                                        neurite_filter=is_type(neurite_type)))
+    return sum(1 for _ in _map_sections(lambda section: section, lambda _, sections: sections,
+                                        neurites, neurite_type, iterator_type))
 
 
 @feature(shape=())
@@ -109,72 +208,64 @@ def total_area_per_neurite(neurites, neurite_type=NeuriteType.all):
 
     The area is defined as the sum of the area of the sections.
     """
-    return [neurite.area for neurite in iter_neurites(neurites, filt=is_type(neurite_type))]
+    return [neurite.area for neurite in _iter_neurites(neurites, neurite_type)]
 
 
 def _section_length(section):
-    """Get section length of `section`."""
-    return morphmath.section_length(section.points)
+    """Get section length of `section`, computed once and stored on the section."""
+    return section.length
+
+
+def _section_lengths(neurite, sections):
+    """Lengths of the `sections` of an ArrayNeurite."""
+    return neurite.section_lengths[sections]
 
 
 @feature(shape=(...,))
 def section_lengths(neurites, neurite_type=NeuriteType.all):
     """Section lengths in a collection of neurites."""
-    return _map_sections(_section_length, neurites, neurite_type=neurite_type)
+    return _map_sections(_section_length, _section_lengths, neurites, neurite_type=neurite_type)
 
 
 @feature(shape=(...,))
 def section_term_lengths(neurites, neurite_type=NeuriteType.all):
     """Termination section lengths in a collection of neurites."""
-    return _map_sections(_section_length, neurites, neurite_type=neurite_type,
+    return _map_sections(_section_length, _section_lengths, neurites, neurite_type=neurite_type,
                          iterator_type=Tree.ileaf)
 
 
 @feature(shape=(...,))
 def section_bif_lengths(neurites, neurite_type=NeuriteType.all):
     """Bifurcation section lengths in a collection of neurites."""
-    return _map_sections(_section_length, neurites, neurite_type=neurite_type,
+    return _map_sections(_section_length, _section_lengths, neurites, neurite_type=neurite_type,
                          iterator_type=Tree.ibifurcation_point)
 
 
 @feature(shape=(...,))
 def section_branch_orders(neurites, neurite_type=NeuriteType.all):
     """Section branch orders in a collection of neurites."""
-    return _map_sections(sectionfunc.branch_order, neurites, neurite_type=neurite_type)
+    return _map_topologies(lambda topology: topology.depths, neurites, neurite_type)
 
 
 @feature(shape=(...,))
 def section_bif_branch_orders(neurites, neurite_type=NeuriteType.all):
     """Bifurcation section branch orders in a collection of neurites."""
-    return _map_sections(sectionfunc.branch_order, neurites, neurite_type=neurite_type,
-                         iterator_type=Tree.ibifurcation_point)
+    return _map_topologies(lambda topology: topology.depths[topology.bifurcation_mask],
+                           neurites, neurite_type)
 
 
 @feature(shape=(...,))
 def section_term_branch_orders(neurites, neurite_type=NeuriteType.all):
     """Termination section branch orders in a collection of neurites."""
-    return _map_sections(sectionfunc.branch_order, neurites, neurite_type=neurite_type,
-                         iterator_type=Tree.ileaf)
+    return _map_topologies(lambda topology: topology.depths[topology.leaf_mask],
+                           neurites, neurite_type)
 
 
 @feature(shape=(...,), name='section_path_distances')
 def section_path_lengths(neurites, neurite_type=NeuriteType.all):
     """Path lengths of a collection of neurites."""
-    # Calculates and stores the section lengths in one pass,
-    # then queries the lengths in the path length iterations.
-    # This avoids repeatedly calculating the lengths of the
-    # same sections.
-    dist = {}
-    neurite_filter = is_type(neurite_type)
-
-    for s in iter_sections(neurites, neurite_filter=neurite_filter):
-        dist[s] = s.length
-
-    def pl2(node):
-        """Calculate the path length using cached section lengths."""
-        return sum(dist[n] for n in node.iupstream())
-
-    return _map_sections(pl2, neurites, neurite_type=neurite_type)
+    return _map_neurite_arrays(lambda neurite: neurite.section_path_distances,
+                               neurites, neurite_type)
 
 
 ################################################################################
@@ -187,37 +278,37 @@ def map_neurons(fun, neurites, neurite_type):
     return [fun(n, neurite_type=neurite_type) for n in nrns]
 
 
-@feature(shape=(...,))
+@_per_neuron_feature(shape=(...,))
 def number_of_sections(neurites, neurite_type=NeuriteType.all):
     """Number of sections in a collection of neurites."""
     return map_neurons(n_sections, neurites, neurite_type)
 
 
-@feature(shape=(...,))
+@_per_neuron_feature(shape=(...,))
 def number_of_neurites(neurites, neurite_type=NeuriteType.all):
     """Number of neurites in a collection of neurites."""
     return map_neurons(n_neurites, neurites, neurite_type)
 
 
-@feature(shape=(...,))
+@_per_neuron_feature(shape=(...,))
 def number_of_bifurcations(neurites, neurite_type=NeuriteType.all):
     """Number of bifurcation points in a collection of neurites."""
     return map_neurons(n_bifurcation_points, neurites, neurite_type)
 
 
-@feature(shape=(...,))
+@_per_neuron_feature(shape=(...,))
 def number_of_forking_points(neurites, neurite_type=NeuriteType.all):
     """Number of forking points in a collection of neurites."""
     return map_neurons(n_forking_points, neurites, neurite_type)
 
 
-@feature(shape=(...,))
+@_per_neuron_feature(shape=(...,))
 def number_of_terminations(neurites, neurite_type=NeuriteType.all):
     """Number of leaves points in a collection of neurites."""
     return map_neurons(n_leaves, neurites, neurite_type)
 
 
-@feature(shape=(...,))
+@_per_neuron_feature(shape=(...,))
 def number_of_segments(neurites, neurite_type=NeuriteType.all):
     """Number of sections in a collection of neurites."""
     return map_neurons(n_segments, neurites, neurite_type)
@@ -238,38 +329,43 @@ def map_segments(func, neurites, neurite_type):
     ]
 
 
+def _map_segment_arrays(kernel, neurites, neurite_type):
+    """Apply a segment kernel of neurom.morphmath to all the segments of a collection of neurites.
+
+    The kernel is applied once per neurite, to the points of all its sections, and the
+    values of the pairs of points made of the end of a section and the start of the next
+    one, which are not segments, are dropped.
+    """
+    def _segment_values(neurite):
+        """Values of the kernel for the segments of a neurite, in section pre-order."""
+        neurite = ArrayNeurite.from_neurite(neurite)
+        return kernel(neurite.section_points)[segment_indices(neurite.section_offsets)[1]]
+
+    return _map_neurite_arrays(_segment_values, neurites, neurite_type)
+
+
 @feature(shape=(...,))
 def segment_lengths(neurites, neurite_type=NeuriteType.all):
     """Lengths of the segments in a collection of neurites."""
-    return map_segments(sectionfunc.segment_lengths, neurites, neurite_type)
+    return _map_segment_arrays(morphmath.segment_lengths, neurites, neurite_type)
 
 
 @feature(shape=(...,))
 def segment_areas(neurites, neurite_type=NeuriteType.all):
     """Areas of the segments in a collection of neurites."""
-    return [morphmath.segment_area(seg) for seg
-            in iter_segments(neurites, is_type(neurite_type))]
+    return _map_segment_arrays(morphmath.segment_areas, neurites, neurite_type)
 
 
 @feature(shape=(...,))
 def segment_volumes(neurites, neurite_type=NeuriteType.all):
     """Volumes of the segments in a collection of neurites."""
-    def _func(sec):
-        """List of segment volumes of a section."""
-        return [morphmath.segment_volume(seg) for seg in zip(sec.points[:-1], sec.points[1:])]
-
-    return map_segments(_func, neurites, neurite_type)
+    return _map_segment_arrays(morphmath.segment_volumes, neurites, neurite_type)
 
 
 @feature(shape=(...,))
 def segment_radii(neurites, neurite_type=NeuriteType.all):
     """Arithmetic mean of the radii of the points in segments in a collection of neurites."""
-    def _seg_radii(sec):
-        """Vectorized mean radii."""
-        pts = sec.points[:, COLS.R]
-        return np.divide(np.add(pts[:-1], pts[1:]), 2.0)
-
-    return map_segments(_seg_radii, neurites, neurite_type)
+    return _map_segment_arrays(morphmath.segment_radii, neurites, neurite_type)
 
 
 @feature(shape=(...,))
@@ -278,14 +374,7 @@ def segment_taper_rates(neurites, neurite_type=NeuriteType.all):
 
     The taper rate is defined as the absolute radii differences divided by length of the section
     """
-    def _seg_taper_rates(sec):
-        """Vectorized taper rates."""
-        pts = sec.points[:, COLS.XYZR]
-        diff = np.diff(pts, axis=0)
-        distance = np.linalg.norm(diff[:, COLS.XYZ], axis=1)
-        return np.divide(2 * np.abs(diff[:, COLS.R]), distance)
-
-    return map_segments(_seg_taper_rates, neurites, neurite_type)
+    return _map_segment_arrays(morphmath.segment_taper_rates, neurites, neurite_type)
 
 
 @feature(shape=(...,))
@@ -295,92 +384,85 @@ def section_taper_rates(neurites, neurite_type=NeuriteType.all):
     Taper rate is defined here as the linear fit along a section.
     It is expected to be negative for neurons.
     """
-    def _sec_taper_rate(sec):
-        """Taper rate from fit along a section."""
-        path_distances = np.cumsum(interval_lengths(sec.points, prepend_zero=True))
-        return np.polynomial.polynomial.polyfit(path_distances, 2 * sec.points[:, COLS.R], 1)[1]
+    def _taper_rate(points):
+        """Taper rate from fit along the points of a section."""
+        path_distances = np.cumsum(interval_lengths(points, prepend_zero=True))
+        return np.polynomial.polynomial.polyfit(path_distances, 2 * points[:, COLS.R], 1)[1]
 
-    return _map_sections(_sec_taper_rate, neurites, neurite_type=neurite_type)
+    return _map_section_points(_taper_rate, neurites, neurite_type=neurite_type)
 
 
 @feature(shape=(...,))
 def segment_meander_angles(neurites, neurite_type=NeuriteType.all):
     """Inter-segment opening angles in a section."""
-    return list(chain.from_iterable(_map_sections(
-        sectionfunc.section_meander_angles, neurites, neurite_type)))
+    return list(chain.from_iterable(_map_section_points(
+        _meander_angles, neurites, neurite_type)))
+
+
+def _segment_midpoints(points):
+    """Mid-points of the segments between consecutive points."""
+    pts = points[:, COLS.XYZ]
+    return np.divide(np.add(pts[:-1], pts[1:]), 2.0)
 
 
 @feature(shape=(..., 3))
 def segment_midpoints(neurites, neurite_type=NeuriteType.all):
     """Return a list of segment mid-points in a collection of neurites."""
-    def _seg_midpoint(sec):
-        """Return the mid-points of segments in a section."""
-        pts = sec.points[:, COLS.XYZ]
-        return np.divide(np.add(pts[:-1], pts[1:]), 2.0)
-
-    return map_segments(_seg_midpoint, neurites, neurite_type)
+    return _map_segment_arrays(_segment_midpoints, neurites, neurite_type)
 
 
 @feature(shape=(...,))
 def segment_path_lengths(neurites, neurite_type=NeuriteType.all):
     """Returns pathlengths between all non-root points and their root point."""
-    pathlength = {}
-    neurite_filter = is_type(neurite_type)
+    def _segment_path_lengths(neurite):
+        """Path lengths of the points of a neurite, but the first point of each section."""
+        n_points = (np.diff(neurite.section_offsets) if isinstance(neurite, ArrayNeurite) else
+                    [len(section.points) for section in neurite.topology.nodes])
+        return np.delete(neurite.point_path_distances, np.cumsum(n_points) - n_points)
 
-    def _get_pathlength(section):
-        if section.id not in pathlength:
-            if section.parent:
-                pathlength[section.id] = section.parent.length + _get_pathlength(section.parent)
-            else:
-                pathlength[section.id] = 0
-        return pathlength[section.id]
-
-    result = [_get_pathlength(section) + np.cumsum(sectionfunc.segment_lengths(section))
-              for section in iter_sections(neurites, neurite_filter=neurite_filter)]
-    return np.hstack(result) if result else np.array([])
+    return _map_neurite_arrays(_segment_path_lengths, neurites, neurite_type)
 
 
 @feature(shape=(...,))
 def segment_radial_distances(neurites, neurite_type=NeuriteType.all, origin=None):
     """Returns the list of distances between all segment mid points and origin."""
-    def _radial_distances(sec, pos):
-        """List of distances between the mid point of each segment and pos."""
-        mid_pts = 0.5 * (sec.points[:-1, COLS.XYZ] + sec.points[1:, COLS.XYZ])
-        return np.linalg.norm(mid_pts - pos[COLS.XYZ], axis=1)
+    def _radial_distances(neurite):
+        """Distances between the mid point of each segment of a neurite and the origin."""
+        neurite = ArrayNeurite.from_neurite(neurite)
+        pos = neurite.section_points[0] if origin is None else origin
+        mid_pts = _segment_midpoints(neurite.section_points)
+        return np.linalg.norm(mid_pts[segment_indices(neurite.section_offsets)[1]] -
+                              pos[COLS.XYZ], axis=1)
 
-    dist = []
-    for n in iter_neurites(neurites, filt=is_type(neurite_type)):
-        pos = n.root_node.points[0] if origin is None else origin
-        dist.extend([s for ss in n.iter_sections() for s in _radial_distances(ss, pos)])
-
-    return dist
+    return _map_neurite_arrays(_radial_distances, neurites, neurite_type)
 
 
 @feature(shape=(...,))
 def local_bifurcation_angles(neurites, neurite_type=NeuriteType.all):
     """Get a list of local bifurcation angles in a collection of neurites."""
-    return _map_sections(bifurcationfunc.local_bifurcation_angle,
-                         neurites,
-                         neurite_type=neurite_type,
-                         iterator_type=Tree.ibifurcation_point)
+    return _map_bifurcation_points(bifurcationfunc.local_bifurcation_angle,
+                                   _local_bifurcation_angle,
+                                   neurites,
+                                   neurite_type=neurite_type)
 
 
 @feature(shape=(...,))
 def remote_bifurcation_angles(neurites, neurite_type=NeuriteType.all):
     """Get a list of remote bifurcation angles in a collection of neurites."""
-    return _map_sections(bifurcationfunc.remote_bifurcation_angle,
-                         neurites,
-                         neurite_type=neurite_type,
-                         iterator_type=Tree.ibifurcation_point)
+    return _map_bifurcation_points(bifurcationfunc.remote_bifurcation_angle,
+                                   _remote_bifurcation_angle,
+                                   neurites,
+                                   neurite_type=neurite_type)
 
 
 @feature(shape=(...,), name='partition')
 def bifurcation_partitions(neurites, neurite_type=NeuriteType.all):
     """Partition at bifurcation points of a collection of neurites."""
-    return map(bifurcationfunc.bifurcation_partition,
-               iter_sections(neurites,
-                             iterator_type=Tree.ibifurcation_point,
-                             neurite_filter=is_type(neurite_type)))
+    def _partitions(topology):
+        n, m = _bifurcation_children_sizes(topology)
+        return np.maximum(n, m) / np.minimum(n, m)
+
+    return _map_topologies(_partitions, neurites, neurite_type)
 
 
 @feature(shape=(...,), name='partition_asymmetry')
@@ -395,13 +477,17 @@ def partition_asymmetries(neurites, neurite_type=NeuriteType.all, variant='branc
                          found %s' % variant)
 
     if variant == 'branch-order':
-        return map(partition_asymmetry,
-                   iter_sections(neurites,
-                                 iterator_type=Tree.ibifurcation_point,
-                                 neurite_filter=is_type(neurite_type)))
+        def _asymmetries(topology):
+            n, m = _bifurcation_children_sizes(topology)
+            return np.abs(n - m) / np.abs(n + m)
+
+        return _map_topologies(_asymmetries, neurites, neurite_type)
 
     asymmetries = list()
-    for neurite in iter_neurites(neurites, filt=is_type(neurite_type)):
+    for neurite in _iter_neurites(neurites, neurite_type):
+        if isinstance(neurite, ArrayNeurite):
+            asymmetries.extend(_length_asymmetries(neurite))
+            continue
         neurite_length = total_length_per_neurite(neurite)[0]
         for section in iter_sections(neurite,
                                      iterator_type=Tree.ibifurcation_point,
@@ -412,11 +498,24 @@ def partition_asymmetries(neurites, neurite_type=NeuriteType.all, variant='branc
     return asymmetries
 
 
+def _length_asymmetries(neurite):
+    """Partition asymmetries of the 'length' variant at the bifurcations of an ArrayNeurite."""
+    topology = neurite.topology
+    cumulated_lengths = np.concatenate(([0.], np.cumsum(neurite.section_lengths)))
+    # the subtree of a section is made of the sections following it in pre-order
+    downstream_lengths = (cumulated_lengths[topology.preorder + topology.subtree_sizes] -
+                          cumulated_lengths[:-1])
+    first_children = topology.children_offsets[:-1][topology.bifurcation_mask]
+    return (np.abs(downstream_lengths[topology.children[first_children]] -
+                   downstream_lengths[topology.children[first_children + 1]]) /
+            neurite.length)
+
+
 # Register `partition_asymmetries` variant
 _partition_asymmetry_length = partial(partition_asymmetries, variant='length')
 update_wrapper(_partition_asymmetry_length, partition_asymmetries)  # this fixes the docstring
 _register_feature('NEURITEFEATURES', 'partition_asymmetry_length',
-                  _partition_asymmetry_length, shape=(...,))
+                  _partition_asymmetry_length, shape=(...,), per_neurite=True)
 
 
 @feature(shape=(...,))
@@ -428,10 +527,9 @@ def sibling_ratios(neurites, neurite_type=NeuriteType.all, method='first'):
     0 and 1. Method argument allows one to consider mean diameters
     along the child section instead of diameter of the first point.
     """
-    return map(lambda bif_point: bifurcationfunc.sibling_ratio(bif_point, method),
-               iter_sections(neurites,
-                             iterator_type=Tree.ibifurcation_point,
-                             neurite_filter=is_type(neurite_type)))
+    return _map_bifurcation_points(partial(bifurcationfunc.sibling_ratio, method=method),
+                                   partial(_sibling_ratio, method=method),
+                                   neurites, neurite_type)
 
 
 @feature(shape=(..., 2))
@@ -441,10 +539,8 @@ def partition_pairs(neurites, neurite_type=NeuriteType.all):
     Partition pair is defined as the number of bifurcations at the two
     daughters of the bifurcating section
     """
-    return map(bifurcationfunc.partition_pair,
-               iter_sections(neurites,
-                             iterator_type=Tree.ibifurcation_point,
-                             neurite_filter=is_type(neurite_type)))
+    return _map_topologies(lambda topology: np.column_stack(
+        _bifurcation_children_sizes(topology)), neurites, neurite_type)
 
 
 @feature(shape=(...,))
@@ -456,10 +552,9 @@ def diameter_power_relations(neurites, neurite_type=NeuriteType.all, method='fir
     This quantity gives an indication of how far the branching is from
     the Rall ratio (when =1).
     """
-    return (bifurcationfunc.diameter_power_relation(bif_point, method)
-            for bif_point in iter_sections(neurites,
-                                           iterator_type=Tree.ibifurcation_point,
-                                           neurite_filter=is_type(neurite_type)))
+    return _map_bifurcation_points(
+        partial(bifurcationfunc.diameter_power_relation, method=method),
+        partial(_diameter_power_relation, method=method), neurites, neurite_type)
 
 
 @feature(shape=(...,))
@@ -470,12 +565,17 @@ def section_radial_distances(neurites, neurite_type=NeuriteType.all, origin=None
     The iterator_type can be used to select only terminal sections (ileaf)
     or only bifurcations (ibifurcation_point).
     """
+    def _array_distances(neurite, sections, pos):
+        """Radial distances of the `sections` of an ArrayNeurite."""
+        ends = _section_ends(neurite, sections)[1]
+        return np.linalg.norm(ends[:, COLS.XYZ] - pos[COLS.XYZ], axis=1)
+
     dist = []
-    for n in iter_neurites(neurites, filt=is_type(neurite_type)):
-        pos = n.root_node.points[0] if origin is None else origin
-        dist.extend(sectionfunc.section_radial_distance(s, pos)
-                    for s in iter_sections(n,
-                                           iterator_type=iterator_type))
+    for n in _iter_neurites(neurites, neurite_type):
+        pos = _root_section_points(n)[0] if origin is None else origin
+        dist.extend(_map_sections(partial(sectionfunc.section_radial_distance, origin=pos),
+                                  partial(_array_distances, pos=pos),
+                                  n, iterator_type=iterator_type))
     return dist
 
 
@@ -496,15 +596,13 @@ def section_bif_radial_distances(neurites, neurite_type=NeuriteType.all, origin=
 @feature(shape=(...,))
 def number_of_sections_per_neurite(neurites, neurite_type=NeuriteType.all):
     """Get the number of sections per neurite in a collection of neurites."""
-    return list(sum(1 for _ in n.iter_sections())
-                for n in iter_neurites(neurites, filt=is_type(neurite_type)))
+    return list(n_sections(n) for n in _iter_neurites(neurites, neurite_type))
 
 
 @feature(shape=(...,))
 def total_length_per_neurite(neurites, neurite_type=NeuriteType.all):
     """Get the path length per neurite in a collection."""
-    return list(sum(s.length for s in n.iter_sections())
-                for n in iter_neurites(neurites, filt=is_type(neurite_type)))
+    return list(n.length for n in _iter_neurites(neurites, neurite_type))
 
 
 @feature(shape=(...,))
@@ -516,16 +614,15 @@ def neurite_lengths(neurites, neurite_type=NeuriteType.all):
 @feature(shape=(...,))
 def terminal_path_lengths_per_neurite(neurites, neurite_type=NeuriteType.all):
     """Get the path lengths to each terminal point per neurite in a collection."""
-    return list(sectionfunc.section_path_length(s)
-                for n in iter_neurites(neurites, filt=is_type(neurite_type))
-                for s in iter_sections(n, iterator_type=Tree.ileaf))
+    return _map_neurite_arrays(
+        lambda neurite: neurite.section_path_distances[neurite.topology.leaf_mask],
+        neurites, neurite_type)
 
 
 @feature(shape=(...,), name='neurite_volumes')
 def total_volume_per_neurite(neurites, neurite_type=NeuriteType.all):
     """Get the volume per neurite in a collection."""
-    return list(sum(s.volume for s in n.iter_sections())
-                for n in iter_neurites(neurites, filt=is_type(neurite_type)))
+    return list(n.volume for n in _iter_neurites(neurites, neurite_type))
 
 
 @feature(shape=(...,))
@@ -548,32 +645,54 @@ def neurite_volume_density(neurites, neurite_type=NeuriteType.all):
 
         return neurite.volume / volume
 
-    return list(vol_density(n)
-                for n in iter_neurites(neurites, filt=is_type(neurite_type)))
+    return list(vol_density(n) for n in _iter_neurites(neurites, neurite_type))
 
 
 @feature(shape=(...,))
 def section_volumes(neurites, neurite_type=NeuriteType.all):
     """Section volumes in a collection of neurites."""
-    return _map_sections(sectionfunc.section_volume, neurites, neurite_type=neurite_type)
+    return _map_sections(sectionfunc.section_volume,
+                         lambda neurite, sections:
+                         neurite.map_sections(morphmath.segment_volumes)[sections],
+                         neurites, neurite_type=neurite_type)
 
 
 @feature(shape=(...,))
 def section_areas(neurites, neurite_type=NeuriteType.all):
     """Section areas in a collection of neurites."""
-    return _map_sections(sectionfunc.section_area, neurites, neurite_type=neurite_type)
+    return _map_sections(sectionfunc.section_area,
+                         lambda neurite, sections:
+                         neurite.map_sections(morphmath.segment_areas)[sections],
+                         neurites, neurite_type=neurite_type)
+
+
+def _end_distances(neurite, sections):
+    """End to end distances of the `sections` of an ArrayNeurite, see section_end_distance."""
+    first_points, last_points, n_points = _section_ends(neurite, sections)
+    distances = np.linalg.norm(last_points[:, COLS.XYZ] - first_points[:, COLS.XYZ], axis=1)
+    return np.where(n_points < 2, 0., distances)
 
 
 @feature(shape=(...,))
 def section_tortuosity(neurites, neurite_type=NeuriteType.all):
     """Section tortuosities in a collection of neurites."""
-    return _map_sections(sectionfunc.section_tortuosity, neurites, neurite_type=neurite_type)
+    def _tortuosities(neurite, sections):
+        """Tortuosities of the `sections` of an ArrayNeurite, see section_tortuosity."""
+        n_points = _section_ends(neurite, sections)[2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # the sections of less than 2 points, of tortuosity 1, have a null end distance
+            tortuosities = neurite.section_lengths[sections] / _end_distances(neurite, sections)
+        return np.where(n_points < 2, 1., tortuosities)
+
+    return _map_sections(sectionfunc.section_tortuosity, _tortuosities,
+                         neurites, neurite_type=neurite_type)
 
 
 @feature(shape=(...,))
 def section_end_distances(neurites, neurite_type=NeuriteType.all):
     """Section end to end distances in a collection of neurites."""
-    return _map_sections(sectionfunc.section_end_distance, neurites, neurite_type=neurite_type)
+    return _map_sections(sectionfunc.section_end_distance, _end_distances,
+                         neurites, neurite_type=neurite_type)
 
 
 @feature(shape=(...,))
@@ -585,10 +704,10 @@ def principal_direction_extents(neurites, neurite_type=NeuriteType.all, directio
         points = neurite.points[:, :3]
         return morphmath.principal_direction_extent(points)[direction]
 
-    return [_pde(neurite) for neurite in iter_neurites(neurites, filt=is_type(neurite_type))]
+    return [_pde(neurite) for neurite in _iter_neurites(neurites, neurite_type)]
 
 
 @feature(shape=(...,))
 def section_strahler_orders(neurites, neurite_type=NeuriteType.all):
-    """Inter-segment opening angles in a section."""
-    return _map_sections(sectionfunc.strahler_order, neurites, neurite_type)
+    """Strahler orders of the sections in a collection of neurites."""
+    return _map_topologies(lambda topology: topology.strahler_orders, neurites, neurite_type)
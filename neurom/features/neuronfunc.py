@@ -34,7 +34,8 @@ import math
 import numpy as np
 
 from neurom import morphmath
-from neurom.core._neuron import iter_neurites, iter_segments
+from neurom.core._neuron import ArrayNeurite, iter_neurites
+from neurom.core.columnar import segment_indices
 from neurom.core.dataformat import COLS
 from neurom.core.types import NeuriteType
 from neurom.core.types import tree_type_checker as is_type
@@ -50,6 +51,13 @@ def neuron_population(nrns):
     return nrns.neurons if hasattr(nrns, 'neurons') else (nrns,)
 
 
+def _root_section_points(neurite):
+    """Points of the root section of a neurite or ArrayNeurite."""
+    if isinstance(neurite, ArrayNeurite):
+        return neurite.section_points[:neurite.section_offsets[1]]
+    return neurite.root_node.points
+
+
 @feature(shape=())
 def soma_volume(nrn):
     """Get the volume of a neuron's soma."""
@@ -111,16 +119,15 @@ def soma_radii(nrn_pop, neurite_type=NeuriteType.soma):
 @feature(shape=(...,))
 def trunk_section_lengths(nrn, neurite_type=NeuriteType.all):
     """List of lengths of trunk sections of neurites in a neuron."""
-    neurite_filter = is_type(neurite_type)
-    return [morphmath.section_length(s.root_node.points)
-            for s in nrn.neurites if neurite_filter(s)]
+    return [morphmath.section_length(_root_section_points(s))
+            for s in iter_neurites(nrn, filt=is_type(neurite_type), arrays=True)]
 
 
 @feature(shape=(...,))
 def trunk_origin_radii(nrn, neurite_type=NeuriteType.all):
     """Radii of the trunk sections of neurites in a neuron."""
-    neurite_filter = is_type(neurite_type)
-    return [s.root_node.points[0][COLS.R] for s in nrn.neurites if neurite_filter(s)]
+    return [_root_section_points(s)[0][COLS.R]
+            for s in iter_neurites(nrn, filt=is_type(neurite_type), arrays=True)]
 
 
 @feature(shape=(...,))
@@ -140,9 +147,9 @@ def trunk_origin_azimuths(nrn, neurite_type=NeuriteType.all):
         vector = morphmath.vector(section[0], soma.center)
         return np.arctan2(vector[COLS.Z], vector[COLS.X])
 
-    return [_azimuth(s.root_node.points, n.soma)
+    return [_azimuth(_root_section_points(s), n.soma)
             for n in nrns
-            for s in n.neurites if neurite_filter(s)]
+            for s in iter_neurites(n, filt=neurite_filter, arrays=True)]
 
 
 @feature(shape=(...,))
@@ -167,9 +174,9 @@ def trunk_origin_elevations(nrn, neurite_type=NeuriteType.all):
             return np.arcsin(vector[COLS.Y] / norm_vector)
         raise ValueError("Norm of vector between soma center and section is almost zero.")
 
-    return [_elevation(s.root_node.points, n.soma)
+    return [_elevation(_root_section_points(s), n.soma)
             for n in nrns
-            for s in n.neurites if neurite_filter(s)]
+            for s in iter_neurites(n, filt=neurite_filter, arrays=True)]
 
 
 @feature(shape=(...,))
@@ -178,9 +185,9 @@ def trunk_vectors(nrn, neurite_type=NeuriteType.all):
     neurite_filter = is_type(neurite_type)
     nrns = neuron_population(nrn)
 
-    return np.array([morphmath.vector(s.root_node.points[0], n.soma.center)
+    return np.array([morphmath.vector(_root_section_points(s)[0], n.soma.center)
                      for n in nrns
-                     for s in n.neurites if neurite_filter(s)])
+                     for s in iter_neurites(n, filt=neurite_filter, arrays=True)])
 
 
 @feature(shape=(...,))
@@ -211,6 +218,51 @@ def trunk_angles(nrn, neurite_type=NeuriteType.all):
             for i, _ in enumerate(ordered_vectors)]
 
 
+def _sholl_segments(neurites, center):
+    """Squared distances to `center` of the closest and farthest ends of the segments.
+
+    Arguments:
+        neurites: neurite, neuron, population or iterable of neurites
+        center: center of the Sholl spheres
+
+    Returns:
+        tuple of two arrays: the smallest and the largest squared distance of the ends
+        of each segment
+
+    The neurites of lazy neurons are not built, see neurom.core.iter_neurites.
+    """
+    start_dist2, end_dist2 = [], []
+    for neurite in iter_neurites(neurites, arrays=True):
+        neurite = ArrayNeurite.from_neurite(neurite)
+        v = np.subtract(center[COLS.XYZ], neurite.section_points[:, COLS.XYZ])
+        dist2 = v[:, 0] * v[:, 0] + v[:, 1] * v[:, 1] + v[:, 2] * v[:, 2]
+        # segments join consecutive points, except the last point of a section to the next one
+        segment_starts = segment_indices(neurite.section_offsets)[1]
+        start_dist2.append(dist2[segment_starts])
+        end_dist2.append(dist2[segment_starts + 1])
+    if not start_dist2:
+        return np.empty(0), np.empty(0)
+    start_dist2, end_dist2 = np.concatenate(start_dist2), np.concatenate(end_dist2)
+    return np.minimum(start_dist2, end_dist2), np.maximum(start_dist2, end_dist2)
+
+
+def _count_sholl_crossings(segments, radii):
+    """Number of segments crossing each of the spheres of `radii`.
+
+    A segment crosses a sphere if the sphere radius lies between the distances of the
+    segment ends, bounds included: it is the number of segments whose closest end is
+    inside the sphere minus the number of segments whose farthest end is strictly inside.
+
+    Arguments:
+        segments: squared distances of the segment ends, as returned by `_sholl_segments`
+        radii: radii of the spheres
+    """
+    min_dist2, max_dist2 = segments
+    radii2 = np.asarray(radii, dtype=float) ** 2
+    return (np.searchsorted(np.sort(min_dist2), radii2, side='right') -
+            np.searchsorted(np.sort(max_dist2), radii2, side='left'))
+
+
 @feature(shape=(...,))
 def sholl_crossings(neurites, center, radii):
     """Calculate crossings of neurites.
@@ -223,22 +275,23 @@ def sholl_crossings(neurites, center, radii):
         Array of same length as radii, with a count of the number of crossings
         for the respective radius
     """
-    def _count_crossings(neurite, radius):
-        """Used to count_crossings of segments in neurite with radius."""
-        r2 = radius ** 2
-        count = 0
-        for start, end in iter_segments(neurite):
-            start_dist2, end_dist2 = (morphmath.point_dist2(center, start),
-                                      morphmath.point_dist2(center, end))
+    return _count_sholl_crossings(_sholl_segments(neurites, center), radii)
+
 
-            count += int(start_dist2 <= r2 <= end_dist2 or
-                         end_dist2 <= r2 <= start_dist2)
+def _sholl_radii(nrns, step_size):
+    """Radii of the Sholl spheres of a population, see `sholl_frequency`."""
+    min_soma_edge = min((neuron.soma.radius for neuron in nrns), default=float('Inf'))
+    max_radii = max((np.max(np.abs(bounding_box(neuron))) for neuron in nrns), default=0)
+    return np.arange(min_soma_edge, max_radii + step_size, step_size)
 
-        return count
 
-    return np.array([sum(_count_crossings(neurite, r)
-                         for neurite in iter_neurites(neurites))
-                     for r in radii])
+def _sholl_population_segments(nrns, neurite_filter):
+    """Segments of the filtered neurites of a population, centered on their soma."""
+    segments = [_sholl_segments(iter_neurites(neuron, filt=neurite_filter, arrays=True),
+                                neuron.soma.center)
+                for neuron in nrns]
+    return (np.concatenate([min_dist2 for min_dist2, _ in segments] or [[]]),
+            np.concatenate([max_dist2 for _, max_dist2 in segments] or [[]]))
 
 
 @feature(shape=(...,))
@@ -260,22 +313,27 @@ def sholl_frequency(nrn, neurite_type=NeuriteType.all, step_size=10):
         having crossed multiple times.
     """
     nrns = neuron_population(nrn)
-    neurite_filter = is_type(neurite_type)
+    radii = _sholl_radii(nrns, step_size)
+    segments = _sholl_population_segments(nrns, is_type(neurite_type))
+    return _count_sholl_crossings(segments, radii).astype(radii.dtype)
 
-    min_soma_edge = float('Inf')
-    max_radii = 0
-    neurites_list = []
-    for neuron in nrns:
-        neurites_list.extend(((neurites, neuron.soma.center)
-                              for neurites in neuron.neurites
-                              if neurite_filter(neurites)))
 
-        min_soma_edge = min(min_soma_edge, neuron.soma.radius)
-        max_radii = max(max_radii, np.max(np.abs(bounding_box(neuron))))
+def sholl_profiles(nrn, neurite_types=(NeuriteType.axon,
+                                       NeuriteType.basal_dendrite,
+                                       NeuriteType.apical_dendrite), step_size=10):
+    """Sholl frequencies of several neurite types, on the same radii.
 
-    radii = np.arange(min_soma_edge, max_radii + step_size, step_size)
-    ret = np.zeros_like(radii)
-    for neurites, center in neurites_list:
-        ret += sholl_crossings(neurites, center, radii)
+    Args:
+        nrn(morph): nrn or population
+        neurite_types(iterable of NeuriteType): neurite types of the profiles
+        step_size(float): step size between Sholl radii
 
-    return ret
+    Returns:
+        A tuple (radii, profiles): `profiles` maps each neurite type to the Sholl frequency
+        of its neurites, as computed by `sholl_frequency`, at each of the radii.
+    """
+    nrns = neuron_population(nrn)
+    radii = _sholl_radii(nrns, step_size)
+    return radii, {neurite_type: _count_sholl_crossings(
+        _sholl_population_segments(nrns, is_type(neurite_type)), radii).astype(radii.dtype)
+        for neurite_type in neurite_types}
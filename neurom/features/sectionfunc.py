@@ -32,6 +32,7 @@ import numpy as np
 
 from neurom import morphmath as mm
 from neurom.core.dataformat import COLS
+from neurom.core.topology import Topology
 from neurom.morphmath import interval_lengths
 
 
@@ -107,10 +108,24 @@ def section_radial_distance(section, origin):
 
 
 def section_meander_angles(section):
-    """Inter-segment opening angles in a section."""
-    p = section.points
-    return [mm.angle_3points(p[i - 1], p[i - 2], p[i])
-            for i in range(2, len(p))]
+    """Inter-segment opening angles in a section.
+
+    The angles are computed for all the points at once, they are the same as those of
+    neurom.morphmath.angle_3points applied to each triplet of consecutive points.
+    """
+    return _meander_angles(section.points)
+
+
+def _meander_angles(points):
+    """Inter-segment opening angles of the consecutive `points` of a section."""
+    p = points[:, COLS.XYZ]
+    if len(p) < 3:
+        return []
+    vec1 = p[:-2] - p[1:-1]
+    vec2 = p[2:] - p[1:-1]
+    cross = np.cross(vec1, vec2)
+    return np.arctan2(np.sqrt(np.einsum('ij,ij->i', cross, cross)),
+                      np.einsum('ij,ij->i', vec1, vec2)).tolist()
 
 
 def strahler_order(section):
@@ -131,19 +146,11 @@ def strahler_order(section):
          children with greater number, then the Strahler number of the node is
          i + 1.
 
-    No efforts have been invested in making it computationnaly efficient, but
-    it computes acceptably fast on tested morphologies (i.e., no waiting time).
+    The orders of the whole subtree are computed in a single non-recursive pass, see
+    neurom.core.topology.Topology.strahler_orders. To get the orders of all the sections
+    of a neurite, use its topology rather than calling this function on each section.
     """
-    if section.children:
-        child_orders = [strahler_order(child) for child in section.children]
-        max_so_children = max(child_orders)
-        it = iter(co == max_so_children for co in child_orders)
-        #  check if there are *two* or more children w/ the max_so_children
-        any(it)
-        if any(it):
-            return max_so_children + 1
-        return max_so_children
-    return 1
+    return int(Topology((section, )).strahler_orders[0])
 
 
 def locate_segment_position(section, fraction):
@@ -153,11 +160,13 @@ def locate_segment_position(section, fraction):
 
 def section_mean_radius(section):
     """Compute the mean radius of a section weighted by segment lengths."""
-    radii = section.points[:, COLS.R]
-    points = section.points[:, COLS.XYZ]
-    lengths = np.linalg.norm(points[1:] - points[:-1], axis=1)
-    mean_radii = 0.5 * (radii[1:] + radii[:-1])
-    return np.sum(mean_radii * lengths) / np.sum(lengths)
+    return _mean_radius(section.points)
+
+
+def _mean_radius(points):
+    """Mean radius of the `points` of a section weighted by segment lengths."""
+    lengths = mm.segment_lengths(points)
+    return np.sum(mm.segment_radii(points) * lengths) / np.sum(lengths)
 
 
 def downstream_pathlength(section):
@@ -502,6 +502,43 @@ def test_register_neurite_feature_pop():
     n_volume = get_feature('bar', POP, neurite_type=NeuriteType.basal_dendrite)
     assert_items_equal(n_volume, n_volume_ref)
 
+
+def test_get_many():
+    for names, obj in ((NEURITEFEATURES, NEURON), (NEURITEFEATURES, POP),
+                       (NEURITEFEATURES, NRN.neurites[0]), (['trunk_section_lengths'], NEURON)):
+        values = features.get_many(names, obj, NEURITES)
+        nt.eq_(set(values), {(name, neurite_type) for name in names for neurite_type in NEURITES})
+        for (name, neurite_type), value in values.items():
+            np.testing.assert_array_equal(
+                value, get_feature(name, obj, neurite_type=neurite_type), err_msg=name)
+
+    nt.eq_(features.get_many([], NEURON), {})
+    nt.assert_raises(NeuroMError, features.get_many, ['ahah-I-do-not-exist!'], NEURON)
+
+
+def test_get_lazy():
+    names = list(NEURITEFEATURES) + ['sholl_frequency']
+    trunk_names = ['trunk_angles', 'trunk_origin_azimuths', 'trunk_origin_radii',
+                   'trunk_section_lengths', 'trunk_vectors']
+    lazy_neuron = load_neuron(NEURON_PATH, lazy=True)
+    lazy_pop = Population(load_neuron(f, lazy=True) for f in NRN_FILES)
+    for obj, lazy_obj, obj_names in ((NEURON, lazy_neuron, names + trunk_names),
+                                     (POP, lazy_pop, names)):
+        for name in obj_names:
+            for neurite_type in NEURITES:
+                assert_allclose(get_feature(name, lazy_obj, neurite_type=neurite_type),
+                                get_feature(name, obj, neurite_type=neurite_type),
+                                err_msg=name)
+        values = features.get_many(NEURITEFEATURES, lazy_obj, NEURITES)
+        for (name, neurite_type), value in values.items():
+            assert_allclose(value, get_feature(name, obj, neurite_type=neurite_type),
+                            err_msg=name)
+
+    # the features are computed from the arrays of the neurons, the neurites are not built
+    nt.ok_(lazy_neuron._neurites is None)
+    nt.ok_(all(neuron._neurites is None for neuron in lazy_pop))
+
+
 @nt.raises(NeuroMError)
 def test_get_raises():
     get_feature('ahah-I-do-not-exist!', lambda n: None)
@@ -180,6 +180,36 @@ def test_sholl_crossings_simple():
            list(_nf.sholl_crossings(SIMPLE, center, radii=radii)))
 
 
+def test_sholl_crossings_segment_ends():
+    # the spheres through segment ends are crossed, bounds included
+    radii = [0., 1., 5., 6., 7.]
+    nt.eq_(list(_nf.sholl_crossings(SIMPLE, (0, 0, 0), radii=radii)),
+           list(_nf.sholl_crossings(SIMPLE.neurites, SIMPLE.soma.center, radii=radii)))
+    nt.eq_(list(_nf.sholl_crossings(SIMPLE.neurites[0], (0, 0, 0), radii=radii)),
+           [1, 1, 3, 2, 2])
+    nt.eq_(list(_nf.sholl_crossings([], (0, 0, 0), radii=radii)), [0] * 5)
+
+
+def test_sholl_frequency_population():
+    pop = Population([SWC_NRN, SWC_NRN])
+    assert_array_equal(_nf.sholl_frequency(pop), 2 * _nf.sholl_frequency(SWC_NRN))
+
+
+def test_sholl_profiles():
+    radii, profiles = _nf.sholl_profiles(SWC_NRN)
+    assert_array_equal(radii, SWC_NRN.soma.radius + 10 * np.arange(len(radii)))
+    nt.eq_(len(radii), len(_nf.sholl_frequency(SWC_NRN)))
+    nt.eq_(set(profiles), {NeuriteType.axon, NeuriteType.basal_dendrite,
+                           NeuriteType.apical_dendrite})
+    for neurite_type, profile in profiles.items():
+        assert_array_equal(profile, _nf.sholl_frequency(SWC_NRN, neurite_type=neurite_type))
+
+    radii, profiles = _nf.sholl_profiles(Population([SWC_NRN, SWC_NRN]),
+                                         neurite_types=[NeuriteType.all], step_size=1)
+    assert_array_equal(profiles[NeuriteType.all],
+                       2 * _nf.sholl_frequency(SWC_NRN, step_size=1))
+
+
 def load_swc(string):
     with tempfile.NamedTemporaryFile(prefix='test_neuron_func', mode='w', suffix='.swc') as fd:
         fd.write(string)
@@ -31,11 +31,13 @@
 from nose import tools as nt
 from pathlib import Path
 import math
+import sys
 import numpy as np
 import warnings
 from io import StringIO
 from numpy.testing import assert_allclose
 from neurom import load_neuron
+from neurom.core import Section
 
 from neurom.features import sectionfunc as _sf
 from neurom.features import neuritefunc as _nf
@@ -166,6 +168,16 @@ def test_strahler_order():
     nt.eq_(strahler_order, 4)
 
 
+def test_strahler_order_deep_tree():
+    # a chain of sections deeper than the recursion limit, with a leaf at each level
+    root = section = Section(np.zeros((2, 4)))
+    for _ in range(sys.getrecursionlimit() + 10):
+        section.add_child(Section(np.zeros((2, 4))))
+        section = section.add_child(Section(np.zeros((2, 4))))
+    nt.eq_(_sf.strahler_order(root), 2)
+    nt.eq_(_sf.strahler_order(section), 1)
+
+
 def test_locate_segment_position():
     s = load_neuron(StringIO(u"""((CellBody) (0 0 0 0))
     ((Dendrite)
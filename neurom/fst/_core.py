@@ -28,43 +28,190 @@
 
 """Fast neuron IO module."""
 
+from collections import namedtuple
 from copy import deepcopy
+from itertools import chain
 
 import numpy as np
 
-from neurom.core import (Section, Neurite, Neuron, NeuriteType, SomaError)
+from neurom.core import (Section, Neurite, ArrayNeurite, Neuron, NeuriteType, SomaError,
+                         Topology)
 from neurom.core.dataformat import POINT_TYPE, COLS, ROOT_ID
+from neurom.core._neuron import _clear_caches
 from neurom.core._soma import make_soma, SOMA_CONTOUR, SOMA_CYLINDER
+from neurom.exceptions import NeuroMError
+from neurom.utils import cached_property
+
+
+NeuriteArrays = namedtuple('NeuriteArrays', ['topology', 'section_ids', 'points',
+                                             'section_offsets', 'neurite_offsets',
+                                             'neurite_types'])
+
+
+def _points_version(neuron):
+    """Version of the points of the sections of `neuron`, see Section.points_version."""
+    # the versions are increasing, the latest changes whenever one of them does
+    # pylint: disable=protected-access
+    neurites = neuron._neurites
+    return None if neurites is None else max((neurite.root_node._points_version
+                                              for neurite in neurites), default=0)
 
 
 class FstNeuron(Neuron):
-    """Class representing a neuron."""
+    """Class representing a neuron.
 
-    def __init__(self, data_wrapper, name='Neuron'):
-        """Initialize an FstNeuron object."""
+    In lazy mode, the Section and Neurite objects are only built on first access to
+    `neurites` or `sections`. Until then, the neuron is its data block and the arrays of
+    `neurite_arrays`, which `points`, neurom.core.ColumnarPopulation and the features of
+    neurom.features (through `array_neurites`) use without building the objects.
+    """
+
+    def __init__(self, data_wrapper, name='Neuron', lazy=False):
+        """Initialize an FstNeuron object.
+
+        Arguments:
+            data_wrapper: raw data wrapper
+            name(str): name of the neuron
+            lazy(bool): if True, the sections and neurites are built on first access
+        """
         self._data = data_wrapper
-        neurites, sections = make_neurites(self._data)
+        self._neurites = self._sections = None
+        neurites, sections = (None, None) if lazy else make_neurites(self._data)
         soma_check, soma_class = _SOMA_CONFIG[self._data.fmt]
         soma = make_soma(self._data.soma_points(), soma_check, soma_class)
         super().__init__(soma, neurites, sections, name)
-        self._points = None
+
+    def _build_neurites(self):
+        """Build the sections and neurites not built yet."""
+        neurites, sections = make_neurites(self._data)
+        if self._neurites is None:
+            self._neurites = neurites
+        if self._sections is None:
+            self._sections = sections
+
+    @property
+    def neurites(self):
+        """Return the neurites, built on first access in lazy mode."""
+        if self._neurites is None:
+            self._build_neurites()
+        return self._neurites
+
+    @neurites.setter
+    def neurites(self, neurites):
+        """Set the neurites, clearing the cached properties of the neuron."""
+        self._neurites = neurites
+        cached_property.clear(self)
 
     @property
+    def sections(self):
+        """Return the sections, built on first access in lazy mode."""
+        if self._sections is None:
+            self._build_neurites()
+        return self._sections
+
+    @sections.setter
+    def sections(self, sections):
+        """Set the sections."""
+        self._sections = sections
+
+    @cached_property
+    def neurite_arrays(self):
+        """Return the neurite sections as arrays, computed from the data block.
+
+        Returns:
+            a NeuriteArrays named tuple with:
+                - topology: neurom.core.Topology of the neurite sections, neurite after
+                  neurite, in pre-order as with `neurites`, without node objects
+                - section_ids: id of the Section of each node of `topology`
+                - points: x, y, z and radius of the points of the sections, concatenated
+                - section_offsets: offsets of the points of each section in `points`
+                - neurite_offsets: offsets of the sections of each neurite in `topology`
+                - neurite_types: NeuriteType value of each neurite
+
+        The Section and Neurite objects are not built. The arrays are a snapshot of the data
+        block: they are not updated if the section points are modified.
+        """
+        return _neurite_arrays(self._data)
+
+    @cached_property
+    def array_neurites(self):
+        """Return the neurites as neurom.core.ArrayNeurite, computed from `neurite_arrays`.
+
+        The features use them while the neurites of a lazy neuron are not built, see
+        neurom.core.iter_neurites. Like `neurite_arrays`, they are a snapshot of the data block.
+        """
+        arrays = self.neurite_arrays
+        neurite_offsets = arrays.neurite_offsets.tolist()
+        array_neurites = []
+        for topology, neurite_type, start, end in zip(
+                arrays.topology.split(arrays.neurite_offsets), arrays.neurite_types.tolist(),
+                neurite_offsets[:-1], neurite_offsets[1:]):
+            section_offsets = arrays.section_offsets[start:end + 1]
+            array_neurites.append(ArrayNeurite(
+                NeuriteType(neurite_type), topology,
+                arrays.points[section_offsets[0]:section_offsets[-1]],
+                section_offsets - section_offsets[0]))
+        return tuple(array_neurites)
+
+    @cached_property.versioned(_points_version)
     def points(self):
-        """Return unordered array with all the points in this neuron."""
-        if self._points is None:
-            _points = self.soma.points.tolist()
-            for n in self.neurites:
-                _points.extend(n.points.tolist())
-            self._points = np.array(_points)
+        """Return unordered array with all the points in this neuron.
+
+        The array is cached, it is the same at each access and must not be modified.
+        """
+        if self._neurites is None:
+            arrays = self.neurite_arrays
+            # all the points but the first ones of the sections, duplicates of the
+            # last ones of their parents, except for the neurite roots
+            duplicates = arrays.section_offsets[:-1][arrays.topology.parents >= 0]
+            neurite_points = [np.delete(arrays.points, duplicates, axis=0)]
+        else:
+            neurite_points = [n.points for n in self._neurites]
+        return np.concatenate([self.soma.points[:, COLS.XYZR]] + neurite_points)
 
-        return self._points
+    def clear_caches(self):
+        """Clear the cached properties of this neuron, of its neurites and of its sections.
 
-    def transform(self, trans):
-        """Return a copy of this neuron with a 3D transformation applied."""
-        _data = deepcopy(self._data)
-        _data.data_block[:, 0:3] = trans(_data.data_block[:, 0:3])
-        return FstNeuron(_data, self.name)
+        The sections and neurites of a lazy neuron are not built for that, see
+        Neurite.clear_caches.
+        """
+        _clear_caches(self, self._neurites, self._sections)
+
+    def transform(self, trans, inplace=False):
+        """Return a copy of this neuron with a 3D transformation applied.
+
+        Arguments:
+            trans: 3D transformation, see neurom.geom.transform.Transform3D
+            inplace(bool): if True, the data block is transformed in place and the neuron
+                itself is returned, without building new neurites. The soma is made again
+                and the points of the sections become views of the data block again, so that
+                both stay consistent, and the cached properties are cleared.
+
+        In both cases, the points of the built sections, which may have been modified, are
+        first written to the data block, of the copy if not `inplace`.
+
+        Raises:
+            NeuroMError if the number of points of a built section was changed
+        """
+        if not inplace:
+            _data = deepcopy(self._data)
+            if self._sections is not None:
+                _store_section_points(_data, self._sections)
+            _data.data_block[:, COLS.XYZ] = trans(_data.data_block[:, COLS.XYZ])
+            return FstNeuron(_data, self.name, lazy=self._neurites is None)
+
+        if not self._data.data_block.flags.writeable:
+            self._data.data_block = self._data.data_block.copy()
+        if self._sections is not None:
+            _store_section_points(self._data, self._sections)
+        data_block = self._data.data_block
+        data_block[:, COLS.XYZ] = trans(data_block[:, COLS.XYZ])
+        soma_check, soma_class = _SOMA_CONFIG[self._data.fmt]
+        self.soma = make_soma(self._data.soma_points(), soma_check, soma_class)
+        if self._sections is not None:
+            _reset_section_points(self._data, self._sections)
+        self.clear_caches()
+        return self
 
     def __deepcopy__(self, memo):
         """Deep-copy neuron object.
@@ -73,21 +220,169 @@ class FstNeuron(Neuron):
             Efficient copying is performed by deep-copying the internal
             data block and building a neuron from it
         """
-        return FstNeuron(deepcopy(self._data, memo), self.name)
+        return FstNeuron(deepcopy(self._data, memo), self.name, lazy=self._neurites is None)
 
 
-def make_neurites(rdw):
-    """Build neurite trees from a raw data wrapper."""
+def _section_rows(rdw, section_ids, roots):
+    """Rows of the data block of the points of the `section_ids` sections, concatenated.
+
+    The first point of the `roots` sections is dropped if the neurites of the data format are
+    post-processed with `_remove_soma_initial_point`, and is a soma point.
+
+    Returns:
+        tuple (rows, section_offsets) with the offsets of the rows of each section
+    """
+    n_rows = len(rdw.data_block)
+    all_ids = [rdw.sections[i].ids for i in section_ids.tolist()]
+    all_ids = [range(*ids.indices(n_rows)) if isinstance(ids, slice) else ids
+               for ids in all_ids]
+    if _NEURITE_ACTION[rdw.fmt] is _remove_soma_initial_point:
+        for i in roots:
+            if rdw.section_start_type(section_ids[i]) == POINT_TYPE.SOMA:
+                all_ids[i] = all_ids[i][1:]
+
+    section_offsets = np.zeros(len(all_ids) + 1, dtype=np.intp)
+    np.cumsum([len(ids) for ids in all_ids], out=section_offsets[1:])
+    rows = np.fromiter(chain.from_iterable(all_ids), dtype=np.intp, count=section_offsets[-1])
+    return rows, section_offsets
+
+
+def _neurite_arrays(rdw):
+    """Compute the NeuriteArrays of a raw data wrapper, see FstNeuron.neurite_arrays.
+
+    The sections and their points are those of `make_neurites`: sections are connected to
+    their parents unless these are soma sections, and the neurites start at the
+    `neurite_root_section_ids`.
+    """
+    n_sections = len(rdw.sections)
+    ntypes = np.fromiter((sec.ntype for sec in rdw.sections), dtype=np.intp, count=n_sections)
+    pids = np.fromiter((sec.pid for sec in rdw.sections), dtype=np.intp, count=n_sections)
+    connected = (pids != ROOT_ID) & (ntypes[pids] != POINT_TYPE.SOMA)
+    trunks = rdw.neurite_root_section_ids()
+    topology, section_ids = Topology.from_parents(np.where(connected, pids, -1), trunks)
+
+    roots = np.flatnonzero(topology.parents < 0).tolist()
+    rows, section_offsets = _section_rows(rdw, section_ids, roots)
+    neurite_offsets = np.append(roots, len(topology)).astype(np.intp)
+    neurite_types = np.array([_TREE_TYPES[ntypes[i]].value for i in section_ids[roots]],
+                             dtype=np.intp)
+    return NeuriteArrays(topology, section_ids, rdw.data_block[rows][:, COLS.XYZR],
+                         section_offsets, neurite_offsets, neurite_types)
+
+
+def _section_points(rdw):
+    """Return the points of each section of a raw data wrapper, as views of the data block.
+
+    The first point of a section is the last point of its parent. The sections whose points
+    are consecutive rows of the data block, which is the case of the first child of a
+    section in depth-first ordered files, are views of the data block. The points of the
+    other sections are gathered in one index array to build, in a single copy, a buffer in
+    which they are contiguous: only these sections are copied, their first point being an
+    explicit duplicate row, exactly as in the per-section copies ``rdw.data_block[sec.ids]``.
+    """
+    data_block = rdw.data_block
+    n_rows = len(data_block)
+    all_ids = [sec.ids for sec in rdw.sections]
+    if all(isinstance(ids, slice) for ids in all_ids):
+        return [data_block[ids] for ids in all_ids]
+
+    all_ids = [range(*ids.indices(n_rows)) if isinstance(ids, slice) else ids
+               for ids in all_ids]
+    lengths = np.fromiter(map(len, all_ids), dtype=np.intp, count=len(all_ids))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    rows = np.fromiter(chain.from_iterable(all_ids), dtype=np.intp,
+                       count=int(ends[-1]) if len(ends) else 0)
+
+    # number of breaks in the sequence of rows up to each position
+    breaks = np.zeros(len(rows), dtype=np.intp)
+    np.cumsum(np.diff(rows) != 1, out=breaks[1:])
+    first_rows = np.where(lengths > 0, rows[np.minimum(starts, len(rows) - 1)], 0)
+    # a first row of -1 refers to the last point of the data block
+    is_view = ((breaks[np.maximum(ends - 1, starts)] == breaks[starts]) & (first_rows >= 0))
+
+    copied = np.repeat(~is_view, lengths)
+    buffer = data_block[rows[copied]]
+    buffer_ends = np.cumsum(np.where(is_view, 0, lengths)).tolist()
+    first_rows = first_rows.tolist()
+    return [data_block[first:first + length] if view else buffer[end - length:end]
+            for view, first, length, end in zip(is_view.tolist(), first_rows,
+                                                lengths.tolist(), buffer_ends)]
+
+
+def _store_section_points(rdw, sections):
+    """Write the points of the `sections` built by `make_neurites` to the data block.
+
+    The first point of a section is not written if it is the last point of its parent, which
+    holds it, and the soma sections are not written since the soma is made from the data block.
+
+    Raises:
+        NeuroMError if the number of points of a section does not match the data block
+    """
+    data_block = rdw.data_block
+    n_rows = len(data_block)
+    all_ids = [range(*sec.ids.indices(n_rows)) if isinstance(sec.ids, slice) else sec.ids
+               for sec in rdw.sections]
+    stripped = set()
+    if _NEURITE_ACTION[rdw.fmt] is _remove_soma_initial_point:
+        stripped = {i for i in rdw.neurite_root_section_ids()
+                    if rdw.section_start_type(i) == POINT_TYPE.SOMA}
+
+    rows, points = [], []
+    for i, (sec, ids, section) in enumerate(zip(rdw.sections, all_ids, sections)):
+        if sec.ntype == POINT_TYPE.SOMA:
+            continue
+        section_points = section.points
+        if i in stripped:
+            ids = ids[1:]
+        if len(section_points) != len(ids):
+            raise NeuroMError('The points of section %d do not match the data block, they '
+                              'can not be transformed in place' % i)
+        parent_ids = all_ids[sec.pid] if sec.pid != ROOT_ID else ()
+        if len(ids) and len(parent_ids) and ids[0] == parent_ids[-1]:
+            ids, section_points = ids[1:], section_points[1:]
+        rows.append(ids)
+        points.append(section_points)
+
+    if rows:
+        n_points = sum(len(ids) for ids in rows)
+        rows = np.fromiter(chain.from_iterable(rows), dtype=np.intp, count=n_points)
+        data_block[rows] = np.concatenate(points)
+
+
+def _reset_section_points(rdw, sections):
+    """Set the points of the `sections` built by `make_neurites` from the data block again."""
+    for section, points in zip(sections, _section_points(rdw)):
+        section._points = points  # pylint: disable=protected-access
+    post_action = _NEURITE_ACTION[rdw.fmt]
+    if post_action is not None:
+        for i in rdw.neurite_root_section_ids():
+            post_action(rdw, sections[i])
+
+
+def make_neurites(rdw, contiguous=True):
+    """Build neurite trees from a raw data wrapper.
+
+    Arguments:
+        rdw: raw data wrapper
+        contiguous(bool): if True, the points of the sections are views of a single buffer
+            (see `_section_points`), otherwise each section gets its own copy
+    """
     post_action = _NEURITE_ACTION[rdw.fmt]
     trunks = rdw.neurite_root_section_ids()
     if not trunks:
         return [], []
 
+    if contiguous:
+        points = _section_points(rdw)
+    else:
+        points = (rdw.data_block[sec.ids] for sec in rdw.sections)
+
     # One pass over sections to build nodes
     nodes = tuple(Section(section_id=i,
-                          points=rdw.data_block[sec.ids],
+                          points=sec_points,
                           section_type=_TREE_TYPES[sec.ntype])
-                  for i, sec in enumerate(rdw.sections))
+                  for i, (sec, sec_points) in enumerate(zip(rdw.sections, points)))
 
     # One pass over nodes to connect children to parents
     for i, node in enumerate(nodes):
@@ -101,14 +396,14 @@ def make_neurites(rdw):
 
     if post_action is not None:
         for n in neurites:
-            post_action(n.root_node)
+            post_action(rdw, n.root_node)
 
     return neurites, nodes
 
 
-def _remove_soma_initial_point(tree):
+def _remove_soma_initial_point(rdw, tree):
     """Remove tree's initial point if soma."""
-    if tree.points[0][COLS.TYPE] == POINT_TYPE.SOMA:
+    if rdw.section_start_type(tree.id) == POINT_TYPE.SOMA:
         tree.points = tree.points[1:]
 
 
@@ -90,3 +90,70 @@ def test_neurite_deepcopy():
     nt.assert_true(nrt is not nrt2)
 
     _check_cloned_neurites(nrt, nrt2)
+
+
+def test_make_neurites_contiguous():
+    for filename in FILENAMES + [Path(DATA_ROOT, 'neurolucida', 'bio_neuron-000.asc')]:
+        rdw = _io.load_data(filename)
+        neurites, sections = _core.make_neurites(rdw)
+        ref_neurites, ref_sections = _core.make_neurites(rdw, contiguous=False)
+
+        nt.eq_(len(neurites), len(ref_neurites))
+        for a, b in zip(neurites, ref_neurites):
+            _check_cloned_neurites(a, b)
+
+        nt.eq_(len(sections), len(ref_sections))
+        for sec, ref in zip(sections, ref_sections):
+            nt.eq_(sec.id, ref.id)
+            np.testing.assert_array_equal(sec.points, ref.points)
+            nt.eq_([c.id for c in sec.children], [c.id for c in ref.children])
+
+        # the sections made of consecutive rows are views of the data block,
+        # the others are non-overlapping views of one copied buffer
+        views = [np.shares_memory(sec.points, rdw.data_block) for sec in sections]
+        nt.assert_true(any(views))
+        copies = [sec.points for sec, view in zip(sections, views) if not view]
+        nt.ok_(len(set(id(points.base) for points in copies)) <= 1)
+        for points, next_points in zip(copies[:-1], copies[1:]):
+            nt.assert_false(np.shares_memory(points, next_points))
+
+
+def test_lazy_neuron():
+    for filename in FILENAMES + [Path(DATA_ROOT, 'neurolucida', 'bio_neuron-000.asc')]:
+        rdw = _io.load_data(filename)
+        ref = _core.FstNeuron(rdw)
+        nrn = _core.FstNeuron(rdw, lazy=True)
+        nt.ok_(nrn._neurites is None and nrn._sections is None)
+
+        arrays = nrn.neurite_arrays
+        np.testing.assert_array_equal(nrn.points, ref.points)
+        nt.ok_(nrn._neurites is None and nrn._sections is None)
+
+        sections = [s for neurite in ref.neurites for s in neurite.topology.nodes]
+        nt.eq_(arrays.section_ids.tolist(), [s.id for s in sections])
+        np.testing.assert_array_equal(arrays.topology.parents, ref.topology.parents)
+        np.testing.assert_array_equal(arrays.topology.depths, ref.topology.depths)
+        np.testing.assert_array_equal(arrays.points,
+                                      np.concatenate([s.points[:, :4] for s in sections]))
+        np.testing.assert_array_equal(np.diff(arrays.section_offsets),
+                                      [len(s.points) for s in sections])
+        nt.eq_(arrays.neurite_types.tolist(), [n.type.value for n in ref.neurites])
+
+        # the sections are built on first access
+        nt.eq_(len(nrn.neurites), len(ref.neurites))
+        nt.eq_([s.id for s in nrn.sections], [s.id for s in ref.sections])
+        nt.ok_(deepcopy(_core.FstNeuron(rdw, lazy=True))._neurites is None)
+
+
+def test_neuron_cache_invalidation():
+    nrn = _core.FstNeuron(_io.load_data(FILENAMES[0]), lazy=True)
+    n_points = len(nrn.points)
+    nrn.clear_caches()
+    nt.ok_(nrn._neurites is None)
+
+    section = nrn.neurites[0].root_node
+    section.points = section.points[1:]
+    nt.eq_(len(nrn.points), n_points - 1)
+    topology = nrn.topology
+    nrn.clear_caches()
+    nt.ok_(nrn.topology is not topology)
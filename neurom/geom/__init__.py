@@ -30,7 +30,7 @@
 
 import numpy as np
 from scipy.spatial import ConvexHull
-from .transform import translate, rotate
+from .transform import translate, rotate, transform_population
 
 
 def bounding_box(obj):
@@ -32,6 +32,8 @@ from pathlib import Path
 import neurom.geom.transform as gtr
 import numpy as np
 from neurom import load_neuron
+from neurom.exceptions import NeuroMError
+from neurom.core.population import LazyPopulation, Population
 from neurom.features import neuritefunc as _nf
 from nose import tools as nt
 
@@ -208,6 +210,25 @@ def test_pivot_rotate_points():
     nt.assert_true(np.all(p1 == p2))
 
 
+def test_affine():
+    points = np.array([[1., 2., 3.], [4., 5., 6.], [7., 8., 9.]])
+    R = gtr._rodrigues_to_dcm(TEST_UVEC, TEST_ANGLE)
+    transforms = (gtr.Translation([100, -100, 100]), gtr.Rotation(R),
+                  gtr.PivotRotation(R, [10., 45., 50.]), gtr.Affine(np.diag([1., 2., 3.])))
+    for t in transforms:
+        np.testing.assert_allclose(gtr.Affine(t.affine)(points), t(points))
+        np.testing.assert_allclose(gtr.Affine(t.affine[:3])(points[0]), t(points[0]))
+
+    ref = points
+    for t in transforms:
+        ref = t(ref)
+    np.testing.assert_allclose(gtr.compose(*transforms)(points), ref)
+    np.testing.assert_allclose((transforms[1] @ transforms[0])(points),
+                               transforms[1](transforms[0](points)))
+    np.testing.assert_allclose(gtr.compose()(points), points)
+    nt.assert_raises(NotImplementedError, lambda: gtr.Transform3D().affine)
+
+
 def _check_fst_nrn_translate(nrn_a, nrn_b, t):
 
     # soma points
@@ -371,3 +392,96 @@ def test_rodrigues_to_dcm():
         nt.assert_true(np.allclose(Rx, _Rx(angle)))
         nt.assert_true(np.allclose(Ry, _Ry(angle)))
         nt.assert_true(np.allclose(Rz, _Rz(angle)))
+
+
+def test_transform_inplace():
+    t = gtr.compose(gtr.Rotation(ROT_90), gtr.Translation([100., 100., 100.]))
+    for path in (SWC_NRN_PATH, H5_NRN_PATH):
+        for lazy in (False, True):
+            nrn_a = load_neuron(path, lazy=lazy)
+            nrn_b = load_neuron(path, lazy=lazy)
+            points, arrays = nrn_b.points, nrn_b.neurite_arrays
+            nt.assert_true(nrn_b.transform(t, inplace=True) is nrn_b)
+            nt.assert_equal(nrn_b._neurites is None, lazy)
+
+            ref = nrn_a.transform(t)
+            np.testing.assert_allclose(nrn_b.points, ref.points)
+            np.testing.assert_allclose(nrn_b.neurite_arrays.points, ref.neurite_arrays.points)
+            np.testing.assert_allclose(nrn_b.soma.points, ref.soma.points)
+            nt.assert_false(np.allclose(nrn_b.points, points))
+            nt.assert_false(np.allclose(nrn_b.neurite_arrays.points, arrays.points))
+            for sa, sb in zip(nrn_b.sections, ref.sections):
+                np.testing.assert_allclose(sa.points, sb.points)
+            for na, nb in zip(nrn_b.neurites, ref.neurites):
+                nt.assert_almost_equal(na.length, nb.length)
+
+
+def test_transform_inplace_section_edits():
+    t = gtr.Translation([100., 100., 100.])
+    for path in (SWC_NRN_PATH, H5_NRN_PATH):
+        ref = load_neuron(path)
+        nrn = load_neuron(path)
+        nrn.neurites[0].transform(t, inplace=True)
+        section = nrn.neurites[1].root_node
+        section.points = section.points * 2.
+        nrn.transform(t, inplace=True)
+
+        np.testing.assert_allclose(nrn.neurites[0].points[:, :3],
+                                   ref.neurites[0].points[:, :3] + 200.)
+        np.testing.assert_allclose(section.points[:, :3],
+                                   ref.neurites[1].root_node.points[:, :3] * 2. + 100.)
+        for neurite, ref_neurite in zip(nrn.neurites[2:], ref.neurites[2:]):
+            np.testing.assert_allclose(neurite.points[:, :3], ref_neurite.points[:, :3] + 100.)
+
+        section.points = section.points[:2]
+        nt.assert_raises(NeuroMError, nrn.transform, t, inplace=True)
+        nt.assert_raises(NeuroMError, nrn.transform, t)
+
+
+def test_transform_copy_section_edits():
+    t = gtr.compose(gtr.Rotation(ROT_90), gtr.Translation([100., 100., 100.]))
+    for path in (SWC_NRN_PATH, H5_NRN_PATH):
+        nrn = load_neuron(path)
+        nrn.neurites[0].transform(t, inplace=True)
+        section = nrn.neurites[1].root_node
+        section.points = section.points * 2.
+
+        copy = nrn.transform(t)
+        nt.assert_true(copy is not nrn)
+        np.testing.assert_allclose(copy.points, nrn.transform(t, inplace=True).points)
+        for sa, sb in zip(copy.sections, nrn.sections):
+            np.testing.assert_allclose(sa.points, sb.points)
+
+
+def test_translate_inplace():
+    t = np.array([100., 100., 100.])
+    nrn = load_neuron(SWC_NRN_PATH)
+    nrt = nrn.neurites[0]
+    ref = gtr.translate(nrt, t)
+    nt.assert_true(gtr.translate(nrt, t, inplace=True) is nrt)
+    _check_fst_neurite_translate(ref, nrt, 0)
+
+    nrn = load_neuron(H5_NRN_PATH)
+    ref = gtr.rotate(nrn, [0, 0, 1], math.pi / 2.0, origin=t)
+    nt.assert_true(gtr.rotate(nrn, [0, 0, 1], math.pi / 2.0, origin=t, inplace=True) is nrn)
+    _check_fst_nrn_translate(ref, nrn, 0)
+
+
+def test_transform_population():
+    neurons = [load_neuron(SWC_NRN_PATH), load_neuron(H5_NRN_PATH, lazy=True)]
+    refs = [load_neuron(SWC_NRN_PATH), load_neuron(H5_NRN_PATH)]
+    pop = Population(neurons)
+    t0 = gtr.Translation([100., 100., 100.])
+    t1 = gtr.Rotation(ROT_90)
+    nt.assert_true(gtr.transform_population(pop, [t0, (t1, t0)]) is pop)
+    np.testing.assert_allclose(neurons[0].points[:, :3], t0(refs[0].points[:, :3]))
+    np.testing.assert_allclose(neurons[1].points[:, :3], t0(t1(refs[1].points[:, :3])))
+    np.testing.assert_allclose(pop.somata[1].points[:, :3], t0(t1(refs[1].soma.points[:, :3])))
+
+    gtr.transform_population(neurons, t1)
+    np.testing.assert_allclose(neurons[0].points[:, :3], t1(t0(refs[0].points[:, :3])))
+
+    nt.assert_raises(ValueError, gtr.transform_population, pop, [t0])
+    nt.assert_raises(NotImplementedError, gtr.transform_population,
+                     LazyPopulation([SWC_NRN_PATH], load_neuron), t0)
+
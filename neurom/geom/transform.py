@@ -28,8 +28,12 @@
 
 """Transformation functions for morphology objects."""
 
+from functools import reduce
+
 import numpy as np
 
+from neurom.core.population import LazyPopulation
+
 
 _TRANSFDOC = """
 
@@ -46,13 +50,55 @@ _TRANSFDOC = """
 
 
 class Transform3D(object):
-    """Class representing a generic 3D transformation."""
+    """Class representing a generic 3D transformation.
+
+    Affine transformations define `affine`, and compose with the `@` operator into a single
+    Affine transformation: ``(t2 @ t1)(points)`` is ``t2(t1(points))``, see `compose`.
+    """
     __doc__ += _TRANSFDOC
 
     def __call__(self, points):
         """Apply a 3D transformation to a set of points."""
         raise NotImplementedError
 
+    @property
+    def affine(self):
+        """Return the 4x4 matrix of the transformation in homogeneous coordinates.
+
+        Raises:
+            NotImplementedError if the transformation is not affine
+        """
+        raise NotImplementedError
+
+    def __matmul__(self, other):
+        """Return the Affine transformation applying `other`, then this one."""
+        return Affine(self.affine @ other.affine)
+
+
+class Affine(Transform3D):
+    """Class representing a 3D affine transformation."""
+    __doc__ += _TRANSFDOC
+
+    def __init__(self, matrix):
+        """Initialize a 3D affine transformation.
+
+        Arguments:
+            matrix: 4x4 matrix in homogeneous coordinates, or its first 3 rows, or a 3x3
+                linear transformation matrix
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        self._matrix = np.identity(4)
+        self._matrix[:matrix.shape[0], :matrix.shape[1]] = matrix
+
+    @property
+    def affine(self):
+        """Return the 4x4 matrix of the transformation in homogeneous coordinates."""
+        return self._matrix
+
+    def __call__(self, points):
+        """Apply a 3D affine transformation to a set of points."""
+        return np.dot(points, self._matrix[:3, :3].T) + self._matrix[:3, 3]
+
 
 class Translation(Transform3D):
     """Class representing a 3D translation."""
@@ -70,6 +116,13 @@ class Translation(Transform3D):
         """Apply a 3D translation to a set of points."""
         return points + self._trans
 
+    @property
+    def affine(self):
+        """Return the 4x4 matrix of the translation in homogeneous coordinates."""
+        matrix = np.identity(4)
+        matrix[:3, 3] = self._trans
+        return matrix
+
 
 class Rotation(Transform3D):
     """Class representing a 3D rotation."""
@@ -87,6 +140,13 @@ class Rotation(Transform3D):
         """Apply a 3D rotation to a set of points."""
         return np.dot(self._dcm, np.array(points).T).T
 
+    @property
+    def affine(self):
+        """Return the 4x4 matrix of the rotation in homogeneous coordinates."""
+        matrix = np.identity(4)
+        matrix[:3, :3] = self._dcm
+        return matrix
+
 
 class PivotRotation(Rotation):
     """Class representing a 3D rotation about a pivot point."""
@@ -109,24 +169,52 @@ class PivotRotation(Rotation):
         points += self._origin
         return points
 
+    @property
+    def affine(self):
+        """Return the 4x4 matrix of the pivoted rotation in homogeneous coordinates."""
+        matrix = super().affine
+        matrix[:3, 3] = self._origin - np.dot(self._dcm, self._origin)
+        return matrix
 
-def translate(obj, t):
-    """Translate object of supported type.
+
+def compose(*transforms):
+    """Compose affine transformations into one.
 
     Arguments:
-        obj : object to be translated. Must implement a transform method.
-        t: translation 3-vector
+        transforms: Transform3D objects defining `affine`, in the order they are applied
 
     Returns:
-        copy of the object with the applied translation
+        the Affine transformation applying all the `transforms` at once
     """
+    return Affine(reduce(lambda matrix, t: t.affine @ matrix,
+                         transforms, np.identity(4)))
+
+
+def _transform(obj, trans, inplace):
+    """Apply `trans` to `obj` with its transform method, see `translate`."""
     try:
-        return obj.transform(Translation(t))
+        transform = obj.transform
     except AttributeError as e:
         raise NotImplementedError from e
+    return transform(trans, inplace=True) if inplace else transform(trans)
+
+
+def translate(obj, t, inplace=False):
+    """Translate object of supported type.
 
+    Arguments:
+        obj : object to be translated. Must implement a transform method.
+        t: translation 3-vector
+        inplace(bool): if True, the object itself is translated, its transform method
+            must then accept an `inplace` argument
+
+    Returns:
+        copy of the object with the applied translation, or the object if `inplace`
+    """
+    return _transform(obj, Translation(t), inplace)
 
-def rotate(obj, axis, angle, origin=None):
+
+def rotate(obj, axis, angle, origin=None, inplace=False):
     """Rotation around unit vector following the right hand rule.
 
     Arguments:
@@ -135,16 +223,46 @@ def rotate(obj, axis, angle, origin=None):
         axis : unit vector for the axis of rotation
         angle : rotation angle in rads
         origin : specify the origin about which rotation occurs
+        inplace(bool): if True, the object itself is rotated, see `translate`
 
     Returns:
-        A copy of the object with the applied translation.
+        A copy of the object with the applied translation, or the object if `inplace`.
     """
     R = _rodrigues_to_dcm(axis, angle)
+    return _transform(obj, PivotRotation(R, origin), inplace)
 
-    try:
-        return obj.transform(PivotRotation(R, origin))
-    except AttributeError as e:
-        raise NotImplementedError from e
+
+def transform_population(population, transforms):
+    """Transform in place each neuron of a population by its own affine transformation.
+
+    The neurons are transformed one after the other, each one in place with one vectorized
+    pass over its points (see neurom.fst.FstNeuron.transform), its cached geometrical
+    properties being cleared.
+
+    Arguments:
+        population: Population, or sequence of neurons, whose transform method accepts an
+            `inplace` argument. LazyPopulations are not supported: their neurons would be
+            loaded again without the transformation.
+        transforms: one affine Transform3D for all the neurons, or a sequence with one
+            Transform3D, or one sequence of Transform3D applied in order (see `compose`),
+            per neuron
+
+    Returns:
+        the population
+    """
+    if isinstance(population, LazyPopulation):
+        raise NotImplementedError('The neurons of a LazyPopulation cannot be transformed in place')
+    neurons = getattr(population, 'neurons', population)
+    if isinstance(transforms, Transform3D):
+        transforms = [transforms] * len(neurons)
+    else:
+        transforms = [t if isinstance(t, Transform3D) else compose(*t) for t in transforms]
+        if len(transforms) != len(neurons):
+            raise ValueError('Expected %d transformations, got %d' %
+                             (len(neurons), len(transforms)))
+    for neuron, trans in zip(neurons, transforms):
+        neuron.transform(trans, inplace=True)
+    return population
 
 
 def _sin(x):
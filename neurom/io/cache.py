@@ -0,0 +1,210 @@
+# Copyright (c) 2020, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Persistent on-disk cache of parsed morphology files.
+
+Each morphology file gets one entry in the cache directory, named after a hash
+of its resolved path and of the reader used to parse it. An entry is made of:
+
+    1. a fixed size header (see `_HEADER`) with the size, modification time and
+       contents hash of the file, the data format and the array shapes
+    2. the section table, see `neurom.io.datawrapper._pack_sections`
+    3. the section ids given as lists, concatenated
+    4. the data block, aligned on `neurom.io.datawrapper.ALIGNMENT` bytes
+
+An entry is used as long as the file size and modification time are unchanged.
+If only the modification time differs, the contents hash decides whether the
+entry is still valid, so that touched or copied files are not parsed again.
+
+Large data blocks are memory-mapped copy-on-write: pages are read lazily, and
+modifications stay private to the process. Since every memory map keeps a file
+descriptor open, data blocks smaller than `_MMAP_MIN_BYTES` are read in memory,
+which is as fast for them and allows loading whole populations.
+
+Entries are written to a temporary file in the cache directory and atomically
+renamed, so several processes can share the same cache: readers see either a
+complete old entry or a complete new one.
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from neurom.io.datawrapper import (_TABLE_COLS, DataWrapper, _pack_sections, _unpack_sections,
+                                   aligned_offset)
+
+L = logging.getLogger(__name__)
+
+# Bump when the layout of an entry changes, so that old entries are ignored
+CACHE_VERSION = 1
+
+_ENTRY_SUFFIX = '.nrmc'
+_MAGIC = b'NEUROMC%d' % CACHE_VERSION
+# magic, contents hash, file size, file mtime in ns, number of sections, number of ids,
+# number of rows and columns of the data block, dtype of the data block, data format
+_HEADER = struct.Struct('<8s20sqqqqqq8s32s')
+# Each memory map holds a file descriptor: smaller data blocks are simply read
+_MMAP_MIN_BYTES = 1 << 20
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def _entry_path(cache_dir, filename, reader):
+    """Path of the cache entry of `filename` read with `reader`."""
+    key = '\0'.join((str(CACHE_VERSION), reader, os.path.realpath(filename)))
+    return Path(cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + _ENTRY_SUFFIX)
+
+
+def _content_hash(filename):
+    """Hash of the contents of `filename`."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(filename, 'rb') as fd:
+        for block in iter(partial(fd.read, _HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.digest()
+
+
+def _read_header(fd):
+    """Read and check the header of a cache entry."""
+    header = fd.read(_HEADER.size)
+    if len(header) != _HEADER.size:
+        raise ValueError('Truncated header')
+    header = _HEADER.unpack(header)
+    if header[0] != _MAGIC:
+        raise ValueError('Not a cache entry')
+    return header
+
+
+def _read_int64(fd, count):
+    """Read `count` little endian int64 from `fd`."""
+    buf = fd.read(8 * count)
+    if len(buf) != 8 * count:
+        raise ValueError('Truncated entry')
+    return np.frombuffer(buf, dtype='<i8')
+
+
+def _read_data(fd, header):
+    """Read the DataWrapper stored after the header of the entry open as `fd`.
+
+    Large data blocks are memory-mapped from `fd`, the map keeping its own descriptor.
+    """
+    _, _, _, _, n_sections, n_ids, n_rows, n_cols, dtype, fmt = header
+    table = _read_int64(fd, n_sections * _TABLE_COLS).reshape(n_sections, _TABLE_COLS)
+    ids = _read_int64(fd, n_ids)
+    dtype = np.dtype(dtype.rstrip(b'\0').decode('ascii'))
+    offset = aligned_offset(fd.tell())
+    if n_rows * n_cols * dtype.itemsize >= _MMAP_MIN_BYTES:
+        data_block = np.memmap(fd, dtype=dtype, mode='c', shape=(n_rows, n_cols),
+                               offset=offset)
+    else:
+        data_block = np.empty((n_rows, n_cols), dtype=dtype)
+        fd.seek(offset)
+        if fd.readinto(data_block) != data_block.nbytes:
+            raise ValueError('Truncated entry')
+    return DataWrapper(data_block, fmt.rstrip(b'\0').decode('utf-8'),
+                       _unpack_sections(table, ids))
+
+
+def _write_entry(entry, data, content_hash, stat):
+    """Atomically write `data`, a DataWrapper, to the cache entry `entry`."""
+    table, ids = _pack_sections(data.sections)
+    data_block = np.ascontiguousarray(data.data_block)
+    data_block = data_block.astype(data_block.dtype.newbyteorder('<'), copy=False)
+    header = _HEADER.pack(_MAGIC, content_hash, stat.st_size, stat.st_mtime_ns,
+                          len(table), len(ids), data_block.shape[0], data_block.shape[1],
+                          data_block.dtype.str.encode('ascii'), data.fmt.encode('utf-8'))
+
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_file = tempfile.mkstemp(prefix=entry.stem, suffix='.tmp', dir=str(entry.parent))
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(header)
+            out.write(table.tobytes())
+            out.write(ids.tobytes())
+            out.write(bytes(aligned_offset(out.tell()) - out.tell()))
+            out.write(data_block.tobytes())
+        os.replace(temp_file, str(entry))
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+
+def _try_write_entry(entry, data, content_hash, stat):
+    """Write a cache entry, logging failures instead of raising."""
+    try:
+        _write_entry(entry, data, content_hash, stat)
+    except OSError as e:
+        L.warning('Could not write cache entry %s: %s', entry, e)
+
+
+def read(cache_dir, filename, reader, read_file):
+    """Read a morphology file through the cache.
+
+    Arguments:
+        cache_dir: directory of the cache, created if needed
+        filename: path to the morphology file
+        reader(str): name of the reader, part of the cache key
+        read_file: function parsing `filename` into a DataWrapper, used on cache misses
+
+    Returns:
+        a DataWrapper, whose data block may be memory-mapped if it comes from the cache
+
+    Note:
+        Problems with the cache itself (invalid entries, read-only directory, ...)
+        are logged and fall back to parsing the file, they never make loading fail.
+    """
+    entry = _entry_path(cache_dir, filename, reader)
+    stat = os.stat(filename)
+    content_hash = None
+    try:
+        with open(entry, 'rb') as fd:
+            header = _read_header(fd)
+            _, entry_hash, size, mtime_ns = header[:4]
+            if size == stat.st_size:
+                if mtime_ns == stat.st_mtime_ns:
+                    return _read_data(fd, header)
+                content_hash = _content_hash(filename)
+                if content_hash == entry_hash:
+                    data = _read_data(fd, header)
+                    _try_write_entry(entry, data, content_hash, stat)
+                    return data
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        L.warning('Ignoring invalid cache entry %s for %s: %s', entry, filename, e)
+
+    if content_hash is None:
+        content_hash = _content_hash(filename)
+    data = read_file(filename)
+    _try_write_entry(entry, data, content_hash, stat)
+    return data
@@ -0,0 +1,246 @@
+# Copyright (c) 2020, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Container files packing the raw data of many neurons.
+
+Populations stored as one file per neuron spend most of their loading time opening,
+closing and looking up files. A container stores the parsed data of many neurons in a
+single file, which is memory-mapped once: reading a neuron only slices the map, so any
+subset of the neurons is read by name with random access.
+
+A container file is made of:
+
+    1. a fixed size header (see `_HEADER`) with the number of neurons and the offsets of
+       the index and of the names
+    2. for each neuron, its section table and its section ids (see
+       `neurom.io.datawrapper._pack_sections`), its data block and, if the data block is
+       compact, its structure block, each aligned on `neurom.io.datawrapper.ALIGNMENT`
+       bytes
+    3. the index, an array of `_INDEX_DTYPE` with the offsets and shapes of the arrays of
+       each neuron, aligned in the same way
+    4. the names of the neurons, encoded in utf-8 and concatenated
+
+The file is memory-mapped read-only: pages are read lazily, and the data blocks, shared by
+all the neurons loaded from the container, can not be modified. Neurons copy them when they
+are transformed in place, see `neurom.fst.FstNeuron.transform`.
+
+Containers are written to a temporary file and atomically renamed, see `write`. Use
+`neurom.io.utils.write_container` to create a container from a directory of morphology
+files, and `neurom.io.utils.load_neurons` to read a population from a container.
+"""
+
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from neurom.exceptions import NeuroMError, RawDataError
+from neurom.io.datawrapper import (_TABLE_COLS, DataWrapper, _pack_sections, _unpack_sections,
+                                   aligned_offset)
+
+# Bump when the layout of a container changes
+CONTAINER_VERSION = 3
+
+SUFFIX = '.nrmp'
+_MAGIC = b'NEUROMP%d' % CONTAINER_VERSION
+# magic, number of neurons, offset of the index, offset and size in bytes of the names
+_HEADER = struct.Struct('<8sqqqq')
+_INDEX_DTYPE = np.dtype([('table', '<i8'), ('n_sections', '<i8'),
+                         ('ids', '<i8'), ('n_ids', '<i8'),
+                         ('data', '<i8'), ('n_rows', '<i8'), ('n_cols', '<i8'),
+                         ('dtype', 'S8'), ('structure', '<i8'), ('structure_dtype', 'S8'),
+                         ('fmt', 'S32'),
+                         ('name', '<i8'), ('name_size', '<i8')])
+
+
+def _write_neuron(out, data):
+    """Write the arrays of `data`, a DataWrapper, at the current position of `out`.
+
+    The structure block is only written if the data block is compact, its offset is 0
+    otherwise.
+
+    Returns:
+        its entry in the index, a tuple of the `_INDEX_DTYPE` fields but those of the name
+    """
+    table, ids = _pack_sections(data.sections)
+    data_block = np.ascontiguousarray(data.data_block)
+    data_block = data_block.astype(data_block.dtype.newbyteorder('<'), copy=False)
+
+    table_offset = out.tell()
+    out.write(table.tobytes())
+    ids_offset = out.tell()
+    out.write(ids.tobytes())
+    data_offset = aligned_offset(out.tell())
+    out.write(bytes(data_offset - out.tell()))
+    out.write(data_block.tobytes())
+    structure_offset, structure_dtype = 0, b''
+    if data.is_compact:
+        structure_block = np.ascontiguousarray(data.structure_block)
+        structure_block = structure_block.astype(structure_block.dtype.newbyteorder('<'),
+                                                 copy=False)
+        structure_offset = aligned_offset(out.tell())
+        out.write(bytes(structure_offset - out.tell()))
+        out.write(structure_block.tobytes())
+        structure_dtype = structure_block.dtype.str.encode('ascii')
+    return (table_offset, len(table), ids_offset, len(ids),
+            data_offset, data_block.shape[0], data_block.shape[1],
+            data_block.dtype.str.encode('ascii'), structure_offset, structure_dtype,
+            data.fmt.encode('utf-8'))
+
+
+def write(filename, neurons):
+    """Write the raw data of `neurons` to the container file `filename`.
+
+    Arguments:
+        filename: path to the container file, replaced if it exists
+        neurons: iterable of (name, DataWrapper) pairs, consumed one at a time so that the
+            whole population does not need to be in memory
+
+    Returns:
+        the number of neurons written
+
+    Raises:
+        NeuroMError if two neurons have the same name
+
+    The container is written to a temporary file in the same directory, and atomically
+    renamed to `filename` once complete.
+    """
+    filename = Path(filename)
+    fd, temp_file = tempfile.mkstemp(prefix=filename.name, suffix='.tmp',
+                                     dir=str(filename.parent))
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(bytes(_HEADER.size))
+            entries, names, seen = [], [], set()
+            for name, data in neurons:
+                if name in seen:
+                    raise NeuroMError('Duplicate neuron name "%s" in container %s' %
+                                      (name, filename))
+                seen.add(name)
+                names.append(name.encode('utf-8'))
+                entries.append(_write_neuron(out, data))
+
+            index = np.array([entry + (0, len(name)) for entry, name in zip(entries, names)],
+                             dtype=_INDEX_DTYPE)
+            index['name'] = np.cumsum(index['name_size']) - index['name_size']
+
+            index_offset = aligned_offset(out.tell())
+            out.write(bytes(index_offset - out.tell()))
+            out.write(index.tobytes())
+            names_offset = out.tell()
+            names_size = out.write(b''.join(names))
+
+            out.seek(0)
+            out.write(_HEADER.pack(_MAGIC, len(index), index_offset, names_offset, names_size))
+        os.replace(temp_file, str(filename))
+    except BaseException:
+        os.remove(temp_file)
+        raise
+    return len(entries)
+
+
+class Container(object):
+    """Read access to a container file.
+
+    The file is memory-mapped once when the container is opened, the raw data of the
+    neurons are views on this map.
+
+    Arguments:
+        filename: path to the container file
+
+    Raises:
+        RawDataError if `filename` is not a valid container file
+    """
+
+    def __init__(self, filename):
+        """Open the container file `filename` and read its index."""
+        self.filename = Path(filename)
+        with open(self.filename, 'rb') as fd:
+            header = fd.read(_HEADER.size)
+        if len(header) != _HEADER.size or header[:len(_MAGIC)] != _MAGIC:
+            raise RawDataError('%s is not a container file' % self.filename)
+
+        _, n_neurons, index_offset, names_offset, names_size = _HEADER.unpack(header)
+        self._map = np.memmap(self.filename, dtype=np.uint8, mode='r')
+        if names_offset + names_size > len(self._map):
+            raise RawDataError('Truncated container file %s' % self.filename)
+
+        self._index = self._map[index_offset:index_offset + n_neurons * _INDEX_DTYPE.itemsize]
+        self._index = self._index.view(_INDEX_DTYPE)
+        names = self._map[names_offset:names_offset + names_size].tobytes()
+        self.names = [names[start:start + size].decode('utf-8')
+                      for start, size in self._index[['name', 'name_size']].tolist()]
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        """Number of neurons in the container."""
+        return len(self.names)
+
+    def __contains__(self, name):
+        """Whether there is a neuron named `name` in the container."""
+        return name in self._positions
+
+    def __iter__(self):
+        """Iterate over the names of the neurons, in the order they were written."""
+        return iter(self.names)
+
+    def _array(self, offset, dtype, count):
+        """View on `count` items of type `dtype` of the memory map, starting at `offset`."""
+        return self._map[offset:offset + count * dtype.itemsize].view(dtype)
+
+    def load_data(self, name):
+        """Get the raw data of the `name` neuron.
+
+        Returns:
+            a DataWrapper, whose data block is a read-only view on the memory-mapped container
+
+        Raises:
+            NeuroMError if there is no `name` neuron in the container
+        """
+        try:
+            entry = self._index[self._positions[name]]
+        except KeyError as e:
+            raise NeuroMError('No neuron named "%s" in container %s' %
+                              (name, self.filename)) from e
+
+        int64 = np.dtype('<i8')
+        table = self._array(entry['table'], int64, entry['n_sections'] * _TABLE_COLS)
+        ids = self._array(entry['ids'], int64, entry['n_ids'])
+        dtype = np.dtype(entry['dtype'].decode('ascii'))
+        n_rows, n_cols = int(entry['n_rows']), int(entry['n_cols'])
+        data_block = self._array(entry['data'], dtype, n_rows * n_cols).reshape(n_rows, n_cols)
+        structure_block = None
+        if entry['structure']:
+            structure_block = self._array(entry['structure'],
+                                          np.dtype(entry['structure_dtype'].decode('ascii')),
+                                          n_rows * 3).reshape(n_rows, 3)
+        return DataWrapper(data_block, entry['fmt'].decode('utf-8'),
+                           _unpack_sections(table.reshape(-1, _TABLE_COLS), ids),
+                           structure_block)
@@ -29,21 +29,33 @@
 """Fast neuron IO module."""
 
 import logging
-from collections import defaultdict, namedtuple
+from collections import namedtuple
 
 import numpy as np
 from neurom.core.dataformat import COLS, POINT_TYPE, ROOT_ID
+from neurom.exceptions import RawDataError
 
 L = logging.getLogger(__name__)
 
 
+# columns of the structure block
 TYPE, ID, PID = 0, 1, 2
 
+# marks the points not ending any section
+_NO_SECTION = -2
+
+# kinds of section ids in a packed section table, see _pack_sections
+_IDS_LIST, _IDS_SLICE = 0, 1
+_TABLE_COLS = 5
+
+# alignment in bytes of the data blocks stored in binary files
+ALIGNMENT = 64
+
 
 class DataWrapper(object):
     """Class holding a raw data block and section information."""
 
-    def __init__(self, data_block, fmt, sections=None):
+    def __init__(self, data_block, fmt, sections=None, structure_block=None):
         """Section Data Wrapper.
 
         data_block is np.array-like with the following columns:
@@ -56,10 +68,16 @@ class DataWrapper(object):
             ID(integer): unique integer given to each point, the `ROOT_ID` is -1
             P(integer): the ID of the parent
 
+        The integer TYPE, ID and P columns are given by the structure block, whose columns are
+        `TYPE`, `ID` and `PID`. In the compact layout (see `astype`), the data block only has
+        the X, Y, Z and R columns and the structure block must be given.
+
         Args:
             data_block: as defined above
             fmt: File format designation, eg: SWC
             sections: Already extracted sections, otherwise data_block will be used
+            structure_block: integer array of the TYPE, ID and P columns, by default those
+                of data_block
 
         Notes:
             - there is no ordering constraint: a child can reference a parent ID that comes
@@ -70,8 +88,25 @@ class DataWrapper(object):
         """
         self.data_block = data_block
         self.fmt = fmt
+        self._structure_block = structure_block
         # list of DataBlockSection
-        self.sections = sections if sections is not None else _extract_sections(data_block)
+        self.sections = (sections if sections is not None else
+                         _extract_sections(self.structure_block))
+
+    @property
+    def is_compact(self):
+        """Whether the data block only has the X, Y, Z and R columns."""
+        return self.data_block.shape[1] != COLS.COL_COUNT
+
+    @property
+    def structure_block(self):
+        """Get the integer TYPE, ID and P columns.
+
+        Unless it was given, it is converted from the data block on each access.
+        """
+        if self._structure_block is None:
+            return _structure_block(self.data_block)
+        return self._structure_block
 
     def neurite_root_section_ids(self):
         """Get the section IDs of the intitial neurite sections."""
@@ -81,9 +116,85 @@ class DataWrapper(object):
                                     ss.ntype != POINT_TYPE.SOMA)]
 
     def soma_points(self):
-        """Get the soma points."""
-        db = self.data_block
-        return db[db[:, COLS.TYPE] == POINT_TYPE.SOMA]
+        """Get the soma points, with all the columns of the data block in the default layout."""
+        if not self.is_compact:
+            db = self.data_block
+            return db[db[:, COLS.TYPE] == POINT_TYPE.SOMA]
+        is_soma = self._structure_block[:, TYPE] == POINT_TYPE.SOMA
+        return np.hstack((self.data_block[is_soma],
+                          self._structure_block[is_soma].astype(self.data_block.dtype)))
+
+    def section_start_type(self, section_id):
+        """Get the type of the first point of a section, None if it has no points."""
+        ids = self.sections[section_id].ids
+        if isinstance(ids, slice):
+            ids = range(*ids.indices(len(self.data_block)))
+        if len(ids) == 0:
+            return None
+        if self._structure_block is None:
+            return int(self.data_block[ids[0], COLS.TYPE])
+        return int(self._structure_block[ids[0], TYPE])
+
+    def astype(self, dtype):
+        """Return a data wrapper with the data block converted to the floating point `dtype`.
+
+        With np.float32, the data wrapper has the compact layout: the data block only keeps
+        the X, Y, Z and R columns, in float32, and the TYPE, ID and P columns are held by the
+        int32 structure block. This takes half the memory of the default layout, at the cost
+        of the precision of the coordinates and radii. Other types, such as the default
+        np.float64, give the default layout.
+
+        The sections are shared with this data wrapper, and the data block too if it is
+        already of type `dtype`.
+
+        Raises:
+            RawDataError if the TYPE, ID or P columns cannot be represented as int32 integers
+        """
+        dtype = np.dtype(dtype)
+        if not np.issubdtype(dtype, np.floating):
+            raise ValueError('Data blocks have a floating point type, not %s' % dtype)
+        if dtype == self.data_block.dtype:
+            return self
+
+        if dtype == np.float32:
+            structure_block = self.structure_block
+            if structure_block.dtype != np.int32:
+                if not _fits_int32(structure_block):
+                    raise RawDataError('Types or IDs of the points cannot be represented as '
+                                       'int32')
+                structure_block = structure_block.astype(np.int32)
+            return type(self)(self.data_block[:, COLS.XYZR].astype(dtype), self.fmt,
+                              self.sections, structure_block)
+
+        if self.is_compact:
+            data_block = np.hstack((self.data_block, self._structure_block)).astype(dtype)
+        else:
+            data_block = self.data_block.astype(dtype)
+        return type(self)(data_block, self.fmt, self.sections)
+
+    def __reduce__(self):
+        """Pickle the sections as two arrays, much faster than as a list of objects."""
+        return (_unpickle_data_wrapper,
+                (type(self), np.asarray(self.data_block), self.fmt) +
+                _pack_sections(self.sections) +
+                (() if self._structure_block is None else (self._structure_block, )))
+
+
+def _unpickle_data_wrapper(cls, data_block, fmt, table, ids, structure_block=None):
+    """Inverse of DataWrapper.__reduce__."""
+    return cls(data_block, fmt, _unpack_sections(table, ids), structure_block)
+
+
+def _fits_int32(values):
+    """Whether all the `values` can be represented as int32 integers."""
+    limits = np.iinfo(np.int32)
+    return len(values) == 0 or (limits.min <= values.min() and values.max() <= limits.max)
+
+
+def _structure_block(data_block):
+    """Integer TYPE, ID and P columns of a data block, int32 unless the values do not fit."""
+    columns = np.asarray(data_block).reshape(-1, COLS.COL_COUNT)[:, COLS.TYPE:COLS.COL_COUNT]
+    return columns.astype(np.int32 if _fits_int32(columns) else np.int64)
 
 
 def _merge_sections(sec_a, sec_b):
@@ -100,24 +211,89 @@ def _merge_sections(sec_a, sec_b):
     sec_a.ntype = 0
 
 
-def _section_end_points(structure_block, id_map):
-    """Get the section end-points."""
-    soma_idx = structure_block[:, TYPE] == POINT_TYPE.SOMA
-    soma_ids = structure_block[soma_idx, ID]
-    neurite_idx = structure_block[:, TYPE] != POINT_TYPE.SOMA
-    neurite_rows = structure_block[neurite_idx, :]
-    soma_end_pts = set(id_map[id_]
-                       for id_ in soma_ids[np.in1d(soma_ids, neurite_rows[:, PID])])
+def _id_lookup(ids):
+    """Build the lookup tables used to map SWC-style IDs to data block rows.
+
+    Returns:
+        tuple (unique_ids, last_row, inverse) where `unique_ids` are the sorted
+        distinct IDs, `last_row` is the row of the last occurrence of each of them
+        and `inverse` maps each row to its position in `unique_ids`
+    """
+    if np.all(ids[1:] > ids[:-1]):
+        rows = np.arange(len(ids))
+        return ids, rows, rows
+
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    is_last = np.append(sorted_ids[1:] != sorted_ids[:-1], True)
+    unique_ids = sorted_ids[is_last]
+    return unique_ids, order[is_last], _find_ids(unique_ids, ids)[0]
+
+
+def _find_ids(unique_ids, values):
+    """Positions of `values` in `unique_ids`, and a mask telling which were found."""
+    if unique_ids[-1] - unique_ids[0] == len(unique_ids) - 1:
+        # dense IDs, the usual case
+        pos = values - unique_ids[0]
+        found = (pos >= 0) & (pos < len(unique_ids))
+        pos[~found] = 0
+        return pos, found
+
+    pos = np.searchsorted(unique_ids, values)
+    pos[pos == len(unique_ids)] = 0
+    return pos, unique_ids[pos] == values
+
 
+def _section_end_points(structure_block, unique_ids, last_row, inverse):
+    """Get the section end-points.
+
+    Returns:
+        boolean mask of the rows of `structure_block` that are section end points
+    """
     # end points have either no children or more than one
     # ie: leaf or multifurcation nodes
-    n_children = defaultdict(int)
-    for row in structure_block:
-        n_children[row[PID]] += 1
-    end_pts = set(i for i, row in enumerate(structure_block)
-                  if n_children[row[ID]] != 1)
+    pos, found = _find_ids(unique_ids, structure_block[:, PID])
+    n_children = np.bincount(pos[found], minlength=len(unique_ids))
+    end_pts = n_children[inverse] != 1
+
+    soma_idx = structure_block[:, TYPE] == POINT_TYPE.SOMA
+    soma_ids = structure_block[soma_idx, ID]
+    neurite_pids = structure_block[~soma_idx, PID]
+    soma_end_ids = soma_ids[np.in1d(soma_ids, neurite_pids)]
+    end_pts[last_row[_find_ids(unique_ids, soma_end_ids)[0]]] = True
+
+    return end_pts
+
+
+def _pack_sections(sections):
+    """Pack a list of DataBlockSection in a section table and an array of ids.
+
+    Each row of the table is ``(ntype, pid, kind, start, stop)``: ids given as a list
+    (kind `_IDS_LIST`) are stored in ``ids[start:stop]``, while ids given as a slice of
+    the data block (kind `_IDS_SLICE`, see BlockNeuronBuilder) are ``slice(start, stop)``.
+    """
+    table = np.empty((len(sections), _TABLE_COLS), dtype='<i8')
+    ids = []
+    for row, sec in zip(table, sections):
+        if isinstance(sec.ids, slice) and sec.ids.step in (None, 1):
+            row[:] = sec.ntype, sec.pid, _IDS_SLICE, sec.ids.start, sec.ids.stop
+        else:
+            row[:] = sec.ntype, sec.pid, _IDS_LIST, len(ids), len(ids) + len(sec.ids)
+            ids.extend(sec.ids)
+    return table, np.array(ids, dtype='<i8')
+
+
+def aligned_offset(offset):
+    """Smallest multiple of ALIGNMENT greater or equal to `offset`."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
 
-    return end_pts.union(soma_end_pts)
+
+def _unpack_sections(table, ids):
+    """Inverse of _pack_sections."""
+    ids = ids.tolist()
+    return [DataBlockSection(ids[start:stop] if kind == _IDS_LIST else slice(start, stop),
+                             ntype, pid)
+            for ntype, pid, kind, start, stop in table.tolist()]
 
 
 class DataBlockSection(object):
@@ -142,67 +318,132 @@ class DataBlockSection(object):
     __repr__ = __str__
 
 
-def _extract_sections(data_block):
-    """Make a list of sections from an SWC-style data wrapper block."""
-    structure_block = data_block[:, COLS.TYPE:COLS.COL_COUNT].astype(np.int)
+def _find_gaps(parents, row_ids, end_pts):
+    """Find the rows starting a 'gap'.
+
+    A 'gap' is when a section has part of it's segments interleaved with those
+    of another section: the parent of a row is not the previous row, while the
+    previous row did not close its section.
+
+    Within a run of rows that do not follow their predecessor, the first row is a
+    gap if the row before the run leaves its section open, and each following row
+    is a gap if the row before it is either a gap or leaves its section open.
+    """
+    n_rows = len(row_ids)
+    rows = np.arange(n_rows)
+    not_following = np.ones(n_rows, dtype=bool)
+    not_following[1:] = parents[1:] != row_ids[:-1]
+    # the last row never starts a new section, see `_extract_sections`
+    leaves_open = ~end_pts | (row_ids == n_rows - 1)
+
+    run_start = np.maximum.accumulate(np.where(not_following, 0, rows + 1))
+    last_open = np.maximum.accumulate(np.where(leaves_open, rows, -1))
+    gaps = np.zeros(n_rows, dtype=bool)
+    gaps[1:] = not_following[1:] & (last_open[:-1] >= np.maximum(run_start[1:] - 1, 0))
+    return gaps
+
+
+def _after_duplicate_gaps(row_ids, gaps):
+    """Rows sharing their ID with a preceding gap row."""
+    order = np.argsort(row_ids, kind='stable')
+    sorted_ids = row_ids[order]
+    seen = np.cumsum(gaps[order]) - gaps[order]
+    group_start = np.flatnonzero(np.append(True, sorted_ids[1:] != sorted_ids[:-1]))
+    seen -= np.repeat(seen[group_start], np.diff(np.append(group_start, len(order))))
+    ret = np.zeros(len(row_ids), dtype=bool)
+    ret[order] = seen > 0
+    return ret
+
+
+def _end_points_and_gaps(structure_block, lookup, parents, row_ids):
+    """Masks of the rows that are section end points, and of those that start gaps."""
+    end_pts = _section_end_points(structure_block, *lookup)[row_ids]
+    gaps = _find_gaps(parents, row_ids, end_pts)
+    if len(lookup[0]) != len(row_ids):
+        # a gap on a duplicated ID is also an end point for the later rows sharing it
+        base_end_pts = end_pts
+        while True:
+            end_pts = base_end_pts | _after_duplicate_gaps(row_ids, gaps)
+            new_gaps = _find_gaps(parents, row_ids, end_pts)
+            if np.array_equal(new_gaps, gaps):
+                break
+            gaps = new_gaps
+    return end_pts | gaps, gaps
+
+
+def _section_parents(end_pts, gaps, row_ids, section_of_row):
+    """Map each point to the section ending with it, or `_NO_SECTION`.
+
+    Sections are the parents of those starting at their last point:
+    the one interrupted by a gap, or the one closed by an end point.
+    """
+    closing_rows = np.flatnonzero(end_pts)
+    closing_rows = np.where(gaps[closing_rows], closing_rows - 1, closing_rows)
+    points = row_ids[closing_rows]
+    # a later assignment to the same point wins
+    _, last = np.unique(points[::-1], return_index=True)
+    last = len(points) - 1 - last
+    parent_section = np.full(len(row_ids) + 1, _NO_SECTION)
+    parent_section[points[last]] = section_of_row[closing_rows[last]]
+    parent_section[ROOT_ID] = ROOT_ID
+    return parent_section
+
+
+def _extract_sections(structure_block):
+    """Make a list of sections from the SWC-style structure block of a data wrapper.
+
+    The rows are split into sections with vectorized passes over the block:
+    end points and gaps delimit runs of consecutive rows, each run being a
+    section starting with the parent of its first row.
+    """
+    if len(structure_block) == 0:
+        return [DataBlockSection()]
 
     # SWC ID -> structure_block position
-    id_map = {-1: -1}
-    for i, row in enumerate(structure_block):
-        id_map[row[ID]] = i
+    lookup = _id_lookup(structure_block[:, ID])
+    unique_ids, last_row, inverse = lookup
+    pids = structure_block[:, PID]
+    pos, found = _find_ids(unique_ids, pids)
+    missing = ~found & (pids != ROOT_ID)
+    if np.any(missing):
+        raise KeyError(int(pids[missing][0]))
+    parents = np.where(found, last_row[pos], ROOT_ID)
+    row_ids = last_row[inverse]
 
     # end points have either no children, more than one, or are the start
     # of a new gap
-    sec_end_pts = _section_end_points(structure_block, id_map)
-
-    # a 'gap' is when a section has part of it's segments interleaved
-    # with those of another section
-    gap_sections = set()
+    end_pts, gaps = _end_points_and_gaps(structure_block, lookup, parents, row_ids)
 
-    sections = []
+    return _make_sections(structure_block[:, TYPE], parents, row_ids, end_pts, gaps)
 
-    def new_section():
-        """A new_section."""
-        sections.append(DataBlockSection())
-        return sections[-1]
 
-    curr_section = new_section()
+def _make_sections(types, parents, row_ids, end_pts, gaps):
+    """Make the list of sections delimited by `end_pts` and `gaps`."""
+    n_rows = len(row_ids)
 
-    parent_section = {-1: -1}
+    # a section starts on the first row, after an end point, or at a gap
+    starts = np.zeros(n_rows, dtype=bool)
+    starts[0] = True
+    starts[1:] = (end_pts[:-1] & ~gaps[:-1] & (row_ids[:-1] != n_rows - 1)) | gaps[1:]
+    section_of_row = np.cumsum(starts) - 1
+    first_rows = np.flatnonzero(starts)
 
-    for row in structure_block:
-        row_id = id_map[row[ID]]
-        parent_id = id_map[row[PID]]
-        if not curr_section.ids:
-            # first in section point is parent
-            curr_section.ids.append(parent_id)
-            curr_section.ntype = row[TYPE]
+    section_parents = _section_parents(end_pts, gaps, row_ids, section_of_row)
+    gap_sections = set(section_of_row[np.flatnonzero(gaps) - 1].tolist())
 
-        gap = parent_id != curr_section.ids[-1]
+    row_ids = row_ids.tolist()
+    sections = [DataBlockSection([parent] + row_ids[first:last], ntype)
+                for parent, first, last, ntype in zip(parents[first_rows].tolist(),
+                                                      first_rows.tolist(),
+                                                      first_rows[1:].tolist() + [n_rows],
+                                                      types[first_rows].tolist())]
 
-        # If parent is not the previous point, create a section end-point.
-        # Else add the point to this section
-        if gap:
-            sec_end_pts.add(row_id)
-        else:
-            curr_section.ids.append(row_id)
-
-        if row_id in sec_end_pts:
-            parent_section[curr_section.ids[-1]] = len(sections) - 1
-            # Parent-child discontinuity section
-            if gap:
-                curr_section = new_section()
-                curr_section.ids.extend((parent_id, row_id))
-                curr_section.ntype = row[TYPE]
-                gap_sections.add(len(sections) - 2)
-            elif row_id != len(data_block) - 1:
-                # avoid creating an extra DataBlockSection for last row if it's a leaf
-                curr_section = new_section()
-
-    for sec in sections:
+    for sec, pid in zip(sections, section_parents[parents[first_rows]].tolist()):
         # get the section parent ID from the id of the first point.
         if sec.ids:
-            sec.pid = parent_section[sec.ids[0]]
+            if pid == _NO_SECTION:
+                raise KeyError(sec.ids[0])
+            sec.pid = pid
 
         # join gap sections and "disable" first half
         if sec.pid in gap_sections:
@@ -249,48 +490,62 @@ class BlockNeuronBuilder(object):
         assert id_ not in self.sections, 'id %s already exists in sections' % id_
         self.sections[id_] = BlockNeuronBuilder.BlockSection(parent_id, section_type, points)
 
-    def _make_datablock(self):
-        """Make a data_block and sections list as required by DataWrapper."""
-        section_ids = sorted(self.sections)
-
-        # create all insertion id's, this needs to be done ahead of time
-        # as some of the children may have a lower id than their parents
-        id_to_insert_id = {}
-        row_count = 0
-        for section_id in section_ids:
-            row_count += len(self.sections[section_id].points)
-            id_to_insert_id[section_id] = row_count - 1
-
-        datablock = np.empty((row_count, COLS.COL_COUNT), dtype=np.float)
-        datablock[:, COLS.ID] = np.arange(len(datablock))
-        datablock[:, COLS.P] = datablock[:, COLS.ID] - 1
-
-        sections = []
-        insert_index = 0
-        for id_ in section_ids:
-            sec = self.sections[id_]
-            points, section_type, parent_id = sec.points, sec.section_type, sec.parent_id
-
-            idx = slice(insert_index, insert_index + len(points))
-            datablock[idx, COLS.XYZR] = points
-            datablock[idx, COLS.TYPE] = section_type
-            datablock[idx.start, COLS.P] = id_to_insert_id.get(parent_id, ROOT_ID)
-            sections.append(DataBlockSection(idx, section_type, parent_id))
-            insert_index = idx.stop
-
-        return datablock, sections
-
-    def _check_consistency(self):
-        """See if the sections have obvious errors."""
-        type_count = defaultdict(int)
-        for _, section in sorted(self.sections.items()):
-            type_count[section.section_type] += 1
-
-        if type_count[POINT_TYPE.SOMA] != 1:
-            L.info('Have %d somas, expected 1', type_count[POINT_TYPE.SOMA])
-
     def get_datawrapper(self, file_format='BlockNeuronBuilder', data_wrapper=DataWrapper):
         """Returns a DataWrapper."""
-        self._check_consistency()
-        datablock, sections = self._make_datablock()
-        return data_wrapper(datablock, file_format, sections)
+        section_ids = sorted(self.sections)
+        sections = [self.sections[id_] for id_ in section_ids]
+        points = [sec.points for sec in sections]
+        return _block_datawrapper(file_format, data_wrapper,
+                                  section_ids,
+                                  [sec.parent_id for sec in sections],
+                                  [sec.section_type for sec in sections],
+                                  np.concatenate(points) if points else np.empty((0, 4)),
+                                  [len(sec_points) for sec_points in points])
+
+
+def _block_datawrapper(file_format, data_wrapper,
+                       section_ids, parent_ids, section_types, points, lengths):
+    """Make a DataWrapper from the contiguous blocks of points of the sections.
+
+    Args:
+        file_format: file format designation of the DataWrapper
+        data_wrapper: DataWrapper class
+        section_ids: sorted identifying numbers of the sections
+        parent_ids: identifying numbers of the parents of the sections
+        section_types: types of the sections, as defined by POINT_TYPE
+        points: array of [X, Y, Z, R], the points of the sections one after the other
+        lengths: numbers of points of the sections
+
+    The data block and the sections are built at once, with the offsets of the sections
+    in the data block given by the cumulative sum of their lengths. The first point of a
+    section has the last point of the parent section as parent, or ROOT_ID if the parent
+    is not one of the sections.
+    """
+    section_ids = np.asarray(section_ids, dtype=np.int64)
+    parent_ids = np.asarray(parent_ids, dtype=np.int64)
+    section_types = np.asarray(section_types)
+    lengths = np.asarray(lengths, dtype=np.int64)
+
+    n_somas = np.count_nonzero(section_types == POINT_TYPE.SOMA)
+    if n_somas != 1:
+        L.info('Have %d somas, expected 1', n_somas)
+
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    datablock = np.empty((len(points), COLS.COL_COUNT), dtype=np.float64)
+    datablock[:, COLS.XYZR] = points
+    datablock[:, COLS.TYPE] = np.repeat(section_types, lengths)
+    datablock[:, COLS.ID] = np.arange(len(datablock))
+    datablock[:, COLS.P] = datablock[:, COLS.ID] - 1
+
+    if len(section_ids):
+        parent_index = np.minimum(np.searchsorted(section_ids, parent_ids), len(section_ids) - 1)
+        datablock[starts, COLS.P] = np.where(section_ids[parent_index] == parent_ids,
+                                             ends[parent_index] - 1, ROOT_ID)
+
+    sections = [DataBlockSection(slice(start, end), section_type, parent_id)
+                for start, end, section_type, parent_id in zip(starts.tolist(), ends.tolist(),
+                                                               section_types.tolist(),
+                                                               parent_ids.tolist())]
+    return data_wrapper(datablock, file_format, sections)
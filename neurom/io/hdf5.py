@@ -40,12 +40,12 @@ HDF5.V1 Input row format:
 There is one such row per measured point.
 """
 
-from itertools import zip_longest
+from io import BytesIO
 
 import h5py
 import numpy as np
 
-from .datawrapper import BlockNeuronBuilder, DataWrapper
+from .datawrapper import DataWrapper, _block_datawrapper
 
 
 def get_version(h5file):
@@ -64,6 +64,22 @@ POINT_DIAMETER = 3
 GPFIRST, GTYPE, GPID = range(3)  # groups or structure
 
 
+def _open_file(filename):
+    """Open a read-only h5py.File from a path or a binary file-like object.
+
+    The content of a BytesIO is opened as an in-memory file image, the other file-like
+    objects are read through the Python file object driver of h5py.
+    """
+    if not isinstance(filename, BytesIO):
+        return h5py.File(filename, mode='r')
+
+    fapl = h5py.h5p.create(h5py.h5p.FILE_ACCESS)
+    fapl.set_fapl_core(backing_store=False)
+    with filename.getbuffer() as image:
+        fapl.set_file_image(image)  # the image is copied, the BytesIO can be modified later
+    return h5py.File(h5py.h5f.open(b'image', h5py.h5f.ACC_RDONLY, fapl=fapl))
+
+
 def read(filename, remove_duplicates=False, data_wrapper=DataWrapper):
     """Read a file and return a `data_wrapper'd` data.
 
@@ -71,12 +87,12 @@ def read(filename, remove_duplicates=False, data_wrapper=DataWrapper):
     * Unpacks the first block it finds out of ('repaired', 'unraveled', 'raw')
 
     Arguments:
-        filename: path to file to be read
+        filename: path to file to be read, or binary file-like object
         remove_duplicates: boolean, If True removes duplicate points
             from the beginning of each section.
         data_wrapper: return class
     """
-    with h5py.File(filename, mode='r') as h5file:
+    with _open_file(filename) as h5file:
         version = get_version(h5file)
         if version == 'H5V1':
             points, groups = _unpack_v1(h5file)
@@ -88,16 +104,19 @@ def read(filename, remove_duplicates=False, data_wrapper=DataWrapper):
     if remove_duplicates:
         points, groups = _remove_duplicate_points(points, groups)
 
-    neuron_builder = BlockNeuronBuilder()
     points[:, POINT_DIAMETER] /= 2  # Store radius, not diameter
-    for id_, row in enumerate(zip_longest(groups,
-                                          groups[1:, GPFIRST],
-                                          fillvalue=len(points))):
-        (point_start, section_type, parent_id), point_end = row
-        neuron_builder.add_section(id_, int(parent_id), int(section_type),
-                                   points[point_start:point_end])
 
-    return neuron_builder.get_datawrapper(version, data_wrapper=data_wrapper)
+    # a section has the points from its first point to the first point of the next one
+    starts = groups[:, GPFIRST]
+    ends = np.minimum(np.append(starts[1:], len(points)), len(points))
+    lengths = np.maximum(ends - starts, 0)
+    # indices in `points` of the points of the sections, one section after the other
+    offsets = np.cumsum(lengths) - lengths
+    point_ids = np.repeat(starts - offsets, lengths) + np.arange(np.sum(lengths))
+
+    return _block_datawrapper(version, data_wrapper,
+                              np.arange(len(groups)), groups[:, GPID], groups[:, GTYPE],
+                              points[point_ids], lengths)
 
 
 def _remove_duplicate_points(points, groups):
@@ -108,24 +127,16 @@ def _remove_duplicate_points(points, groups):
     Returns:
         points, groups with unique points.
     """
-    group_initial_ids = groups[:, GPFIRST]
-
-    to_be_reduced = np.zeros(len(group_initial_ids))
-    to_be_removed = []
-
-    for ig, g in enumerate(groups):
-        iid, typ, pid = g[GPFIRST], g[GTYPE], g[GPID]
-        # Remove first point from sections that are
-        # not the root section, a soma, or a child of a soma
-        if pid != -1 and typ != 1 and groups[pid][GTYPE] != 1:
-            # Remove duplicate from list of points
-            to_be_removed.append(iid)
-            # Reduce the id of the following sections
-            # in groups structure by one
-            to_be_reduced[ig + 1:] += 1
-
-    groups[:, GPFIRST] = groups[:, GPFIRST] - to_be_reduced
-    points = np.delete(points, to_be_removed, axis=0)
+    parent_ids = groups[:, GPID]
+    # Remove first point from sections that are
+    # not the root section, a soma, or a child of a soma
+    removed = ((parent_ids != -1) & (groups[:, GTYPE] != 1) &
+               (groups[parent_ids, GTYPE] != 1))
+    points = np.delete(points, groups[removed, GPFIRST], axis=0)
+
+    # Reduce the id of the following sections
+    # in groups structure by the number of points removed before them
+    groups[:, GPFIRST] -= np.cumsum(removed) - removed
 
     return points, groups
 
@@ -31,12 +31,16 @@
 reversed engineered from looking at output from Neuroludica
 """
 
+import re
 import warnings
-from io import open
+from array import array
+from io import IOBase, TextIOBase, TextIOWrapper, open
+from itertools import islice
 
 import numpy as np
 
 from neurom.core.dataformat import COLS, POINT_TYPE
+from neurom.exceptions import RawDataError
 
 from .datawrapper import DataWrapper
 
@@ -58,202 +62,296 @@ UNWANTED_SECTION_NAMES = [
 ]
 UNWANTED_SECTIONS = {name: True for name in UNWANTED_SECTION_NAMES}
 
+_COMMENT = re.compile(';[^\n]*')
+_CHUNK_LINES = 4096
 
-def _match_section(section, match):
-    """Checks whether the `type` of section is in the `match` dictionary.
 
-    Works around the unknown ordering of s-expressions in each section.
-    For instance, the `type` is the 3-rd one in for CellBodies
-        ("CellBody"
-         (Color Yellow)
-         (CellBody)
-         (Set "cell10")
-        )
+def _line_tokens(line):
+    """Split a line into tokens: split on whitespace and parentheses.
 
-    Returns:
-        value associated with match[section_type], None if no match
+    Note: this also strips comments and spines, and keeps the quoted strings in one token
     """
-    # TODO: rewrite this so it is more clear, and handles sets & dictionaries for matching
-    for i in range(5):
-        if i >= len(section):
-            return None
-        if isinstance(section[i], str) and section[i] in match:
-            return match[section[i]]
-    return None
+    line = line.rstrip()   # remove \r\n
+    line = line.split(';', 1)[0]  # strip comments
+
+    if '<(' in line:  # skip spines, which exist on a single line
+        assert ')>' in line, 'Missing end of spine'
+        # The following line is covered but 'tox -e coverage does not see it'
+        # TODO: find out why
+        return []  # pragma: no cover
+
+    tokens = line.replace('(', ' ( ').replace(')', ' ) ').split()
+    if '"' not in line:
+        return tokens
+
+    squashed = []
+    squash_token = []  # quoted strings get squashed into one token
+    for token in tokens:
+        if squash_token:
+            squash_token.append(token)
+            if token.endswith('"'):
+                squashed.append(' '.join(squash_token))
+                squash_token = []
+        elif token.startswith('"') and not token.endswith('"'):
+            squash_token.append(token)
+        else:
+            squashed.append(token)
+    return squashed
 
 
-def _get_tokens(morph_fd):
-    """Split a file-like into tokens: split on whitespace.
+def _token_chunks(morph_fd):
+    """Split a file-like into lists of tokens, see _line_tokens.
 
-    Note: this also strips newlines and comments
+    The lines are split by chunks of _CHUNK_LINES lines, line by line only if the chunk
+    has quoted strings or spines.
     """
-    for line in morph_fd:
-        line = line.rstrip()   # remove \r\n
-        line = line.split(';', 1)[0]  # strip comments
-        squash_token = []  # quoted strings get squashed into one token
-
-        if '<(' in line:  # skip spines, which exist on a single line
-            assert ')>' in line, 'Missing end of spine'
-            # The following line is covered but 'tox -e coverage does not see it'
-            # TODO: find out why
-            continue  # pragma: no cover
-
-        for token in line.replace('(', ' ( ').replace(')', ' ) ').split():
-            if squash_token:
-                squash_token.append(token)
-                if token.endswith('"'):
-                    token = ' '.join(squash_token)
-                    squash_token = []
-                    yield token
-            elif token.startswith('"') and not token.endswith('"'):
-                squash_token.append(token)
-            else:
-                yield token
-
-
-def _parse_section(token_iter):
-    """Create a tree structure (defined by the s-expressions) from a stream of tokens."""
-    sexp = []
-    for token in token_iter:
-        if token == '(':
-            new_sexp = _parse_section(token_iter)
-            if not _match_section(new_sexp, UNWANTED_SECTIONS):
-                sexp.append(new_sexp)
-        elif token == ')':
-            return sexp
+    lines = list(islice(morph_fd, _CHUNK_LINES))
+    while lines:
+        chunk = _COMMENT.sub('', ''.join(lines))
+        if '"' in chunk or '<(' in chunk:
+            yield [token for line in lines for token in _line_tokens(line)]
         else:
-            sexp.append(token)
-    return sexp
-
+            yield chunk.replace('(', ' ( ').replace(')', ' ) ').split()
+        lines = list(islice(morph_fd, _CHUNK_LINES))
 
-def _parse_sections(morph_fd):
-    """Returns array of all the sections that exist.
 
-    The format is nested lists that correspond to the s-expressions
-    """
-    sections = []
-    token_iter = _get_tokens(morph_fd)
-    for token in token_iter:
-        if token == '(':  # find top-level sections
-            section = _parse_section(token_iter)
-            if not _match_section(section, UNWANTED_SECTIONS):
-                sections.append(section)
-    return sections
-
-
-def _flatten_subsection(subsection, _type, offset, parent):
-    """Flatten a subsection from its nested version.
-
-    Args:
-        subsection: Nested subsection as produced by _parse_section, except one level in
-        _type: type of section, ie: AXON, etc
-        parent: first element has this as it's parent
-        offset: position in the final array of the first element
-
-    Returns:
-        Generator of values corresponding to [X, Y, Z, R, TYPE, ID, PARENT_ID]
-    """
-    for row in subsection:
-        # TODO: Figure out what these correspond to in neurolucida
-        if row in ('Low', 'Generated', 'High', ):
-            continue
-
-        if isinstance(row[0], str):
-            if len(row) in (4, 5, ):
-                if len(row) == 5:
-                    assert row[4][0] == 'S', \
-                        'Only known usage of a fifth member is Sn, found: %s' % row[4][0]
-                yield (float(row[0]), float(row[1]), float(row[2]), float(row[3]) / 2.,
-                       _type, offset, parent)
-                parent = offset
-                offset += 1
-        elif isinstance(row[0], list):
-            split_parent = offset - 1
-            start_offset = 0
-
-            slices = []
-            start = 0
-            for i, value in enumerate(row):
-                if value == '|':
-                    slices.append(slice(start + start_offset, i))
-                    start = i + 1
-            slices.append(slice(start + start_offset, len(row)))
-
-            for split_slice in slices:
-                for _row in _flatten_subsection(row[split_slice], _type, offset,
-                                                split_parent):
-                    offset += 1
-                    yield _row
-
-
-def _extract_section(section):
-    """Find top level sections, and get their flat contents, and append them all.
-
-    Returns a numpy array with the row format:
-        [X, Y, Z, R, TYPE, ID, PARENT_ID]
-
-    Note: PARENT_ID starts at -1 for soma and 0 for neurites
-    """
-    # sections with only one element will be skipped,
-    if len(section) == 1:
-        assert section[0] == 'Sections', \
-            ('Only known usage of a single Section content is "Sections", found %s' %
-             section[0])
-        return None
+_SECTION, _ROW, _OTHER = range(3)
+_SKIPPED_ROWS = ('Low', 'Generated', 'High', )
+_NOT_IN_POINTS = frozenset(UNWANTED_SECTION_NAMES) | {'(', ')'}
 
-    # try and detect type
-    _type = WANTED_SECTIONS.get(section[0][0], None)
 
-    start = 1
-    # CellBody often has [['"CellBody"'], ['CellBody'] as its first two elements
-    if _type is None:
-        _type = WANTED_SECTIONS.get(section[1][0], None)
+class _SExp(object):
+    """State of an s-expression being parsed by _RawDataBuilder."""
 
-        if _type is None:  # can't determine the type
-            return None
-        start = 2
+    __slots__ = ('kind', 'items', 'count', 'start', 'parent', 'error')
 
-    parent = -1 if _type == POINT_TYPE.SOMA else 0
-    subsections = list(_flatten_subsection(section[start:], _type, offset=0,
-                                           parent=parent))
+    def __init__(self, kind, start, parent=None):
+        """Initialize an s-expression starting at row `start` of the buffer."""
+        self.kind = kind
+        # first 5 items, the nested s-expressions are reduced to a list of their first item
+        self.items = []
+        self.count = 0
+        self.start = start
+        # ID of the parent of the next point of the s-expression, None if it has no points
+        self.parent = parent
+        # error raised by one of its points, raised only if its section is used
+        self.error = None
 
-    return np.array(subsections)
 
+def _section_type(item):
+    """Type of the points of a section for its first or second item, None if unknown."""
+    try:
+        return WANTED_SECTIONS.get(item[0], None)
+    except (IndexError, TypeError):
+        return None
 
-def _sections_to_raw_data(sections):
-    """Convert list of sections into the `raw_data` format used in neurom.
 
-    This finds the soma, and attaches the neurites
-    """
-    soma = None
-    neurites = []
-    for section in sections:
-        neurite = _extract_section(section)
-        if neurite is None:
-            continue
-
-        if neurite[0][COLS.TYPE] == POINT_TYPE.SOMA:
-            assert soma is None, 'Multiple somas defined in file'
-            soma = neurite
-        else:
-            neurites.append(neurite)
-    assert soma is not None, 'Missing CellBody element (ie. soma)'
+class _RawDataBuilder(object):
+    """Single pass, non-recursive parser of the s-expressions of a Neurolucida file.
 
-    total_length = len(soma) + sum(len(neurite) for neurite in neurites)
-    ret = np.zeros((total_length, 7,), dtype=np.float64)
-    pos = len(soma)
-    ret[0:pos, :] = soma
+    It does not build the nested lists of the s-expressions: the points are written in a
+    buffer as soon as they are parsed, and the unwanted s-expressions are skipped once they
+    are identified.
 
-    for neurite in neurites:
-        end = pos + len(neurite)
-        ret[pos:end, :] = neurite
-        ret[pos:end, COLS.P] += pos
-        ret[pos:end, COLS.ID] += pos
-        # TODO: attach the neurite at the closest point on the soma
-        ret[pos, COLS.P] = len(soma) - 1
-        pos = end
+    The s-expressions being parsed are kept in a stack, they are either a top-level section,
+    a row of a section (a point, or a branching point whose branches are split by '|') or
+    any other s-expression, nested in the latter ones and ignored unless it is unwanted.
+    """
 
-    return ret
+    def __init__(self):
+        """Initialize the parser with an empty buffer."""
+        # flat buffer of the rows of the points, much faster to append to than a numpy array
+        self.buffer = array('d')
+        self.size = 0
+        self.stack = []
+        self.skip_depth = 0
+        self.section_start = 0
+        self.soma = None
+        self.neurites = []
+
+    def _truncate(self, size):
+        """Remove the points after the first `size` ones."""
+        del self.buffer[size * COLS.COL_COUNT:]
+        self.size = size
+
+    def _add_row(self, sexp, row, length):
+        """Add a row of `length` items to the points of `sexp`, if it is a point."""
+        if length not in (4, 5, ):
+            return
+        try:
+            if length == 5:
+                assert row[4][0] == 'S', \
+                    'Only known usage of a fifth member is Sn, found: %s' % row[4][0]
+            offset = self.size - self.section_start
+            # the type is set once the type of the section is known
+            point = (float(row[0]), float(row[1]), float(row[2]), float(row[3]) / 2.,
+                     0, offset, sexp.parent)
+        except (AssertionError, IndexError, TypeError, ValueError) as e:
+            if sexp.error is None:
+                sexp.error = e
+            return
+
+        self.buffer.extend(point)
+        self.size += 1
+        sexp.parent = offset
+
+    def _add_item(self, sexp, item):
+        """Add an item to `sexp`, returns True if `sexp` is unwanted."""
+        if sexp.count < 5:
+            if isinstance(item, str) and item in UNWANTED_SECTIONS:
+                return True
+            sexp.items.append(item)
+        sexp.count += 1
+        if sexp.kind == _SECTION and sexp.parent is None and sexp.count <= 2:
+            _type = _section_type(item)
+            if _type is not None:
+                sexp.parent = -1 if _type == POINT_TYPE.SOMA else 0
+        return False
+
+    def _add_token(self, sexp, token):
+        """Add a string item to `sexp`."""
+        is_row = sexp.parent is not None and (
+            sexp.kind == _SECTION or (sexp.count and not isinstance(sexp.items[0], str)))
+        if self._add_item(sexp, token):
+            self.stack.pop()
+            self._truncate(sexp.start)
+            self.skip_depth = 1
+        elif is_row:
+            if token == '|' and sexp.kind == _ROW:
+                sexp.parent = sexp.start - self.section_start - 1
+            elif token not in _SKIPPED_ROWS:
+                # TODO: Figure out what these correspond to in neurolucida
+                self._add_row(sexp, token, len(token))
+
+    def _open(self, tokens, i):
+        """Open the s-expression starting before tokens[i], returns the index of the next token."""
+        if not self.stack:
+            self.section_start = self.size
+            self.stack.append(_SExp(_SECTION, self.size))
+            return i
+
+        sexp = self.stack[-1]
+        if sexp.parent is None or (sexp.kind == _ROW and sexp.count and
+                                   isinstance(sexp.items[0], str)):
+            self.stack.append(_SExp(_OTHER, self.size))
+            return i
+
+        # fast path for the points: ( X Y Z D ) or ( X Y Z D Sn )
+        end = i + 4
+        if end < len(tokens) and tokens[end] != ')':
+            end += 1
+        if end < len(tokens) and tokens[end] == ')':
+            row = tokens[i:end]
+            if _NOT_IN_POINTS.isdisjoint(row):
+                self._add_row(sexp, row, end - i)
+                # same as _add_item, a nested s-expression can not make sexp unwanted
+                if sexp.count < 5:
+                    sexp.items.append(row[:1])
+                sexp.count += 1
+                return end + 1
+
+        self.stack.append(_SExp(_ROW, self.size, self.size - self.section_start - 1))
+        return i
+
+    def _close(self):
+        """Close the innermost s-expression."""
+        sexp = self.stack.pop()
+        if sexp.kind == _SECTION:
+            self._close_section(sexp)
+            return
+
+        parent = self.stack[-1]
+        if sexp.kind == _ROW:
+            if not sexp.count:
+                if parent.error is None:
+                    parent.error = RawDataError('Empty s-expression in a section')
+            elif isinstance(sexp.items[0], str):
+                self._add_row(parent, sexp.items, sexp.count)
+            elif parent.error is None:
+                parent.error = sexp.error
+        self._add_item(parent, sexp.items[:1])
+
+    def _close_section(self, section):
+        """Close a top-level section, its points are kept if it is a soma or a neurite."""
+        items = section.items
+        # sections with only one element will be skipped,
+        if section.count == 1:
+            assert items[0] == 'Sections', \
+                ('Only known usage of a single Section content is "Sections", found %s' %
+                 items[0])
+            return
+
+        name = items[0][0]
+        _type = WANTED_SECTIONS.get(name, None)
+        if _type is None:
+            name = items[1][0]
+            _type = WANTED_SECTIONS.get(name, None)
+            if _type is None:  # can't determine the type
+                return
+
+        if section.error is not None:
+            raise section.error
+        if self.size == section.start:
+            raise RawDataError('%s section without points' % name)
+
+        if _type == POINT_TYPE.SOMA:
+            assert self.soma is None, 'Multiple somas defined in file'
+            self.soma = (section.start, self.size, _type)
+        else:
+            self.neurites.append((section.start, self.size, _type))
+
+    def feed(self, tokens):
+        """Parse the next tokens."""
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            i += 1
+            if self.skip_depth:
+                if token == '(':
+                    self.skip_depth += 1
+                elif token == ')':
+                    self.skip_depth -= 1
+            elif token == '(':
+                i = self._open(tokens, i)
+            elif token == ')':
+                if self.stack:
+                    self._close()
+            elif self.stack:
+                self._add_token(self.stack[-1], token)
+
+    def raw_data(self):
+        """Close the remaining s-expressions and return the `raw_data`.
+
+        This finds the soma, and attaches the neurites
+        """
+        self.skip_depth = 0
+        while self.stack:
+            self._close()
+        assert self.soma is not None, 'Missing CellBody element (ie. soma)'
+
+        buffer = np.frombuffer(self.buffer, dtype=np.float64).reshape(-1, COLS.COL_COUNT)
+        soma_length = self.soma[1] - self.soma[0]
+        ret = np.empty((soma_length + sum(end - start for start, end, _ in self.neurites),
+                        COLS.COL_COUNT), dtype=np.float64)
+        pos = 0
+        for start, end, _type in [self.soma] + self.neurites:
+            length = end - start
+            ret[pos:pos + length] = buffer[start:end]
+            ret[pos:pos + length, COLS.TYPE] = _type
+            if pos:
+                ret[pos:pos + length, [COLS.ID, COLS.P]] += pos
+                # TODO: attach the neurite at the closest point on the soma
+                ret[pos, COLS.P] = soma_length - 1
+            pos += length
+        return ret
+
+
+def _read_raw_data(morph_fd):
+    """Parse the text file-like `morph_fd` into the `raw_data` of the neuron."""
+    builder = _RawDataBuilder()
+    for tokens in _token_chunks(morph_fd):
+        builder.feed(tokens)
+    return builder.raw_data()
 
 
 def read(morph_file, data_wrapper=DataWrapper):
@@ -261,12 +359,22 @@ def read(morph_file, data_wrapper=DataWrapper):
 
     It is 'raw_data' np.array with the full neuron, and the format of the file
     suitable to be wrapped by DataWrapper
+
+    `morph_file` is the path to the file, or a text or binary (UTF-8) file-like object.
     """
     warnings.warn('This is an experimental reader. '
                   'There are no guarantees regarding ability to parse '
                   'Neurolucida .asc files or correctness of output.')
 
-    with open(morph_file, encoding='utf-8', errors='replace') as morph_fd:
-        sections = _parse_sections(morph_fd)
-    raw_data = _sections_to_raw_data(sections)
+    if isinstance(morph_file, TextIOBase):
+        raw_data = _read_raw_data(morph_file)
+    elif isinstance(morph_file, IOBase):
+        morph_fd = TextIOWrapper(morph_file, encoding='utf-8', errors='replace')
+        try:
+            raw_data = _read_raw_data(morph_fd)
+        finally:
+            morph_fd.detach()  # do not close morph_file
+    else:
+        with open(morph_file, encoding='utf-8', errors='replace') as morph_fd:
+            raw_data = _read_raw_data(morph_fd)
     return data_wrapper(raw_data, 'NL-ASCII')
@@ -37,20 +37,139 @@ SWC format:
 
 There is one such row per measured point.
 """
+import re
+import warnings
+from io import IOBase
+
 import numpy as np
+from numpy.lib import NumpyVersion
+
+from neurom.core.dataformat import COLS
 from .datawrapper import DataWrapper
 
 
 ID, TYPE, X, Y, Z, R, P = range(7)
 
+# numpy >= 1.23 parses text files in C, reading them by blocks of lines
+_HAS_C_LOADTXT = NumpyVersion(np.__version__) >= '1.23.0'
+
+# size of the blocks of text parsed at once
+_CHUNK_SIZE = 1 << 22
+_COMMENT = re.compile(rb'#[^\n]*')
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[list(b' \t\n\r\v\f')] = True
+
+
+def _count_columns(text):
+    """Number of values on each non-empty line of `text`."""
+    buf = np.frombuffer(text, dtype=np.uint8)
+    blank = _WHITESPACE[buf]
+    value_starts = np.flatnonzero(~blank & np.append(True, blank[:-1]))
+    line_bounds = np.append(np.flatnonzero(buf == ord('\n')), len(buf))
+    counts = np.diff(np.append(0, np.searchsorted(value_starts, line_bounds)))
+    return counts[counts > 0]
+
+
+def _parse_chunk(text, n_cols):
+    """Parse the rows of values in `text`, with comments removed.
+
+    Returns:
+        array of shape (n_rows, n_cols)
+    """
+    counts = _count_columns(text)
+    if np.any(counts != n_cols):
+        raise ValueError('Wrong number of columns in SWC data, expected %d, found %d'
+                         % (n_cols, counts[counts != n_cols][0]))
+    with warnings.catch_warnings():
+        # unparsable values are reported below
+        warnings.simplefilter('ignore', DeprecationWarning)
+        values = np.fromstring(text, sep=' ')
+    if len(values) != n_cols * len(counts):
+        raise ValueError('Could not convert SWC data to float')
+    return values.reshape(-1, n_cols)
+
+
+def _iter_chunks(fd):
+    """Iterate over blocks of complete lines of `fd`, with comments removed.
+
+    `fd` is a binary or a text file-like object, the text is encoded in UTF-8.
+    """
+    remainder = b''
+    while True:
+        chunk = fd.read(_CHUNK_SIZE)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        chunk = remainder + chunk
+        end = chunk.rfind(b'\n') + 1
+        remainder = chunk[end:]
+        text = _COMMENT.sub(b'', chunk[:end])
+        if text.strip():
+            yield text
+    text = _COMMENT.sub(b'', remainder)
+    if text.strip():
+        yield text
+
+
+def _read_chunks(filename):
+    """Read the rows of an SWC file as a [X, Y, Z, R, TYPE, ID, P] block.
+
+    The file is parsed by chunks of text, whose rows are copied into an output
+    block growing in place, so that the memory peak stays close to the size of
+    the returned block.
+    """
+    if isinstance(filename, IOBase):
+        return _read_chunks_from(filename)
+    with open(filename, 'rb') as fd:
+        return _read_chunks_from(fd)
+
+
+def _read_chunks_from(fd):
+    """Read the rows of an SWC file-like object by chunks, see _read_chunks."""
+    data_block = np.empty((0, 7))
+    n_rows = 0
+    for text in _iter_chunks(fd):
+        if n_rows == 0:
+            n_cols = _count_columns(text)[0]
+            if n_cols < 7:
+                raise ValueError('SWC data needs 7 columns, found %d' % n_cols)
+
+        rows = _parse_chunk(text, n_cols)[:, [X, Y, Z, R, TYPE, ID, P]]
+        if n_rows + len(rows) > len(data_block):
+            data_block.resize((2 * (n_rows + len(rows)), 7), refcheck=False)
+        data_block[n_rows:n_rows + len(rows)] = rows
+        n_rows += len(rows)
+
+    data_block.resize((n_rows, 7), refcheck=False)
+    return data_block
+
+
+def _read_data_block(filename):
+    """Read the rows of an SWC file as a [X, Y, Z, R, TYPE, ID, P] block.
+
+    Since numpy 1.23, np.loadtxt parses the file in C by blocks of lines, the columns being
+    reordered while reading. Older versions parse it line by line in python, they fall back
+    to the bulk parser of _read_chunks.
+    """
+    if _HAS_C_LOADTXT:
+        with warnings.catch_warnings():
+            # empty files are reported below
+            warnings.simplefilter('ignore', UserWarning)
+            data_block = np.loadtxt(filename, usecols=(X, Y, Z, R, TYPE, ID, P), ndmin=2)
+    else:
+        data_block = _read_chunks(filename)
+
+    if len(data_block) == 0:
+        raise ValueError('No data in SWC file')
+    return data_block
+
 
 def read(filename, data_wrapper=DataWrapper):
-    """Read an SWC file and return a tuple of data, format."""
-    data = np.loadtxt(filename)
-    if len(np.shape(data)) == 1:
-        data = np.reshape(data, (1, -1))
+    """Read an SWC file, or text or binary file-like object, and return a tuple of data, format."""
+    data = _read_data_block(filename)
 
     # Setting all type ids > 4 to 5 (custom section type): issue #735
-    data[:, TYPE] = np.clip(data[:, TYPE], a_min=None, a_max=5)
+    data[:, COLS.TYPE] = np.clip(data[:, COLS.TYPE], a_min=None, a_max=5)
 
-    return data_wrapper(data[:, [X, Y, Z, R, TYPE, ID, P]], 'SWC', None)
+    return data_wrapper(data, 'SWC', None)
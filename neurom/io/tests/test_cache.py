@@ -0,0 +1,183 @@
+# Copyright (c) 2020, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Test neurom.io.cache."""
+import os
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+from mock import Mock, patch
+from nose import tools as nt
+
+from neurom.io import cache, utils
+
+DATA_PATH = Path(__file__).parent.parent.parent.parent / 'test_data'
+
+FILES = [Path(DATA_PATH, 'swc', 'Neuron.swc'),
+         Path(DATA_PATH, 'h5', 'v1', 'Neuron.h5'),
+         Path(DATA_PATH, 'h5', 'v2', 'Neuron.h5'),
+         Path(DATA_PATH, 'neurolucida', 'bio_neuron-000.asc')]
+
+
+def _assert_data_equal(data, ref):
+    nt.eq_(data.fmt, ref.fmt)
+    nt.eq_(data.data_block.dtype, ref.data_block.dtype)
+    np.testing.assert_array_equal(data.data_block, ref.data_block)
+    nt.eq_(data.sections, ref.sections)
+
+
+class TestCache(object):
+
+    def setup(self):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix='test_cache'))
+        self.cache_dir = Path(self.tmp_dir, 'cache')
+
+    def teardown(self):
+        shutil.rmtree(str(self.tmp_dir))
+
+    def _copy(self, filename):
+        path = Path(self.tmp_dir, filename.name)
+        shutil.copy2(str(filename), str(path))
+        return path
+
+    def _read(self, filename):
+        reader = Mock(side_effect=utils._READERS[filename.suffix[1:].lower()])
+        with patch.dict(utils._READERS, {'test': reader}):
+            data = utils.load_data(filename, 'test', cache_dir=self.cache_dir)
+        return data, reader.call_count
+
+    def test_round_trip(self):
+        for filename in FILES:
+            ref = utils.load_data(filename)
+            data, n_reads = self._read(filename)
+            nt.eq_(n_reads, 1)
+            _assert_data_equal(data, ref)
+
+            data, n_reads = self._read(filename)
+            nt.eq_(n_reads, 0)
+            _assert_data_equal(data, ref)
+
+        nt.eq_(len(os.listdir(str(self.cache_dir))), len(FILES))
+
+    def test_load_neuron(self):
+        ref = utils.load_neuron(FILES[0])
+        for _ in range(2):
+            nrn = utils.load_neuron(FILES[0], cache_dir=self.cache_dir)
+            nt.eq_(nrn.name, ref.name)
+            np.testing.assert_array_equal(nrn.points, ref.points)
+
+    def test_memory_map(self):
+        filename = self._copy(FILES[0])
+        self._read(filename)
+        with patch.object(cache, '_MMAP_MIN_BYTES', 0):
+            data, n_reads = self._read(filename)
+        nt.eq_(n_reads, 0)
+        nt.ok_(isinstance(data.data_block, np.memmap))
+        _assert_data_equal(data, utils.load_data(filename))
+
+        # copy-on-write: the cache entry is not modified
+        ref = data.data_block.copy()
+        data.data_block[:] = 0
+        data, _ = self._read(filename)
+        np.testing.assert_array_equal(data.data_block, ref)
+
+    def test_modified_file(self):
+        filename = self._copy(FILES[0])
+        self._read(filename)
+        with open(str(filename), 'a') as fd:
+            fd.write('1000 2 0 0 0 1 1\n')
+        data, n_reads = self._read(filename)
+        nt.eq_(n_reads, 1)
+        nt.eq_(data.data_block[-1, 5], 1000)
+
+        data, n_reads = self._read(filename)
+        nt.eq_(n_reads, 0)
+        nt.eq_(data.data_block[-1, 5], 1000)
+
+    def test_modified_file_same_size(self):
+        filename = self._copy(Path(DATA_PATH, 'swc', 'simple.swc'))
+        self._read(filename)
+        stat = os.stat(str(filename))
+        content = filename.read_text()
+        filename.write_text(content.replace(' 3 ', ' 2 ', 1))
+        os.utime(str(filename), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+        nt.eq_(os.stat(str(filename)).st_size, stat.st_size)
+
+        ref = utils.load_data(filename)
+        data, n_reads = self._read(filename)
+        nt.eq_(n_reads, 1)
+        _assert_data_equal(data, ref)
+
+    def test_touched_file(self):
+        filename = self._copy(FILES[0])
+        self._read(filename)
+        stat = os.stat(str(filename))
+        os.utime(str(filename), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+
+        with patch.object(cache, '_content_hash', side_effect=cache._content_hash) as hasher:
+            data, n_reads = self._read(filename)
+            nt.eq_(n_reads, 0)
+            nt.eq_(hasher.call_count, 1)
+
+            # the entry was refreshed with the new modification time
+            data, n_reads = self._read(filename)
+            nt.eq_(n_reads, 0)
+            nt.eq_(hasher.call_count, 1)
+
+    def test_invalid_entry(self):
+        filename = self._copy(FILES[0])
+        ref, _ = self._read(filename)
+        entry, = self.cache_dir.iterdir()
+        for mmap_min_bytes in (cache._MMAP_MIN_BYTES, 0):
+            for content in (b'', b'garbage', entry.read_bytes()[:-10]):
+                entry.write_bytes(content)
+                with patch.object(cache, '_MMAP_MIN_BYTES', mmap_min_bytes):
+                    data, n_reads = self._read(filename)
+                nt.eq_(n_reads, 1)
+                _assert_data_equal(data, ref)
+
+    def test_write_failure(self):
+        with patch.object(cache, '_write_entry', side_effect=OSError('read-only')):
+            data, n_reads = self._read(FILES[0])
+        nt.eq_(n_reads, 1)
+        _assert_data_equal(data, utils.load_data(FILES[0]))
+
+    def test_write_cleanup(self):
+        filename = self._copy(FILES[0])
+        entry = cache._entry_path(self.cache_dir, filename, 'swc')
+        with patch('os.replace', side_effect=OSError('replace failed')):
+            nt.assert_raises(OSError, cache._write_entry, entry, utils.load_data(filename),
+                             cache._content_hash(filename), os.stat(str(filename)))
+        nt.eq_(list(self.cache_dir.iterdir()), [])
+
+    def test_stream_not_cached(self):
+        utils.load_data(StringIO(FILES[0].read_text()), reader='swc', cache_dir=self.cache_dir)
+        nt.ok_(not self.cache_dir.exists())
@@ -0,0 +1,143 @@
+# Copyright (c) 2020, Ecole Polytechnique Federale de Lausanne, Blue Brain Project
+# All rights reserved.
+#
+# This file is part of NeuroM <https://github.com/BlueBrain/NeuroM>
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+#     1. Redistributions of source code must retain the above copyright
+#        notice, this list of conditions and the following disclaimer.
+#     2. Redistributions in binary form must reproduce the above copyright
+#        notice, this list of conditions and the following disclaimer in the
+#        documentation and/or other materials provided with the distribution.
+#     3. Neither the name of the copyright holder nor the names of
+#        its contributors may be used to endorse or promote products
+#        derived from this software without specific prior written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+# DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY
+# DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+# (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES;
+# LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER CAUSED AND
+# ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR TORT
+# (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
+# SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Test neurom.io.container."""
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from nose import tools as nt
+
+from neurom import load_neurons
+from neurom.exceptions import NeuroMError, RawDataError
+from neurom.geom.transform import Translation
+from neurom.io import container, utils
+
+DATA_PATH = Path(__file__).parent.parent.parent.parent / 'test_data'
+VALID_DIR = Path(DATA_PATH, 'valid_set')
+
+
+def _assert_data_equal(data, ref):
+    nt.eq_(data.fmt, ref.fmt)
+    nt.eq_(data.data_block.dtype, ref.data_block.dtype)
+    np.testing.assert_array_equal(data.data_block, ref.data_block)
+    nt.eq_(data.structure_block.dtype, ref.structure_block.dtype)
+    np.testing.assert_array_equal(data.structure_block, ref.structure_block)
+    nt.eq_(data.sections, ref.sections)
+
+
+class TestContainer(object):
+
+    def setup(self):
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix='test_container'))
+        self.filename = Path(self.tmp_dir, 'valid_set' + container.SUFFIX)
+
+    def teardown(self):
+        shutil.rmtree(str(self.tmp_dir))
+
+    def test_write_read(self):
+        files = utils.get_morph_files(VALID_DIR)
+        nt.eq_(utils.write_container(VALID_DIR, self.filename), len(files))
+        pack = container.Container(self.filename)
+        nt.eq_(len(pack), len(files))
+        nt.eq_(sorted(pack), sorted(f.stem for f in files))
+        for f in files:
+            nt.ok_(f.stem in pack)
+            data = pack.load_data(f.stem)
+            nt.assert_false(data.is_compact)
+            nt.ok_(data._structure_block is None)
+            _assert_data_equal(data, utils.load_data(f))
+        nt.assert_raises(NeuroMError, pack.load_data, 'missing')
+        # the structure blocks are not stored, the data blocks have the TYPE, ID and P columns
+        nt.eq_(pack._index['structure'].tolist(), [0] * len(files))
+
+    def test_write_read_compact(self):
+        utils.write_container(VALID_DIR, self.filename, dtype=np.float32)
+        pack = container.Container(self.filename)
+        nt.ok_(np.all(pack._index['structure'] > 0))
+        for f in utils.get_morph_files(VALID_DIR):
+            data = pack.load_data(f.stem)
+            nt.ok_(data.is_compact)
+            _assert_data_equal(data, utils.load_data(f, dtype=np.float32))
+
+    def test_write_empty(self):
+        nt.eq_(container.write(self.filename, []), 0)
+        nt.eq_(len(container.Container(self.filename)), 0)
+
+    def test_write_duplicate_names(self):
+        data = utils.load_data(Path(VALID_DIR, 'Neuron.swc'))
+        nt.assert_raises(NeuroMError, container.write, self.filename,
+                         [('Neuron', data), ('Neuron', data)])
+        nt.ok_(not self.filename.exists())
+        nt.eq_(list(self.tmp_dir.iterdir()), [])
+
+    def test_invalid_file(self):
+        self.filename.write_bytes(b'not a container')
+        nt.assert_raises(RawDataError, container.Container, self.filename)
+
+    def test_load_neurons(self):
+        utils.write_container(VALID_DIR, self.filename)
+        ref = {neuron.name: neuron for neuron in load_neurons(VALID_DIR)}
+
+        pop = load_neurons(self.filename)
+        nt.eq_(pop.name, 'valid_set')
+        nt.eq_(sorted(n.name for n in pop), sorted(ref))
+        for neuron in pop:
+            np.testing.assert_array_equal(neuron.points, ref[neuron.name].points)
+            nt.eq_(len(neuron.sections), len(ref[neuron.name].sections))
+
+        names = ['Neuron_h5v2', 'Neuron']
+        for lazy in (False, True):
+            pop = load_neurons(str(self.filename), names=names, lazy=lazy, cache_size=2)
+            nt.eq_([n.name for n in pop], names)
+        nt.eq_(pop.cache_size, 2)
+
+        nt.assert_raises(NeuroMError, load_neurons, self.filename, names=['missing'])
+        pop = load_neurons(self.filename, names=['missing', 'Neuron'],
+                           ignored_exceptions=(NeuroMError, ))
+        nt.eq_([n.name for n in pop], ['Neuron'])
+
+    def test_transform_inplace(self):
+        utils.write_container(VALID_DIR, self.filename)
+        pack = container.Container(self.filename)
+        nt.assert_false(pack.load_data('Neuron').data_block.flags.writeable)
+
+        ref = load_neurons(self.filename, names=['Neuron'])[0]
+        trans = Translation([1, 2, 3])
+        neuron = load_neurons(self.filename, names=['Neuron'])[0]
+        neuron.transform(trans, inplace=True)
+        np.testing.assert_allclose(neuron.points[:, :3], ref.points[:, :3] + [1, 2, 3])
+        neuron = load_neurons(self.filename, names=['Neuron'])[0]
+        neuron.neurites[0].transform(trans, inplace=True)
+        np.testing.assert_allclose(neuron.neurites[0].points[:, :3],
+                                   ref.neurites[0].points[:, :3] + [1, 2, 3])
+
+        # the neurons loaded again are not transformed
+        np.testing.assert_array_equal(load_neurons(self.filename, names=['Neuron'])[0].points,
+                                      ref.points)
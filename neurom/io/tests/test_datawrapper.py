@@ -1,8 +1,10 @@
 """Test neurom.io.utils."""
+import pickle
 from pathlib import Path
 import numpy as np
 from nose import tools as nt
 
+from neurom.exceptions import RawDataError
 from neurom.io import datawrapper as dw
 from neurom.core.dataformat import POINT_TYPE, ROOT_ID
 
@@ -24,11 +26,82 @@ def test__merge_sections():
     nt.eq_(sec_b.pid, 1)
 
 
-#def test__section_end_points():
-#    _section_end_points
-#
-#def test__extract_sections():
-#    pass
+def _structure_block(rows):
+    """Structure block with (TYPE, ID, P) `rows`."""
+    return np.array(rows, dtype=np.int32)
+
+
+def test__section_end_points():
+    structure_block = np.array([[1, 1, -1],
+                                [2, 2, 1],
+                                [2, 3, 2],
+                                [3, 4, 2],
+                                [3, 5, 1],
+                                ])
+    unique_ids, last_row, inverse = dw._id_lookup(structure_block[:, 1])
+    end_pts = dw._section_end_points(structure_block, unique_ids, last_row, inverse)
+    nt.eq_(end_pts.tolist(), [True, True, True, True, True])
+
+    structure_block[3, 2] = 3
+    end_pts = dw._section_end_points(structure_block, unique_ids, last_row, inverse)
+    nt.eq_(end_pts.tolist(), [True, False, False, True, True])
+
+
+def test__extract_sections():
+    sections = dw._extract_sections(_structure_block([[1, 1, -1],
+                                                      [2, 2, 1],
+                                                      [2, 3, 2],
+                                                      [2, 4, 3],
+                                                      [2, 5, 3],
+                                                      [3, 6, 1],
+                                                      ]))
+    nt.eq_([(s.ids, s.ntype, s.pid) for s in sections],
+           [([-1, 0], 1, -1),
+            ([0, 1, 2], 2, 0),
+            ([2, 3], 2, 1),
+            ([2, 4], 2, 1),
+            ([0, 5], 3, 0)])
+
+
+def test__extract_sections_interleaved():
+    # the axon points (IDs 2, 3, 5) are interleaved with the dendrite ones (IDs 4, 6)
+    sections = dw._extract_sections(_structure_block([[1, 1, -1],
+                                                      [2, 2, 1],
+                                                      [2, 3, 2],
+                                                      [3, 4, 1],
+                                                      [2, 5, 3],
+                                                      [3, 6, 4],
+                                                      ]))
+    nt.eq_([(s.ids, s.ntype, s.pid) for s in sections],
+           [([-1, 0], 1, -1),
+            ([], 0, -1),
+            ([], 0, -1),
+            ([0, 1, 2, 4], 2, 0),
+            ([0, 3, 5], 3, 0)])
+
+
+def test__extract_sections_sparse_ids():
+    sections = dw._extract_sections(_structure_block([[1, 10, -1],
+                                                      [2, 30, 10],
+                                                      [2, 20, 30],
+                                                      [3, 50, 10],
+                                                      ]))
+    nt.eq_([(s.ids, s.ntype, s.pid) for s in sections],
+           [([-1, 0], 1, -1),
+            ([0, 1, 2], 2, 0),
+            ([0, 3], 3, 0)])
+
+
+def test__extract_sections_empty():
+    nt.eq_(dw._extract_sections(np.empty((0, 3), dtype=np.int32)), [dw.DataBlockSection()])
+
+
+@nt.raises(KeyError)
+def test__extract_sections_missing_parent():
+    dw._extract_sections(_structure_block([[1, 1, -1],
+                                           [2, 2, 1],
+                                           [2, 3, 42],
+                                           ]))
 
 #DataWrapper
 #neurite_root_section_ids
@@ -61,3 +134,67 @@ def test_BlockNeuronBuilder():
                   [ 1., 0., 0., 1., 2., 1.,  0.],
                   [ 2., 0., 0., 1., 4., 2.,  0.],
                   [10., 0., 0., 1., 4., 3.,  2.]]))
+
+
+def test_DataWrapper_pickle():
+    builder = dw.BlockNeuronBuilder()
+    builder.add_section(0, ROOT_ID, POINT_TYPE.SOMA, np.array([[0, 0, 0, 1]]))
+    builder.add_section(1, 0, POINT_TYPE.AXON, np.array([[1, 0, 0, 1], [2, 0, 0, 1]]))
+    for wrapped in (builder.get_datawrapper(),
+                    dw.DataWrapper(np.array([[0, 0, 0, 1, 1, 0, -1],
+                                             [1, 0, 0, 1, 2, 1, 0],
+                                             [2, 0, 0, 1, 2, 2, 1]], dtype=float), 'SWC')):
+        unpickled = pickle.loads(pickle.dumps(wrapped))
+        nt.eq_(type(unpickled), dw.DataWrapper)
+        nt.eq_(unpickled.fmt, wrapped.fmt)
+        np.testing.assert_array_equal(unpickled.data_block, wrapped.data_block)
+        nt.eq_(len(unpickled.sections), len(wrapped.sections))
+        for sec, ref in zip(unpickled.sections, wrapped.sections):
+            nt.eq_((sec.ids, sec.ntype, sec.pid), (ref.ids, ref.ntype, ref.pid))
+
+
+def test_DataWrapper_astype():
+    wrapped = dw.DataWrapper(np.array([[0, 0, 0, 1, 1, 0, -1],
+                                       [1, 0.1, 0, 1, 2, 1, 0],
+                                       [2, 0, 0, 1, 2, 2, 1]], dtype=float), 'SWC')
+    nt.eq_(wrapped.structure_block.dtype, np.int32)
+    np.testing.assert_array_equal(wrapped.structure_block, wrapped.data_block[:, 4:])
+    nt.assert_false(wrapped.is_compact)
+
+    compact = wrapped.astype(np.float32)
+    nt.ok_(compact.is_compact)
+    nt.eq_(compact.data_block.dtype, np.float32)
+    nt.eq_(compact.data_block.shape, (3, 4))
+    nt.eq_(compact.structure_block.dtype, np.int32)
+    nt.eq_(compact.fmt, wrapped.fmt)
+    nt.ok_(compact.sections is wrapped.sections)
+    np.testing.assert_allclose(compact.data_block, wrapped.data_block[:, :4], rtol=1e-7)
+    np.testing.assert_array_equal(compact.structure_block, wrapped.structure_block)
+    np.testing.assert_allclose(compact.soma_points(), wrapped.soma_points(), rtol=1e-7)
+    nt.eq_(compact.section_start_type(1), wrapped.section_start_type(1))
+    nt.ok_(compact.astype('float32') is compact)
+    np.testing.assert_allclose(compact.astype(np.float64).data_block, wrapped.data_block,
+                               rtol=1e-7)
+    nt.assert_raises(ValueError, wrapped.astype, np.int32)
+
+    unpickled = pickle.loads(pickle.dumps(compact))
+    np.testing.assert_array_equal(unpickled.data_block, compact.data_block)
+    np.testing.assert_array_equal(unpickled.structure_block, compact.structure_block)
+
+    # IDs beyond 2**24 are exact in the integer structure block
+    wrapped.data_block[:, 5] += 2 ** 24 + 1
+    wrapped.data_block[1:, 6] += 2 ** 24 + 1
+    compact = dw.DataWrapper(wrapped.data_block, 'SWC').astype(np.float32)
+    np.testing.assert_array_equal(compact.structure_block[:, 1:], wrapped.data_block[:, 5:])
+
+    # but not beyond 2**31
+    wrapped.data_block[:, 5] += 2 ** 31
+    wrapped.data_block[1:, 6] += 2 ** 31
+    nt.eq_(dw.DataWrapper(wrapped.data_block, 'SWC').structure_block.dtype, np.int64)
+    nt.assert_raises(RawDataError, dw.DataWrapper(wrapped.data_block, 'SWC').astype,
+                     np.float32)
+
+
+def test_aligned_offset():
+    nt.eq_([dw.aligned_offset(offset) for offset in (0, 1, 63, 64, 65)],
+           [0, 64, 64, 64, 128])
@@ -61,6 +61,20 @@ def test_unpack_h5():
     nt.assert_true(np.all(grp1 == grp2))
 
 
+def test_remove_duplicate_points():
+    points = np.arange(24, dtype=float).reshape(6, 4)
+    # soma, child of the soma, child of a neurite (twice), child of the soma
+    groups = np.array([[0, 1, -1],
+                       [1, 3, 0],
+                       [2, 3, 1],
+                       [3, 3, 1],
+                       [5, 3, 0]])
+    new_points, new_groups = hdf5._remove_duplicate_points(points, groups.copy())
+    np.testing.assert_array_equal(new_points, points[[0, 1, 4, 5]])
+    np.testing.assert_array_equal(new_groups[:, 0], [0, 1, 2, 2, 3])
+    np.testing.assert_array_equal(new_groups[:, 1:], groups[:, 1:])
+
+
 def test_consistency_between_v1_v2():
     v1_data = hdf5.read(Path(H5V1_PATH, 'Neuron.h5'))
     v2_data = hdf5.read(Path(H5V2_PATH, 'Neuron.h5'))
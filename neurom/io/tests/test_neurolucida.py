@@ -8,46 +8,226 @@ import neurom.io.neurolucida as nasc
 import numpy as np
 from mock import patch
 from neurom import load_neuron
-from neurom.core.dataformat import COLS
+from neurom.core.dataformat import COLS, POINT_TYPE
+from neurom.exceptions import RawDataError
 from neurom.io.datawrapper import DataWrapper
-from nose.tools import eq_, ok_
+from nose.tools import assert_raises, eq_, ok_
 from numpy.testing import assert_array_equal
 
 DATA_PATH = Path(Path(__file__).parent, '../../../test_data')
 NEUROLUCIDA_PATH = Path(DATA_PATH, 'neurolucida')
 
 
+# Reference parser building the nested lists of the s-expressions, the output of
+# neurolucida.read is checked against it
+def _match_section(section, match):
+    """Checks whether the `type` of section is in the `match` dictionary.
+
+    Works around the unknown ordering of s-expressions in each section.
+    For instance, the `type` is the 3-rd one in for CellBodies
+        ("CellBody"
+         (Color Yellow)
+         (CellBody)
+         (Set "cell10")
+        )
+
+    Returns:
+        value associated with match[section_type], None if no match
+    """
+    # TODO: rewrite this so it is more clear, and handles sets & dictionaries for matching
+    for i in range(5):
+        if i >= len(section):
+            return None
+        if isinstance(section[i], str) and section[i] in match:
+            return match[section[i]]
+    return None
+
+
+def _get_tokens(morph_fd):
+    """Split a file-like into tokens: split on whitespace.
+
+    Note: this also strips newlines and comments
+    """
+    for tokens in nasc._token_chunks(morph_fd):
+        yield from tokens
+
+
+def _parse_section(token_iter):
+    """Create a tree structure (defined by the s-expressions) from a stream of tokens."""
+    sexp = []
+    for token in token_iter:
+        if token == '(':
+            new_sexp = _parse_section(token_iter)
+            if not _match_section(new_sexp, nasc.UNWANTED_SECTIONS):
+                sexp.append(new_sexp)
+        elif token == ')':
+            return sexp
+        else:
+            sexp.append(token)
+    return sexp
+
+
+def _parse_sections(morph_fd):
+    """Returns array of all the sections that exist.
+
+    The format is nested lists that correspond to the s-expressions
+    """
+    sections = []
+    token_iter = _get_tokens(morph_fd)
+    for token in token_iter:
+        if token == '(':  # find top-level sections
+            section = _parse_section(token_iter)
+            if not _match_section(section, nasc.UNWANTED_SECTIONS):
+                sections.append(section)
+    return sections
+
+
+def _flatten_subsection(subsection, _type, offset, parent):
+    """Flatten a subsection from its nested version.
+
+    Args:
+        subsection: Nested subsection as produced by _parse_section, except one level in
+        _type: type of section, ie: AXON, etc
+        parent: first element has this as it's parent
+        offset: position in the final array of the first element
+
+    Returns:
+        Generator of values corresponding to [X, Y, Z, R, TYPE, ID, PARENT_ID]
+    """
+    for row in subsection:
+        # TODO: Figure out what these correspond to in neurolucida
+        if row in ('Low', 'Generated', 'High', ):
+            continue
+
+        if isinstance(row[0], str):
+            if len(row) in (4, 5, ):
+                if len(row) == 5:
+                    assert row[4][0] == 'S', \
+                        'Only known usage of a fifth member is Sn, found: %s' % row[4][0]
+                yield (float(row[0]), float(row[1]), float(row[2]), float(row[3]) / 2.,
+                       _type, offset, parent)
+                parent = offset
+                offset += 1
+        elif isinstance(row[0], list):
+            split_parent = offset - 1
+            start_offset = 0
+
+            slices = []
+            start = 0
+            for i, value in enumerate(row):
+                if value == '|':
+                    slices.append(slice(start + start_offset, i))
+                    start = i + 1
+            slices.append(slice(start + start_offset, len(row)))
+
+            for split_slice in slices:
+                for _row in _flatten_subsection(row[split_slice], _type, offset,
+                                                split_parent):
+                    offset += 1
+                    yield _row
+
+
+def _extract_section(section):
+    """Find top level sections, and get their flat contents, and append them all.
+
+    Returns a numpy array with the row format:
+        [X, Y, Z, R, TYPE, ID, PARENT_ID]
+
+    Note: PARENT_ID starts at -1 for soma and 0 for neurites
+    """
+    # sections with only one element will be skipped,
+    if len(section) == 1:
+        assert section[0] == 'Sections', \
+            ('Only known usage of a single Section content is "Sections", found %s' %
+             section[0])
+        return None
+
+    # try and detect type
+    _type = nasc.WANTED_SECTIONS.get(section[0][0], None)
+
+    start = 1
+    # CellBody often has [['"CellBody"'], ['CellBody'] as its first two elements
+    if _type is None:
+        _type = nasc.WANTED_SECTIONS.get(section[1][0], None)
+
+        if _type is None:  # can't determine the type
+            return None
+        start = 2
+
+    parent = -1 if _type == POINT_TYPE.SOMA else 0
+    subsections = list(_flatten_subsection(section[start:], _type, offset=0,
+                                           parent=parent))
+
+    return np.array(subsections)
+
+
+def _sections_to_raw_data(sections):
+    """Convert list of sections into the `raw_data` format used in neurom.
+
+    This finds the soma, and attaches the neurites
+    """
+    soma = None
+    neurites = []
+    for section in sections:
+        neurite = _extract_section(section)
+        if neurite is None:
+            continue
+
+        if neurite[0][COLS.TYPE] == POINT_TYPE.SOMA:
+            assert soma is None, 'Multiple somas defined in file'
+            soma = neurite
+        else:
+            neurites.append(neurite)
+    assert soma is not None, 'Missing CellBody element (ie. soma)'
+
+    total_length = len(soma) + sum(len(neurite) for neurite in neurites)
+    ret = np.zeros((total_length, 7,), dtype=np.float64)
+    pos = len(soma)
+    ret[0:pos, :] = soma
+
+    for neurite in neurites:
+        end = pos + len(neurite)
+        ret[pos:end, :] = neurite
+        ret[pos:end, COLS.P] += pos
+        ret[pos:end, COLS.ID] += pos
+        # TODO: attach the neurite at the closest point on the soma
+        ret[pos, COLS.P] = len(soma) - 1
+        pos = end
+
+    return ret
+
+
 def test__match_section():
     # no match in first 5
     section = [0, 1, 2, 3, 4, 'something']
     match = {'Foo': 'Bar', }
-    eq_(nasc._match_section(section, match), None)
+    eq_(_match_section(section, match), None)
 
 
 def test__get_tokens():
     morph_fd = StringIO(u'((()))')
-    tokens = list(nasc._get_tokens(morph_fd))
+    tokens = list(_get_tokens(morph_fd))
     eq_(tokens, ['(', '(', '(', ')', ')', ')'])
 
     morph_fd = StringIO(u'(Baz("Bar"("Foo")))')
-    tokens = list(nasc._get_tokens(morph_fd))
+    tokens = list(_get_tokens(morph_fd))
     eq_(tokens, ['(', 'Baz', '(', '"Bar"', '(', '"Foo"', ')', ')', ')'])
 
     morph_fd = StringIO(u'(Baz("Cell Bar Body"("Foo")))')
-    tokens = list(nasc._get_tokens(morph_fd))
+    tokens = list(_get_tokens(morph_fd))
     eq_(tokens, ['(', 'Baz', '(', '"Cell Bar Body"', '(', '"Foo"', ')', ')', ')'])
 
 
 def test__parse_section():
-    with patch('neurom.io.neurolucida._match_section') as mock_match:
+    with patch('%s._match_section' % __name__) as mock_match:
         mock_match.return_value = False  # want all sections
 
         token_iter = iter(['(', '(', '(', ')', ')', ')'])
-        section = nasc._parse_section(token_iter)
+        section = _parse_section(token_iter)
         eq_(section, [[[[]]]])
 
         token_iter = iter(['(', 'Baz', '(', '"Bar"', '(', '"Foo"', ')', ')', ')'])
-        section = nasc._parse_section(token_iter)
+        section = _parse_section(token_iter)
         eq_(section, [['Baz',
                        ['"Bar"',
                         ['"Foo"',
@@ -72,7 +252,7 @@ def test__parse_sections():
            )  ;  End of tree
         """)
     morph_fd = StringIO(string_section)
-    sections = nasc._parse_sections(morph_fd)
+    sections = _parse_sections(morph_fd)
     eq_(len(sections), 1)  # FilledCircle is ignored
     eq_(sections[0], [['Axon'],
                       ['-40.54', '-113.20', '-36.61', '0.12'],
@@ -89,7 +269,7 @@ def test__flatten_section():
                   ['4', '4', '4', '4'],
                   'Generated',
                   ]
-    ret = np.array([row for row in nasc._flatten_subsection(subsection, 0, offset=0, parent=-1)])
+    ret = np.array([row for row in _flatten_subsection(subsection, 0, offset=0, parent=-1)])
     # correct parents
     ok_(np.allclose(ret[:, COLS.P], np.arange(-1, 4)))
     ok_(np.allclose(ret[:, COLS.ID], np.arange(0, 5)))
@@ -107,7 +287,7 @@ def test__flatten_section():
                    ['1', '2', '3', '4'],
                    ['1', '2', '3', '4'], ]
                   ]
-    ret = np.array([row for row in nasc._flatten_subsection(subsection, 0, offset=0, parent=-1)])
+    ret = np.array([row for row in _flatten_subsection(subsection, 0, offset=0, parent=-1)])
     # correct parents
     eq_(ret[0, COLS.P], -1.)
     eq_(ret[1, COLS.P], 0.0)
@@ -119,7 +299,7 @@ def test__flatten_section():
                   [['0', '0', '0', '0'],
                    ['1', '1', '1', '1'], ]
                   ]
-    ret = np.array([row for row in nasc._flatten_subsection(subsection, 0, offset=0, parent=-1)])
+    ret = np.array([row for row in _flatten_subsection(subsection, 0, offset=0, parent=-1)])
     eq_(ret.shape, (3, 7))
 
     # try multifurcation
@@ -133,7 +313,7 @@ def test__flatten_section():
                    ['4', '4', '4', '4'],
                    ['5', '5', '5', '5'], ]
                   ]
-    ret = np.array([row for row in nasc._flatten_subsection(subsection, 0, offset=0, parent=-1)])
+    ret = np.array([row for row in _flatten_subsection(subsection, 0, offset=0, parent=-1)])
     # correct parents
     eq_(ret[0, COLS.P], -1.)
     eq_(ret[1, COLS.P], 0.0)
@@ -148,7 +328,7 @@ def test__extract_section():
                ['-1', '-1', '-1', '-1'],
                ['1', '1', '1', '1'],
                ]
-    section = nasc._extract_section(section)
+    section = _extract_section(section)
 
     # unknown type
     section = ['"Foo"',
@@ -156,7 +336,7 @@ def test__extract_section():
                ['-1', '-1', '-1', '-1'],
                ['1', '1', '1', '1'],
                ]
-    section = nasc._extract_section(section)
+    section = _extract_section(section)
 
 
 def test_sections_to_raw_data():
@@ -188,7 +368,7 @@ def test_sections_to_raw_data():
                 ]
     fake_neurite = [['This is not ', ], ['a neurite']]
     sections = [soma, fake_neurite, axon, dendrite, ]
-    raw_data = nasc._sections_to_raw_data(sections)
+    raw_data = _sections_to_raw_data(sections)
     eq_(raw_data.shape, (15, 7))
     ok_(np.allclose(raw_data[:, COLS.ID], np.arange(0, 15)))  # correct ID
     # 3 is ID of end of the soma, 2 sections attach to this
@@ -274,3 +454,62 @@ def test_spine():
     # with warnings.catch_warnings(record=True):
     #     assert_raises(RawDataError,
     #                   load_neuron, Path(NEUROLUCIDA_PATH, 'broken-spine.asc'))
+
+
+def test_read_same_as_parsed_sections():
+    for f in NEUROLUCIDA_PATH.glob('*.asc'):
+        if f.name == 'broken-spine.asc':
+            continue
+        with open(f, encoding='utf-8', errors='replace') as morph_fd:
+            expected = _sections_to_raw_data(_parse_sections(morph_fd))
+        with warnings.catch_warnings(record=True):
+            assert_array_equal(nasc.read(f).data_block, expected)
+
+    morph_asc = MORPH_ASC + textwrap.dedent(
+        u"""\
+        (FilledCircle
+           (Color RGB (64, 0, 128))
+           (Name "Marker 11")
+           ( -189.59    55.67    28.68     0.12)  ; 1
+        )  ;  End of markers
+        ( (Color Yellow)
+          (Apical)
+          (Set "apicals")
+          (0 0 0 2 S1)
+          ((1 0 0 2) Low | (2 0 0 2) (Dot (3 0 0 2)) (4 0 0 2) | (5 0 0 2) Incomplete)
+          Generated
+        )
+        """)
+    expected = _sections_to_raw_data(_parse_sections(StringIO(morph_asc)))
+    with warnings.catch_warnings(record=True):
+        rdw = io.load_data(StringIO(morph_asc), reader='asc')
+    assert_array_equal(rdw.data_block, expected)
+    eq_(rdw.data_block.shape, (24, 7))
+
+
+def test_read_deep_nesting():
+    # deeper than the recursion limit
+    lines = ['("CellBody" (CellBody) (0 0 0 1))', '((Axon)']
+    for i in range(2000):
+        lines += ['(%d 0 0 1)' % i, '(', '(%d 1 0 1)' % i, '|']
+    lines += ['(2000 0 0 1)'] + [')'] * 2001
+
+    with warnings.catch_warnings(record=True):
+        rdw = io.load_data(StringIO(u'\n'.join(lines)), reader='asc')
+    raw_data = rdw.data_block
+    eq_(raw_data.shape, (4002, 7))
+    assert_array_equal(raw_data[1:, COLS.ID], np.arange(1, 4002))
+    # the points of the main branch and of the side branches
+    assert_array_equal(raw_data[3::2, COLS.P], np.arange(1, 4000, 2))
+    assert_array_equal(raw_data[2::2, COLS.P], np.arange(1, 4000, 2))
+
+
+def test_read_malformed():
+    with warnings.catch_warnings(record=True):
+        with assert_raises(RawDataError) as cm:
+            nasc.read(StringIO(u'("CellBody" (CellBody))'))
+        eq_(str(cm.exception), 'CellBody section without points')
+
+        with assert_raises(RawDataError) as cm:
+            nasc.read(StringIO(u'("CellBody" (CellBody) (0 0 0 1))\n((Axon) (0 0 0 1) ())'))
+        eq_(str(cm.exception), 'Empty s-expression in a section')
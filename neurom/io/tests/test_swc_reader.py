@@ -26,9 +26,12 @@
 # (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+import tempfile
+from io import BytesIO, StringIO
 from pathlib import Path
 
 import numpy as np
+from mock import patch
 
 from neurom.core.dataformat import COLS
 from neurom.io import swc
@@ -103,3 +106,86 @@ def test_custom_type():
 def test_undefined_type():
     neuron = load_neuron(Path(SWC_PATH, 'undefined_type.swc'))
     assert_equal(neuron.neurites[1].type, NeuriteType.undefined)
+
+
+def _write_swc(content):
+    fd = tempfile.NamedTemporaryFile(prefix='test_swc_reader', mode='w', suffix='.swc')
+    fd.write(content)
+    fd.flush()
+    return fd
+
+
+def test_read_data_block():
+    for name in ('Neuron.swc', 'simple.swc', 'point_soma.swc', 'strahler.swc'):
+        path = Path(SWC_PATH, name)
+        expected = np.loadtxt(path, ndmin=2)[:, [swc.X, swc.Y, swc.Z, swc.R,
+                                                 swc.TYPE, swc.ID, swc.P]]
+        np.testing.assert_array_equal(swc._read_data_block(path), expected)
+        np.testing.assert_array_equal(swc._read_data_block(BytesIO(path.read_bytes())),
+                                      expected)
+        np.testing.assert_array_equal(swc._read_data_block(StringIO(path.read_text())),
+                                      expected)
+
+
+def test_read_data_block_fallback():
+    path = Path(SWC_PATH, 'Neuron.swc')
+    with patch('neurom.io.swc._HAS_C_LOADTXT', False):
+        with patch('neurom.io.swc._read_chunks', wraps=swc._read_chunks) as read_chunks:
+            np.testing.assert_array_equal(swc._read_data_block(path),
+                                          swc._read_chunks(path))
+    read_chunks.assert_called_with(path)
+
+
+def test_read_chunks():
+    for name in ('Neuron.swc', 'simple.swc', 'point_soma.swc', 'strahler.swc'):
+        path = Path(SWC_PATH, name)
+        expected = np.loadtxt(path, ndmin=2)[:, [swc.X, swc.Y, swc.Z, swc.R,
+                                                 swc.TYPE, swc.ID, swc.P]]
+        for chunk_size in (1, 10, 1000, swc._CHUNK_SIZE):
+            with patch('neurom.io.swc._CHUNK_SIZE', chunk_size):
+                np.testing.assert_array_equal(swc._read_chunks(path), expected)
+                np.testing.assert_array_equal(swc._read_chunks(BytesIO(path.read_bytes())),
+                                              expected)
+                np.testing.assert_array_equal(swc._read_chunks(StringIO(path.read_text())),
+                                              expected)
+
+
+_COMMENTED_SWC = (u"# header\n"
+                  u"1 1 0 0 0 1. -1 # soma\n"
+                  u"\n"
+                  u"  2 3 1 0 0 1. 1\r\n"
+                  u"#\n"
+                  u"3 3 2 0 0 0.5 2")
+
+
+def test_read_comments():
+    with _write_swc(_COMMENTED_SWC) as fd:
+        for read_block in (swc._read_data_block, swc._read_chunks):
+            np.testing.assert_array_equal(read_block(fd.name),
+                                          [[0, 0, 0, 1., 1, 1, -1],
+                                           [1, 0, 0, 1., 3, 2, 1],
+                                           [2, 0, 0, .5, 3, 3, 2]])
+
+
+def _check_read_error(content):
+    with _write_swc(content) as fd:
+        for read_block in (swc._read_data_block, swc._read_chunks):
+            nt.assert_raises(ValueError, read_block, fd.name)
+
+
+def test_read_missing_column():
+    _check_read_error(u"1 1 0 0 0 1. -1\n2 3 1 0 0 1.\n")
+
+
+def test_read_too_few_columns():
+    _check_read_error(u"1 1 0 0 0 1.\n2 3 1 0 0 1.\n")
+
+
+def test_read_invalid_value():
+    _check_read_error(u"1 1 0 0 0 1. -1\n2 3 a 0 0 1. 1\n")
+
+
+@nt.raises(ValueError)
+def test_read_empty():
+    with _write_swc(u"# no data\n") as fd:
+        swc.read(fd.name)
@@ -27,17 +27,23 @@
 # SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 """Test neurom.io.utils."""
+import os
+import shutil
+import tempfile
 from pathlib import Path
 import sys
-from io import StringIO
+from io import BytesIO, StringIO
 from pathlib import Path
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 import numpy as np
+from mock import patch
 from nose import tools as nt
 
 from neurom import get
-from neurom.core import Neuron, SomaError
+from neurom.core import LazyPopulation, Neuron, SomaError
 from neurom.exceptions import NeuroMError, RawDataError, SomaError
 from neurom.features import neuritefunc as _nf
 from neurom.io import utils
@@ -151,6 +157,57 @@ def test_load_neuron():
     utils.load_neuron(StringIO(neuron_str), reader='swc')
 
 
+def test_load_neuron_from_memory():
+    files = FILENAMES + [DATA_PATH / 'neurolucida' / 'bio_neuron-000.asc']
+    for filename in files:
+        reader = filename.suffix[1:]
+        with warnings.catch_warnings(record=True):
+            ref = utils.load_data(filename)
+        content = filename.read_bytes()
+        handles = [content, bytearray(content), BytesIO(content)]
+        if reader != 'h5':
+            handles.append(StringIO(content.decode('utf-8')))
+        for handle in handles:
+            with warnings.catch_warnings(record=True), \
+                    patch('tempfile.mkstemp', side_effect=AssertionError), \
+                    patch('neurom.io.utils.open', side_effect=AssertionError, create=True):
+                rdw = utils.load_data(handle, reader=reader)
+                nrn = utils.load_neuron(handle, reader=reader)
+            np.testing.assert_array_equal(rdw.data_block, ref.data_block)
+            nt.eq_(len(nrn.neurites), len(utils.load_neuron(filename).neurites))
+
+    # streams are read from their beginning
+    stream = BytesIO(FILENAMES[0].read_bytes())
+    stream.seek(100)
+    nt.eq_(len(utils.load_data(stream, reader='swc').data_block),
+           len(utils.load_data(FILENAMES[0]).data_block))
+    nt.assert_raises(RawDataError, utils.load_data, StringIO(u'garbage'), reader='h5')
+
+
+def test_load_neuron_dtype():
+    for filename in FILENAMES:
+        ref = utils.load_neuron(filename)
+        nrn = utils.load_neuron(filename, dtype=np.float32)
+        nt.eq_(nrn._data.data_block.dtype, np.float32)
+        nt.ok_(all(section.points.dtype == np.float32 for section in nrn.sections))
+        np.testing.assert_allclose(get('section_lengths', nrn), get('section_lengths', ref),
+                                   rtol=1e-5)
+        nt.eq_(utils.load_neuron(filename, dtype=np.float64)._data.data_block.dtype,
+               np.float64)
+
+    loader = utils.NeuronLoader(DATA_PATH / 'swc', cache_size=1, dtype=np.float32)
+    nt.eq_(loader.get('Neuron')._data.data_block.dtype, np.float32)
+
+
+def test_load_neurons_lazy_neurons():
+    loader = partial(utils.load_neuron, lazy=True)
+    for executor in (None, ThreadPoolExecutor(2)):
+        pop = utils.load_neurons(FILENAMES, loader, executor=executor)
+        nt.ok_(all(nrn._neurites is None for nrn in pop))
+        nt.eq_(len(pop.neurites), sum(len(utils.load_neuron(f).neurites) for f in FILENAMES))
+        nt.ok_(all(nrn._neurites is not None for nrn in pop))
+
+
 def test_neuron_name():
 
     for fn, nn in zip(FILENAMES, NRN_NAMES):
@@ -346,6 +403,67 @@ def test_NeuronLoader():
     nt.ok_(nrn != loader.get('Neuron_2_branch'))
 
 
+def test_load_neurons_lazy():
+    files = FILENAMES[:2] + [NO_SOMA_FILE] + FILENAMES[2:]
+    pop = utils.load_neurons(files, ignored_exceptions=(SomaError, ), lazy=True)
+    nt.ok_(isinstance(pop, LazyPopulation))
+    nt.eq_(len(pop), len(files))
+    nt.eq_(pop.cache_size, 1)
+    ref = utils.load_neurons(files, ignored_exceptions=(SomaError, ))
+    nt.eq_(len(ref), len(files) - 1)
+    nt.eq_([nrn.name for nrn in pop], [nrn.name for nrn in ref])
+
+    pop = utils.load_neurons(VALID_DATA_PATH, lazy=True, cache_size=3)
+    nt.eq_(pop.name, VALID_DATA_PATH.name)
+    nt.eq_(pop.cache_size, 3)
+    nt.eq_(len(pop), len(utils.get_morph_files(VALID_DATA_PATH)))
+
+
+def test_NeuronLoader_get_many():
+    loader = utils.NeuronLoader(VALID_DATA_PATH, n_workers=2)
+    nrns = loader.get_many(['Neuron_h5v1', 'Neuron'])
+    nt.eq_([nrn.name for nrn in nrns], ['Neuron_h5v1', 'Neuron'])
+    np.testing.assert_array_equal(nrns[1].points, loader.get('Neuron').points)
+    nt.assert_raises(NeuroMError, loader.get_many, ['NoSuchNeuron'])
+
+
+def test_NeuronLoader_cache():
+    loader = utils.NeuronLoader(VALID_DATA_PATH)
+    nt.eq_(loader.cache_info(), None)
+    nt.ok_(loader.get('Neuron') is not loader.get('Neuron'))
+    loader.cache_clear()
+
+    nrn = utils.load_neuron(Path(VALID_DATA_PATH, 'Neuron.swc'))
+    nbytes = utils._neuron_nbytes(nrn)
+    nt.ok_(nrn._data.data_block.nbytes < nbytes)
+
+    loader = utils.NeuronLoader(VALID_DATA_PATH, cache_bytes=nbytes)
+    nrn = loader.get('Neuron')
+    nt.ok_(nrn is loader.get('Neuron'))
+    nt.eq_(loader.cache_info(), utils.CacheInfo(hits=1, misses=1, evictions=0, maxsize=None,
+                                                max_bytes=nbytes, currsize=1, nbytes=nbytes))
+    # the h5 version of the neuron is bigger than the budget, it is not cached
+    loader.get('Neuron_h5v1')
+    nt.eq_(loader.cache_info().currsize, 1)
+
+    loader = utils.NeuronLoader(VALID_DATA_PATH, cache_size=1)
+    nrns = loader.get_many(['Neuron', 'Neuron_h5v1', 'Neuron'])
+    nt.ok_(nrns[0] is nrns[2])
+    nt.eq_(loader.cache_info()[:3], (0, 2, 1))
+    nt.ok_(loader.get('Neuron_h5v1') is nrns[1])
+    loader.cache_clear()
+    nt.eq_(loader.cache_info(), utils.CacheInfo(0, 0, 0, 1, None, 0, 0))
+
+    loader = utils.NeuronLoader(VALID_DATA_PATH, cache_size=2)
+    names = ['Neuron', 'Neuron_h5v1', 'Neuron_h5v2'] * 10
+    with ThreadPoolExecutor(4) as executor:
+        nrns = list(executor.map(loader.get, names))
+    nt.eq_([nrn.name for nrn in nrns], names)
+    info = loader.cache_info()
+    nt.eq_(info.hits + info.misses, len(names))
+    nt.eq_(info.currsize, 2)
+
+
 def test_NeuronLoader_mixed_file_extensions():
     loader = utils.NeuronLoader(VALID_DATA_PATH)
     loader.get('Neuron')
@@ -353,6 +471,37 @@ def test_NeuronLoader_mixed_file_extensions():
     nt.assert_raises(NeuroMError, loader.get, 'NoSuchNeuron')
 
 
+def test_NeuronLoader_index():
+    with tempfile.TemporaryDirectory() as dirpath, tempfile.TemporaryDirectory() as index_dir:
+        dirpath = Path(dirpath)
+        index_file = Path(index_dir, 'index.json')
+        shutil.copy(str(SWC_PATH / 'Neuron.swc'), str(dirpath))
+        (dirpath / 'Neuron.txt').touch()
+        (dirpath / 'Other.txt').touch()
+
+        loader = utils.NeuronLoader(dirpath, index_file=index_file)
+        nt.eq_(loader._filepath('Neuron'), dirpath / 'Neuron.swc')
+        nt.assert_raises(NeuroMError, loader.get, 'Other')
+        nt.ok_(index_file.exists())
+
+        # a new file is found by scanning the directory again
+        shutil.copy(str(VALID_DATA_PATH / 'Neuron_h5v1.h5'), str(dirpath / 'Neuron_h5.h5'))
+        os.utime(str(dirpath), ns=(0, 0))
+        nt.eq_(loader.get('Neuron_h5').name, 'Neuron_h5')
+
+        # the persisted index is used as long as the directory is unmodified
+        with patch('os.scandir') as scandir:
+            loader = utils.NeuronLoader(dirpath, index_file=index_file)
+            nt.eq_(loader._filepath('Neuron_h5'), dirpath / 'Neuron_h5.h5')
+            nt.assert_raises(NeuroMError, loader.get, 'Other')
+            scandir.assert_not_called()
+
+        # an outdated index file is rebuilt
+        os.utime(str(dirpath), ns=(1, 1))
+        loader = utils.NeuronLoader(dirpath, use_index=True)
+        nt.eq_(loader._filepath('Neuron'), dirpath / 'Neuron.swc')
+
+
 def test_ignore_exceptions():
     pop = utils.load_neurons((NO_SOMA_FILE, ), ignored_exceptions=(SomaError, ))
     nt.eq_(len(pop), 0)
@@ -362,6 +511,25 @@ def test_ignore_exceptions():
     nt.eq_(len(pop), 0)
 
 
+def test_load_neurons_parallel():
+    files = FILENAMES[:2] + [NO_SOMA_FILE] + FILENAMES[2:]
+    ref = utils.load_neurons(files, ignored_exceptions=(SomaError, ))
+    nt.eq_(len(ref), len(FILENAMES))
+
+    for kwargs in ({'n_workers': 2},
+                   {'executor': ThreadPoolExecutor(2)},
+                   {'executor': ThreadPoolExecutor(2), 'neuron_loader': utils.load_neuron}):
+        pop = utils.load_neurons(files, ignored_exceptions=(SomaError, ), **kwargs)
+        nt.eq_([nrn.name for nrn in pop], [nrn.name for nrn in ref])
+        for nrn, ref_nrn in zip(pop, ref):
+            np.testing.assert_array_equal(nrn.points, ref_nrn.points)
+        nt.assert_raises(SomaError, utils.load_neurons, files, **kwargs)
+
+    pop = utils.load_neurons(FILES, neuron_loader=_mock_load_neuron,
+                             executor=ThreadPoolExecutor(2))
+    nt.eq_([nrn.name for nrn in pop], [f.stem for f in FILES])
+
+
 def test_get_files_by_path():
     single_neurom = utils.get_files_by_path(NO_SOMA_FILE)
     nt.eq_(len(single_neurom), 1)
@@ -28,47 +28,249 @@
 
 """Utility functions and for loading neurons."""
 
+import json
 import logging
 import os
-import shutil
 import tempfile
-import uuid
-from functools import partial, lru_cache
-from io import IOBase, open
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from io import BytesIO, IOBase, open
 from pathlib import Path
 
-from neurom.core.population import Population
+import numpy as np
+
+from neurom.core.population import LazyPopulation, Population
 from neurom.exceptions import NeuroMError, RawDataError
 from neurom.fst._core import FstNeuron
-from neurom.io import neurolucida, swc, hdf5
+from neurom.io import cache, container, neurolucida, swc, hdf5
 from neurom.io.datawrapper import DataWrapper
 
 L = logging.getLogger(__name__)
 
 
+_MORPHOLOGY_EXTENSIONS = {'.swc', '.h5', '.asc'}
+
+
 def _is_morphology_file(filepath):
     """Check if `filepath` is a file with one of morphology file extensions."""
-    return filepath.is_file() and filepath.suffix.lower() in {'.swc', '.h5', '.asc'}
+    return filepath.is_file() and filepath.suffix.lower() in _MORPHOLOGY_EXTENSIONS
+
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses evictions maxsize max_bytes currsize nbytes')
+
+
+def _neuron_nbytes(neuron):
+    """Size in bytes of the arrays of a neuron, the buffers shared by several arrays count once."""
+    # the sections of a lazy neuron that are not built yet do not count
+    sections = (neuron._sections  # pylint: disable=protected-access
+                if isinstance(neuron, FstNeuron) else neuron.sections)
+    arrays = [section.points for section in sections or ()]
+    arrays.append(neuron.soma.points)
+    if hasattr(neuron, '_data'):
+        arrays.append(neuron._data.data_block)  # pylint: disable=protected-access
+
+    buffers = {}
+    for array in arrays:
+        while isinstance(array.base, np.ndarray):
+            array = array.base
+        buffers[id(array)] = array.nbytes
+    return sum(buffers.values())
+
+
+class _NeuronCache(object):
+    """Thread-safe LRU cache of neurons, bounded in number of neurons and in bytes.
+
+    The size of a neuron is that of its arrays (see _neuron_nbytes) when it is cached, the
+    results cached later on its sections and neurites are not accounted for. A neuron
+    larger than `max_bytes` is not cached.
+    """
+
+    def __init__(self, maxsize=None, max_bytes=None):
+        """Initialize an empty cache, `None` bounds are not enforced."""
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._hits = self._misses = self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the neuron cached for `key`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, neuron):
+        """Cache `neuron` for `key`, evicting the least recently used neurons if needed.
+
+        Returns:
+            the neuron cached for `key`: `neuron`, unless another one was cached meanwhile
+        """
+        nbytes = _neuron_nbytes(neuron)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                return neuron
+
+            self._entries[key] = (neuron, nbytes)
+            self._nbytes += nbytes
+            while ((self.maxsize is not None and len(self._entries) > self.maxsize) or
+                   (self.max_bytes is not None and self._nbytes > self.max_bytes)):
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self._nbytes -= evicted_nbytes
+                self._evictions += 1
+        return neuron
+
+    def info(self):
+        """Return the statistics of the cache as a CacheInfo."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self.maxsize,
+                             self.max_bytes, len(self._entries), self._nbytes)
+
+    def clear(self):
+        """Remove all the neurons and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+
+class _DirectoryIndex(object):
+    """Thread-safe index of the morphology files of a directory by name.
+
+    The index is built with a single scan of the directory, and scanned again only when a
+    name is missing and the directory has been modified since (its mtime changed). If the
+    directory has several files with the same name and different extensions, the first one
+    listed by the file system is used, as with `Path.glob`.
+
+    The index can be persisted in `index_file`, together with the mtime of the directory: it
+    is read back instead of scanning the directory as long as the directory is unmodified.
+    Writing `index_file` in the indexed directory modifies it, so it should be kept elsewhere.
+    """
+
+    def __init__(self, directory, index_file=None):
+        """Initialize the index, from `index_file` if it is up to date."""
+        self.directory = str(directory)
+        self.index_file = index_file
+        self._mtime_ns = None
+        self._filenames = {}
+        self._lock = threading.Lock()
+        if index_file is not None:
+            self._read()
+
+    def _read(self):
+        """Read the index from `index_file`, ignored if missing, invalid or outdated."""
+        try:
+            with open(self.index_file) as fd:
+                content = json.load(fd)
+            if (content['directory'] == os.path.abspath(self.directory) and
+                    content['mtime_ns'] == os.stat(self.directory).st_mtime_ns):
+                self._mtime_ns, self._filenames = content['mtime_ns'], content['filenames']
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            L.debug('Ignoring index file %s: %s', self.index_file, e)
+
+    def _write(self):
+        """Atomically write the index to `index_file`, logging failures instead of raising."""
+        index_file = Path(self.index_file)
+        content = {'directory': os.path.abspath(self.directory),
+                   'mtime_ns': self._mtime_ns,
+                   'filenames': self._filenames}
+        try:
+            fd, temp_file = tempfile.mkstemp(prefix=index_file.name, suffix='.tmp',
+                                             dir=str(index_file.parent))
+            try:
+                with os.fdopen(fd, 'w') as out:
+                    json.dump(content, out)
+                os.replace(temp_file, str(index_file))
+            except BaseException:
+                os.remove(temp_file)
+                raise
+        except OSError as e:
+            L.warning('Could not write index file %s: %s', index_file, e)
+
+    def _scan(self):
+        """Rebuild the index from the directory entries."""
+        # the mtime is taken before the scan, files added during the scan trigger a new one
+        mtime_ns = os.stat(self.directory).st_mtime_ns
+        filenames = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                name, ext = os.path.splitext(entry.name)
+                if (ext.lower() in _MORPHOLOGY_EXTENSIONS and name not in filenames and
+                        entry.is_file()):
+                    filenames[name] = entry.name
+        self._mtime_ns, self._filenames = mtime_ns, filenames
+        if self.index_file is not None:
+            self._write()
+
+    def get(self, name):
+        """Return the path to the `name` morphology file, or None."""
+        with self._lock:
+            if (self._mtime_ns is None or (name not in self._filenames and
+                                           os.stat(self.directory).st_mtime_ns != self._mtime_ns)):
+                self._scan()
+            filename = self._filenames.get(name)
+        return None if filename is None else Path(self.directory, filename)
 
 
 class NeuronLoader(object):
     """Caching morphology loader.
 
+    The loaded neurons are kept in a thread-safe LRU cache, bounded by the number of neurons
+    and/or by the total size of their arrays. Its statistics are given by `cache_info`.
+
     Arguments:
         directory: path to directory with morphology files
         file_ext: file extension to look for (if not set, will pick any of .swc|.h5|.asc)
-        cache_size: size of LRU cache (if not set, no caching done)
+        cache_size: maximum number of neurons in the LRU cache
+        cache_dir: directory of the on-disk cache of parsed files (if not set, not used)
+        n_workers: number of processes used by `get_many` to load morphologies in parallel
+        executor: executor used by `get_many` to load morphologies, overrides `n_workers`
+        cache_bytes: maximum size in bytes of the arrays of the neurons in the LRU cache
+        use_index: if True and `file_ext` is not set, the morphology files are looked up in
+            an index of the directory instead of being searched for on each load
+        index_file: file where the index of the directory is persisted, implies `use_index`,
+            it should not be in `directory`
+        dtype: floating point type of the data blocks, see `load_data`
+
+    If neither `cache_size` nor `cache_bytes` is set, no caching is done.
+
+    The index is built once by scanning the directory, and scanned again when a name is not
+    found and the directory has been modified since. Files replaced by others with the same
+    name but a different extension are only noticed when the index is scanned again.
     """
 
-    def __init__(self, directory, file_ext=None, cache_size=None):
+    def __init__(self, directory,  # pylint: disable=too-many-arguments
+                 file_ext=None, cache_size=None, cache_dir=None, n_workers=1, executor=None,
+                 cache_bytes=None, use_index=False, index_file=None, dtype=None):
         """Initialize a NeuronLoader object."""
         self.directory = Path(directory)
         self.file_ext = file_ext
-        if cache_size is not None:
-            self.get = lru_cache(maxsize=cache_size)(self.get)
+        self.cache_dir = cache_dir
+        self.dtype = dtype
+        self.n_workers = n_workers
+        self.executor = executor
+        self._cache = (None if cache_size is None and cache_bytes is None else
+                       _NeuronCache(cache_size, cache_bytes))
+        self._index = (_DirectoryIndex(directory, index_file)
+                       if file_ext is None and (use_index or index_file is not None) else None)
 
     def _filepath(self, name):
         """File path to `name` morphology file."""
+        if self._index is not None:
+            filepath = self._index.get(name)
+            if filepath is None:
+                raise NeuroMError("Can not find morphology file for '%s' " % name)
+            return filepath
         if self.file_ext is None:
             candidates = self.directory.glob(name + ".*")
             try:
@@ -78,10 +280,50 @@ class NeuronLoader(object):
         else:
             return Path(self.directory, name + self.file_ext)
 
-    # pylint:disable=method-hidden
     def get(self, name):
         """Get `name` morphology data."""
-        return load_neuron(self._filepath(name))
+        neuron = None if self._cache is None else self._cache.get(name)
+        if neuron is None:
+            neuron = load_neuron(self._filepath(name), cache_dir=self.cache_dir,
+                                 dtype=self.dtype)
+            if self._cache is not None:
+                neuron = self._cache.put(name, neuron)
+        return neuron
+
+    def get_many(self, names):
+        """Get the `names` morphologies, those not cached are loaded in parallel.
+
+        See load_neurons for the parallel loading.
+
+        Returns:
+            list of the neurons, in the order of `names`
+        """
+        neurons = dict.fromkeys(names)
+        if self._cache is not None:
+            neurons.update((name, self._cache.get(name)) for name in neurons)
+
+        missing = [name for name, neuron in neurons.items() if neuron is None]
+        loaded = load_neurons([self._filepath(name) for name in missing],
+                              partial(load_neuron, cache_dir=self.cache_dir, dtype=self.dtype),
+                              n_workers=self.n_workers, executor=self.executor)
+        for name, neuron in zip(missing, loaded):
+            neurons[name] = neuron if self._cache is None else self._cache.put(name, neuron)
+
+        return [neurons[name] for name in names]
+
+    def cache_info(self):
+        """Return the statistics of the LRU cache as a CacheInfo, None if there is no cache.
+
+        CacheInfo is a namedtuple with the numbers of hits, misses and evictions, the bounds
+        `maxsize` and `max_bytes`, and the current number of neurons `currsize` and size in
+        bytes `nbytes` of the cache.
+        """
+        return None if self._cache is None else self._cache.info()
+
+    def cache_clear(self):
+        """Empty the LRU cache and reset its statistics."""
+        if self._cache is not None:
+            self._cache.clear()
 
 
 def get_morph_files(directory):
@@ -108,92 +350,253 @@ def get_files_by_path(path):
     raise IOError('Invalid data path %s' % path)
 
 
-def load_neuron(handle, reader=None):
-    """Build section trees from an h5 or swc file."""
+def load_neuron(handle, reader=None, cache_dir=None, dtype=None, lazy=False):
+    """Build section trees from an h5 or swc file.
+
+    Arguments:
+        handle: path to the morphology file, stream or bytes, see `load_data`
+        reader(str): name of the reader, by default inferred from the file extension
+        cache_dir: directory of the on-disk cache of parsed files, see `load_data`
+        dtype: floating point type of the data block, see `load_data`
+        lazy(bool): if True, the section trees are built on first use, see FstNeuron
+    """
+    return FstNeuron(*_load_neuron_data(handle, reader, cache_dir, dtype), lazy=lazy)
+
+
+def _load_neuron_data(handle, reader=None, cache_dir=None, dtype=None):
+    """Data needed to build the neuron of load_neuron: its raw data wrapper and its name.
+
+    This is what the workers of a parallel load_neurons return: a data wrapper is much
+    cheaper to send to another process than the neuron object graph.
+    """
     if isinstance(handle, str):
         handle = Path(handle)
 
-    rdw = load_data(handle, reader)
+    rdw = load_data(handle, reader, cache_dir, dtype)
     name = handle.stem if isinstance(handle, Path) else None
-    return FstNeuron(rdw, name)
+    return rdw, name
 
 
-def load_neurons(neurons,
+def _load_neuron_keywords(neuron_loader):
+    """Keyword arguments of `neuron_loader` if it is load_neuron, or a partial of it."""
+    if neuron_loader is load_neuron:
+        return {}
+    if (isinstance(neuron_loader, partial) and neuron_loader.func is load_neuron and
+            not neuron_loader.args):
+        return neuron_loader.keywords
+    return None
+
+
+def _submit_loads(executor, files, neuron_loader):
+    """Submit the loading of `files` to `executor`.
+
+    Returns:
+        tuple (futures, loaders) where `loaders` are functions returning the neurons of `files`
+    """
+    keywords = _load_neuron_keywords(neuron_loader)
+    if keywords is None:
+        futures = [executor.submit(neuron_loader, f) for f in files]
+        return futures, [future.result for future in futures]
+
+    keywords = dict(keywords)
+    lazy = keywords.pop('lazy', False)
+    futures = [executor.submit(_load_neuron_data, f, **keywords) for f in files]
+    return futures, [lambda future=future: FstNeuron(*future.result(), lazy=lazy)
+                     for future in futures]
+
+
+def load_neurons(neurons,  # pylint: disable=too-many-arguments,too-many-locals
                  neuron_loader=load_neuron,
                  name=None,
                  population_class=Population,
-                 ignored_exceptions=()):
+                 ignored_exceptions=(),
+                 n_workers=1,
+                 executor=None,
+                 lazy=False,
+                 names=None,
+                 cache_size=1):
     """Create a population object.
 
-    From all morphologies in a directory of from morphologies in a list of file names.
+    From all morphologies in a directory of from morphologies in a list of file names,
+    or from the neurons of a container file (see `neurom.io.container`).
 
     Arguments:
-        neurons: directory path or list of neuron file paths
+        neurons: directory path, list of neuron file paths or path to a container file
         neuron_loader: function taking a filename and returning a neuron
         population_class: class representing populations
         name (str): optional name of population. By default 'Population' or\
             filepath basename depending on whether neurons is list or\
             directory path respectively.
+        ignored_exceptions (tuple): NeuroMError subclasses raised by the files to skip
+        n_workers (int): number of processes loading the files in parallel
+        executor (concurrent.futures.Executor): executor loading the files in parallel,
+            overrides `n_workers`
+        lazy (bool): if True, return a LazyPopulation loading the neurons when they are used,
+            `population_class`, `n_workers` and `executor` are then not used
+        names: names of the neurons read from a container file, all of them by default
+        cache_size (int): number of neurons kept in memory by a LazyPopulation
 
     Returns:
         neuron population object
+
+    Note:
+        When loading in parallel, the neurons are in the same order as the files and
+        `ignored_exceptions` is applied to each file, as when loading sequentially. A process
+        executor requires a picklable `neuron_loader`: if it is load_neuron (or a partial of
+        it with keyword arguments only), the workers only parse the files and the neurons are
+        built from their raw data in this process, which is cheaper than pickling them.
+
+        The neurons of a container file are read from its memory map, in the order of
+        `names`: `neuron_loader`, `n_workers` and `executor` are not used.
     """
     if isinstance(neurons, str):
         neurons = Path(neurons)
 
+    if isinstance(neurons, Path) and neurons.suffix.lower() == container.SUFFIX:
+        return _load_container(neurons, names, name or neurons.stem, population_class,
+                               ignored_exceptions, lazy, cache_size)
+
     if isinstance(neurons, Path):
         files = get_files_by_path(neurons)
         name = name or neurons.name
     else:
-        files = neurons
+        files = list(neurons)
         name = name or 'Population'
 
+    if lazy:
+        return LazyPopulation(files, neuron_loader, name=name, cache_size=cache_size,
+                              ignored_exceptions=ignored_exceptions)
+
+    if executor is None and n_workers > 1:
+        with ProcessPoolExecutor(n_workers) as pool:
+            return load_neurons(files, neuron_loader, name, population_class,
+                                ignored_exceptions, executor=pool)
+
+    if executor is None:
+        pop = _load_files(files, [partial(neuron_loader, f) for f in files], ignored_exceptions)
+        return population_class(pop, name=name)
+
+    futures, loaders = _submit_loads(executor, files, neuron_loader)
+    try:
+        pop = _load_files(files, loaders, ignored_exceptions)
+    finally:
+        for future in futures:
+            future.cancel()
+
+    return population_class(pop, name=name)
+
+
+def _load_from_container(pack, name):
+    """Build the `name` neuron of the container `pack`."""
+    return FstNeuron(pack.load_data(name), name)
+
+
+def _load_container(filename, names, name,  # pylint: disable=too-many-arguments
+                    population_class, ignored_exceptions, lazy, cache_size):
+    """Population of the `names` neurons of the container file `filename`."""
+    pack = container.Container(filename)
+    names = pack.names if names is None else list(names)
+    neuron_loader = partial(_load_from_container, pack)
+    if lazy:
+        return LazyPopulation(names, neuron_loader, name=name, cache_size=cache_size,
+                              ignored_exceptions=ignored_exceptions)
+    pop = _load_files(names, [partial(neuron_loader, n) for n in names], ignored_exceptions)
+    return population_class(pop, name=name)
+
+
+def write_container(neurons, filename, ignored_exceptions=(), cache_dir=None, dtype=None):
+    """Convert morphology files to a container file, see `neurom.io.container`.
+
+    Arguments:
+        neurons: directory path or list of neuron file paths
+        filename: path to the container file, replaced if it exists
+        ignored_exceptions (tuple): NeuroMError subclasses raised by the files to skip
+        cache_dir: directory of the on-disk cache of parsed files, see `load_data`
+        dtype: floating point type of the data blocks written, see `load_data`
+
+    Returns:
+        the number of neurons written to the container
+
+    The neurons are named after their files without extension, as in load_neuron. They
+    are parsed and written one at a time, the population is never fully in memory.
+    """
+    if isinstance(neurons, (str, Path)):
+        files = get_files_by_path(neurons)
+    else:
+        files = list(neurons)
+    ignored_exceptions = tuple(ignored_exceptions)
+
+    def _iter_data():
+        for f in files:
+            try:
+                rdw, name = _load_neuron_data(f, cache_dir=cache_dir, dtype=dtype)
+            except NeuroMError as e:
+                if isinstance(e, ignored_exceptions):
+                    L.info('Ignoring exception "%s" for file %s', e, Path(f).name)
+                    continue
+                raise
+            yield name, rdw
+
+    return container.write(filename, _iter_data())
+
+
+def _load_files(files, loaders, ignored_exceptions):
+    """Call the `loaders` of `files` in order, skipping the files raising `ignored_exceptions`."""
     ignored_exceptions = tuple(ignored_exceptions)
     pop = []
-    for f in files:
+    for f, loader in zip(files, loaders):
         try:
-            pop.append(neuron_loader(f))
+            pop.append(loader())
         except NeuroMError as e:
             if isinstance(e, ignored_exceptions):
                 L.info('Ignoring exception "%s" for file %s',
-                       e, f.name)
+                       e, Path(f).name)
                 continue
             raise
-
-    return population_class(pop, name=name)
+    return pop
 
 
-def _get_file(handle):
-    """Returns the filename of the file to read.
+def load_data(handle, reader=None, cache_dir=None, dtype=None):
+    """Unpack data into a raw data wrapper.
 
-    If handle is a stream, a temp file is written on disk first
-    and its filename is returned
+    Arguments:
+        handle: path to the morphology file, stream (text or binary, a StringIO or a
+            BytesIO for instance) or bytes with the content of the file
+        reader(str): name of the reader, by default inferred from the file extension,
+            it is required for streams and bytes
+        cache_dir: if set, directory of a persistent cache of parsed files shared between
+            runs and processes. Files are only parsed if their cache entry is missing or
+            outdated, otherwise the data block is memory-mapped from the cache.
+            Streams are never cached.
+        dtype: floating point type of the data block, by default that of the reader, float64.
+            Use np.float32 for the compact layout, half the size: float32 coordinates and
+            radii, and int32 types and IDs, see DataWrapper.astype.
+
+    Streams are parsed from their beginning, in memory, the file system is not used.
+    H5 files are read from binary streams only.
     """
-    if not isinstance(handle, IOBase):
-        return handle
-
-    fd, temp_file = tempfile.mkstemp(str(uuid.uuid4()), prefix='neurom-')
-    os.close(fd)
-    with open(temp_file, 'w') as fd:
-        handle.seek(0)
-        shutil.copyfileobj(handle, fd)
-    return temp_file
+    if isinstance(handle, (bytes, bytearray, memoryview)):
+        handle = BytesIO(handle)
 
-
-def load_data(handle, reader=None):
-    """Unpack data into a raw data wrapper."""
     if not reader:
         reader = handle.suffix[1:].lower()
 
     if reader not in _READERS:
         raise NeuroMError('Do not have a loader for "%s" extension' % reader)
 
-    filename = _get_file(handle)
     try:
-        return _READERS[reader](filename)
+        if isinstance(handle, IOBase):
+            if handle.seekable():
+                handle.seek(0)
+            data = _READERS[reader](handle)
+        elif cache_dir is not None:
+            data = cache.read(cache_dir, handle, reader, _READERS[reader])
+        else:
+            data = _READERS[reader](handle)
     except Exception as e:
-        L.exception('Error reading file %s, using "%s" loader', filename, reader)
-        raise RawDataError('Error reading file %s:\n%s' % (filename, str(e))) from e
+        L.exception('Error reading file %s, using "%s" loader', handle, reader)
+        raise RawDataError('Error reading file %s:\n%s' % (handle, str(e))) from e
+    return data if dtype is None else data.astype(dtype)
 
 
 def _load_h5(filename):
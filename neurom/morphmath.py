@@ -375,6 +375,74 @@ def segment_taper_rate(seg):
     return taper_rate(seg[0], seg[1])
 
 
+def segment_areas(points):
+    """Compute the surface areas of the segments between consecutive points.
+
+    This is segment_area computed for all the segments at once.
+
+    Args:
+        points: array of points with columns (x, y, z, r), e.g. the points of a section
+
+    Returns:
+        Array of the areas of the len(points) - 1 segments
+    """
+    points = np.asarray(points)
+    r0 = points[:-1, COLS.R]
+    r1 = points[1:, COLS.R]
+    vectors = np.diff(points[:, COLS.XYZ], axis=0)
+    h2 = np.einsum('ij,ij->i', vectors, vectors)
+    return math.pi * (r0 + r1) * np.sqrt((r0 - r1) ** 2 + h2)
+
+
+def segment_volumes(points):
+    """Compute the volumes of the segments between consecutive points.
+
+    This is segment_volume computed for all the segments at once.
+
+    Args:
+        points: array of points with columns (x, y, z, r), e.g. the points of a section
+
+    Returns:
+        Array of the volumes of the len(points) - 1 segments
+    """
+    points = np.asarray(points)
+    r0 = points[:-1, COLS.R]
+    r1 = points[1:, COLS.R]
+    vectors = np.diff(points[:, COLS.XYZ], axis=0)
+    h = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+    return math.pi * h * ((r0 * r0) + (r0 * r1) + (r1 * r1)) / 3.0
+
+
+def segment_radii(points):
+    """Compute the mean radii of the segments between consecutive points.
+
+    This is segment_radius computed for all the segments at once.
+
+    Args:
+        points: array of points with columns (x, y, z, r), e.g. the points of a section
+
+    Returns:
+        Array of the mean radii of the len(points) - 1 segments
+    """
+    radii = np.asarray(points)[:, COLS.R]
+    return (radii[:-1] + radii[1:]) / 2.
+
+
+def segment_taper_rates(points):
+    """Compute the taper rates of the segments between consecutive points.
+
+    This is segment_taper_rate computed for all the segments at once.
+
+    Args:
+        points: array of points with columns (x, y, z, r), e.g. the points of a section
+
+    Returns:
+        Array of the taper rates of the len(points) - 1 segments
+    """
+    diff = np.diff(np.asarray(points)[:, COLS.XYZR], axis=0)
+    return np.divide(2 * np.abs(diff[:, COLS.R]), np.linalg.norm(diff[:, COLS.XYZ], axis=1))
+
+
 def pca(points):
     """Estimate the principal components of the covariance on the given point cloud.
 
@@ -395,6 +463,9 @@ def sphere_area(r):
 # Useful alias for path_distance
 section_length = path_distance
 
+# Segment lengths for all the segments between consecutive points, see segment_areas
+segment_lengths = interval_lengths
+
 
 def principal_direction_extent(points):
     """Calculate the extent of a set of 3D points.
@@ -440,6 +440,21 @@ def test_segment_taper_rate():
     nt.assert_almost_equal(mm.segment_taper_rate((p0, p2)), 3.0)
     nt.assert_almost_equal(mm.segment_taper_rate((p0, p3)), 2.0)
 
+def test_segment_kernels():
+    points = np.random.RandomState(0).uniform(0, 10, (20, 4))
+    segments = list(zip(points[:-1], points[1:]))
+    for kernel, func in ((mm.segment_lengths, mm.segment_length),
+                         (mm.segment_areas, mm.segment_area),
+                         (mm.segment_volumes, mm.segment_volume),
+                         (mm.segment_radii, mm.segment_radius),
+                         (mm.segment_taper_rates, mm.segment_taper_rate)):
+        assert_array_almost_equal(kernel(points), [func(seg) for seg in segments])
+        nt.eq_(len(kernel(points[:1])), 0)
+
+    nt.assert_almost_equal(mm.segment_areas([(0, 0, 0, 3), (2, 0, 0, 3)])[0], 37.6991118, places=6)
+    nt.assert_almost_equal(mm.segment_volumes([(0, 0, 0, 3), (2, 0, 0, 3)])[0], 56.5486677, places=6)
+
+
 def test_pca():
 
     p = np.array([[4., 2., 0.6],
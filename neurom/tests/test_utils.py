@@ -57,6 +57,64 @@ def test_memoize_caches():
         nt.assert_not_equal(A().dummy(42, y=43), ref3)
 
 
+def test_cached_property():
+    class A(object):
+        __slots__ = ('calls', ) + nu.cached_property.slots('value')
+
+        def __init__(self):
+            self.calls = 0
+
+        @nu.cached_property
+        def value(self):
+            """The value."""
+            self.calls += 1
+            return random.random()
+
+    class B(object):
+        @nu.cached_property
+        def value(self):
+            return random.random()
+
+    nt.assert_true(isinstance(A.value, nu.cached_property))
+    nt.assert_equal(A.value.__doc__, 'The value.')
+    a = A()
+    ref = a.value
+    for _ in range(10):
+        nt.assert_equal(a.value, ref)
+        nt.assert_not_equal(A().value, ref)
+    nt.assert_equal(a.calls, 1)
+    del a._cached_value
+    nt.assert_not_equal(a.value, ref)
+    nt.assert_equal(a.calls, 2)
+
+    b = B()
+    nt.assert_equal(b.value, b.value)
+    nt.assert_equal(b.__dict__, {'_cached_value': b.value})
+
+    nu.cached_property.clear(a)
+    nu.cached_property.clear(a)
+    nt.assert_false(hasattr(a, '_cached_value'))
+    nt.assert_not_equal(a.value, ref)
+    nt.assert_equal(a.calls, 3)
+
+
+def test_cached_property_versioned():
+    class A(object):
+        version = 0
+
+        @nu.cached_property.versioned(lambda a: a.version)
+        def value(self):
+            return random.random()
+
+    a = A()
+    ref = a.value
+    nt.assert_equal(a.value, ref)
+    a.version = 1
+    new = a.value
+    nt.assert_not_equal(new, ref)
+    nt.assert_equal(a.value, new)
+
+
 def test_deprecated():
     @nu.deprecated(msg='Hello')
     def dummy():
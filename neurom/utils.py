@@ -30,7 +30,7 @@
 from enum import Enum
 import json
 import warnings
-from functools import partial, update_wrapper, wraps
+from functools import lru_cache, partial, update_wrapper, wraps
 
 import numpy as np
 
@@ -79,6 +79,97 @@ class memoize(object):
         return res
 
 
+class cached_property(object):  # pylint: disable=invalid-name
+    """Property whose value is computed on first access and cached on the instance.
+
+    The value is stored in the attribute `cached_property.attribute(name)` of the instance,
+    where `name` is the name of the decorated method. Unlike functools.cached_property, this
+    works with classes using __slots__, which must then declare this attribute (see
+    `cached_property.slots`). An unset slot takes no more memory than a pointer, and reading
+    a cached value is a single attribute lookup.
+
+    A property depending on data that can change is declared with `cached_property.versioned`
+    and a function returning the version of this data: the value is computed again when the
+    version differs from that of the cached value. The cached values of an instance are
+    cleared with `cached_property.clear`.
+
+    Example::
+
+       class Obj(object):
+           __slots__ = ('x', ) + cached_property.slots('double')
+
+           @cached_property
+           def double(self):
+               return 2 * self.x
+    """
+
+    def __init__(self, func, version=None):
+        """Initialize a cached_property object.
+
+        Arguments:
+            func: method computing the value of the property
+            version: function taking the instance and returning the version of the data the
+                value depends on, or None if the value never changes
+        """
+        self.func = func
+        self.version = version
+        self.attr = self.attribute(func.__name__)
+        update_wrapper(self, func)
+
+    @classmethod
+    def versioned(cls, version):
+        """Decorator of a property computed again when `version(instance)` changes."""
+        return partial(cls, version=version)
+
+    @staticmethod
+    def attribute(name):
+        """Name of the instance attribute caching the `name` property."""
+        return '_cached_' + name
+
+    @classmethod
+    def slots(cls, *names):
+        """Slots caching the `names` properties, to add to the __slots__ of a class."""
+        return tuple(cls.attribute(name) for name in names)
+
+    @staticmethod
+    def clear(obj):
+        """Clear the values cached by the cached properties of `obj`."""
+        for attr in _cached_attributes(type(obj)):
+            if hasattr(obj, attr):
+                delattr(obj, attr)
+
+    def __get__(self, obj, objtype=None):
+        """Get the cached value, computing it if needed."""
+        if obj is None:
+            return self
+        if self.version is None:
+            try:
+                return getattr(obj, self.attr)
+            except AttributeError:
+                pass
+            value = self.func(obj)
+            setattr(obj, self.attr, value)
+            return value
+
+        version = self.version(obj)
+        try:
+            cached_version, value = getattr(obj, self.attr)
+            if cached_version == version:
+                return value
+        except AttributeError:
+            pass
+        value = self.func(obj)
+        setattr(obj, self.attr, (version, value))
+        return value
+
+
+@lru_cache(maxsize=None)
+def _cached_attributes(cls):
+    """Names of the attributes caching the values of the cached properties of `cls`."""
+    return tuple({attr.attr for klass in cls.__mro__ for attr in vars(klass).values()
+                  if isinstance(attr, cached_property)})
+
+
 def _warn_deprecated(msg):
     """Issue a deprecation warning."""
     warnings.simplefilter('always', DeprecationWarning)